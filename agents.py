@@ -1,96 +1,341 @@
 import asyncio
-from autogen_agentchat.agents import AssistantAgent
-from model_adapter import get_model_client
-from model_prompt.prompt_agents import (
-    prompt_ClauseExtractorAgent,
-    prompt_RiskAnalysisAgent,
-    prompt_SummarizerAgent,
-    prompt_TranslationAgent,
-)
-from markdown_loader import (get_clause_extraction_task,
-                            get_risk_analysis_task,
-                            get_summary_task,)
-from autogen_core.tools import FunctionTool
+import logging
+import os
+import time
+from dotenv import load_dotenv
+import metrics
+from deadline import Deadline, expected_seconds, observe_stage
+from model_adapter import SMALL_TEXT_MODEL, ModelRouter, estimate_tokens
+from model_prompt.registry import TokenUsage, build, record_usage, render
 from legal_risky_keywords import RISK_KEYWORDS
 from translation_model.pipeline import run_translation_pipeline
 from parse import parse_document
+from stage_scheduler import Stage, run_stages
 
-async def process_legal_document(document_path: str, language= str) -> str:
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# The parsed text only feeds clause extraction, so Nepali documents use the fast translation mode.
+EXTRACTION_TRANSLATION_MODE = "fast"
+# Longer documents are sent to ClauseExtractorAgent in chunks of about this many tokens.
+CLAUSE_CHUNK_TOKENS = int(os.getenv("CLAUSE_CHUNK_TOKENS", "6000"))
+
+
+def split_into_chunks(text: str, max_tokens: int) -> list[str]:
+    """
+    Splits text into chunks of at most about max_tokens (see estimate_tokens), packing whole
+    paragraphs; a paragraph longer than that is cut into pieces.
+    """
+    max_chars = max_tokens * 4
+    chunks, current = [], ""
+    for paragraph in text.split("\n\n"):
+        pieces = [paragraph[i:i + max_chars] for i in range(0, len(paragraph), max_chars)] or [""]
+        for piece in pieces:
+            if current and estimate_tokens(current + "\n\n" + piece) > max_tokens:
+                chunks.append(current)
+                current = piece
+            else:
+                current = f"{current}\n\n{piece}" if current else piece
+    if current or not chunks:
+        chunks.append(current)
+    return chunks
+
+
+async def _model_client(name: str, content: str, context: dict, prefer_small: bool = False):
+    """
+    Returns the model client for an agent and its input: the pinned model_client, or the
+    context's ModelRouter client for the model and generation profile (output cap, stop
+    sequences, keep-alive and a context window sized to the prompt). prefer_small asks the
+    router for the small text model.
+    """
+    if context.get("model_client"):
+        return context["model_client"]
+    system_message, task = build(name, content)
+    return await context["model_router"].client_for(name, task, system_message, prefer_small=prefer_small)
+
+
+async def _run_agent(name: str, content: str, context: dict, model_client=None) -> str:
+    """
+    Runs one AssistantAgent on its task for the content (see model_prompt.registry) and returns
+    the content of its last message. The token counts Ollama reports are recorded as metrics
+    and in the context's token_usage.
+    The model client is chosen for the content (see _model_client) unless one is given.
+    The agent is given the context's cancellation_token; cancelling the token cancels the
+    document's task (see process_legal_document), which cancels the model call in flight.
+    """
+    from autogen_agentchat.agents import AssistantAgent
+
+    system_message, task = render(name, content, context.get("token_usage"))
+    model_client = model_client or await _model_client(name, content, context)
+    agent = AssistantAgent(
+        name=name,
+        model_client=model_client,
+        system_message=system_message,
+    )
+    result = await agent.run(task=task, cancellation_token=context.get("cancellation_token"))
+    usage = result.messages[-1].models_usage
+    if usage is not None:
+        record_usage(name, usage.prompt_tokens, usage.completion_tokens, context.get("token_usage"))
+    return result.messages[-1].content
+
+
+def has_risky_terms(text: str) -> bool:
+    """Checks the text for any of the RISK_KEYWORDS."""
+    lowered = text.lower()
+    return any(term.lower() in lowered for term in RISK_KEYWORDS)
+
+
+def keyword_risk_notes(text: str) -> str:
+    """Lists the RISK_KEYWORDS found in the text, with counts: the risk notes of the degraded mode."""
+    lowered = text.lower()
+    counts = {term: lowered.count(term.lower()) for term in RISK_KEYWORDS}
+    found = [f"- {term} ({count}x)" for term, count in counts.items() if count]
+    return "Risky terms found (keyword scan only, not analyzed):\n" + "\n".join(found)
+
+
+def _seconds_after(context: dict, stage: str) -> float:
+    """Expected seconds of the stages still to run after `stage` on the critical path."""
+    seconds = 0.0
+    if stage == "clause_extraction":
+        seconds += max(expected_seconds("risk_analysis"), expected_seconds("clause_summary"))
+    if stage != "translate_output" and context["language"].lower() == "nepali":
+        seconds += expected_seconds("translate_output")
+    return seconds
+
+
+async def parse_stage(context: dict) -> str:
+    """
+    Parses the document into (English) text without blocking the event loop, starting from
+    the already extracted text if the caller passed it. Images are read by the vision model
+    through the context's model router, like every other model call.
+    """
+    return await asyncio.to_thread(
+        parse_document, context["document_path"], translation_mode=EXTRACTION_TRANSLATION_MODE,
+        text=context.get("parsed_text"), cancellation_token=context.get("cancellation_token"),
+        token_usage=context.get("token_usage"), model_router=context.get("model_router"),
+    )
+
+
+async def clause_extraction_stage(context: dict) -> str:
+    """
+    Extracts the essential legal clauses with ClauseExtractorAgent. Documents longer than
+    CLAUSE_CHUNK_TOKENS are processed one chunk after the other, each by a fresh agent but
+    with the same client (model and num_ctx, sized for the largest chunk), so every call
+    reuses the loaded model and the cached system message and instructions.
+
+    Short of time (see deadline.py), the small text model is used, and the chunks after
+    the first are dropped once the time left is needed for the later stages.
+    """
+    deadline = context["deadline"]
+    reserve = _seconds_after(context, "clause_extraction")
+    prefer_small = False
+    if SMALL_TEXT_MODEL and not deadline.allows("clause_extraction", reserve):
+        prefer_small = True
+        deadline.degrade("small_model")
+
+    started = time.perf_counter()
+    chunks = split_into_chunks(context["parse"], CLAUSE_CHUNK_TOKENS)
+    model_client = await _model_client("ClauseExtractorAgent", max(chunks, key=len), context, prefer_small)
+    clauses = []
+    for chunk in chunks:
+        if clauses and deadline.remaining() < reserve:
+            deadline.degrade("partial_clauses")
+            break
+        clauses.append(await _run_agent("ClauseExtractorAgent", chunk, context, model_client=model_client))
+    if not prefer_small and len(clauses) == len(chunks):
+        observe_stage("clause_extraction", time.perf_counter() - started)
+    return "\n\n".join(clauses)
+
+
+async def risk_analysis_stage(context: dict) -> str:
+    """
+    Analyzes the extracted clauses for risks with RiskAnalysisAgent or, short of time (see
+    deadline.py), lists the risky keywords they contain instead.
+    """
+    deadline = context["deadline"]
+    reserve = _seconds_after(context, "risk_analysis")
+    if deadline.allows("risk_analysis", reserve):
+        started = time.perf_counter()
+        try:
+            risk_text = await deadline.run(
+                _run_agent("RiskAnalysisAgent", context["clause_extraction"], context), reserve)
+        except TimeoutError:
+            pass
+        else:
+            observe_stage("risk_analysis", time.perf_counter() - started)
+            print("\n--- Risk Analysis ---\n", risk_text)
+            return risk_text
+    deadline.degrade("keyword_risks")
+    return keyword_risk_notes(context["clause_extraction"])
+
+
+async def clause_summary_stage(context: dict) -> str:
+    """
+    Summarizes the extracted clauses with SummarizerAgent (independent of the risk analysis).
+    Short of time (see deadline.py), BriefSummarizerAgent writes a shorter summary instead,
+    and if even that runs out of time the extracted clauses are returned as they are.
+    """
+    deadline = context["deadline"]
+    reserve = _seconds_after(context, "clause_summary")
+    agent = "SummarizerAgent"
+    if not deadline.allows("clause_summary", reserve):
+        agent = "BriefSummarizerAgent"
+        deadline.degrade("short_summary")
+    started = time.perf_counter()
+    try:
+        if deadline.remaining() <= reserve:
+            raise TimeoutError
+        summary = await deadline.run(_run_agent(agent, context["clause_extraction"], context), reserve)
+    except TimeoutError:
+        deadline.degrade("clauses_only")
+        return context["clause_extraction"]
+    if agent == "SummarizerAgent":
+        observe_stage("clause_summary", time.perf_counter() - started)
+    return summary
+
+
+async def merge_stage(context: dict) -> str:
+    """Joins the clause summary and the risk notes (if any) into the final English summary."""
+    summary_text = context["clause_summary"]
+    risk_text = context.get("risk_analysis")
+    if risk_text:
+        return f"{summary_text}\n\nKey risks:\n{risk_text}"
+    return summary_text
+
+
+async def translate_output_stage(context: dict) -> str:
+    """
+    Translates the final summary to Nepali with the local NLLB pipeline, in the fast mode
+    when short of time (see deadline.py).
+    """
+    print("\n--- Translating Summary to Nepali ---\n")
+    deadline = context["deadline"]
+    mode = "quality"
+    if not deadline.allows("translate_output"):
+        mode = "fast"
+        deadline.degrade("fast_translation")
+    started = time.perf_counter()
+    translated = await asyncio.to_thread(
+        run_translation_pipeline,
+        context["merge"],
+        src_lang="eng_Latn",
+        tgt_lang="npi_Deva",
+        mode=mode,
+        cancellation_token=context.get("cancellation_token"),
+    )
+    if mode == "quality":
+        observe_stage("translate_output", time.perf_counter() - started)
+    return translated
+
+
+# The pipeline graph: stage dependencies and concurrency are declared here only.
+# Risk analysis and the clause summary both need just the extracted clauses, so they run
+# in parallel and are joined by the merge step.
+PIPELINE_STAGES = [
+    Stage("parse", parse_stage),
+    Stage("clause_extraction", clause_extraction_stage, depends_on=("parse",)),
+    Stage("risk_analysis", risk_analysis_stage, depends_on=("clause_extraction",),
+          when=lambda context: has_risky_terms(context["clause_extraction"])),
+    Stage("clause_summary", clause_summary_stage, depends_on=("clause_extraction",)),
+    Stage("merge", merge_stage, depends_on=("clause_summary", "risk_analysis")),
+    Stage("translate_output", translate_output_stage, depends_on=("merge",),
+          when=lambda context: context["language"].lower() == "nepali"),
+]
+MAX_CONCURRENT_STAGES = 2
+
+
+async def process_legal_document(document_path: str, language: str = "english", model_client=None,
+                                 on_stage_complete=None, model_router: ModelRouter | None = None,
+                                 parsed_text: str | None = None, cancellation_token=None,
+                                 deadline: Deadline | None = None, token_usage: TokenUsage | None = None) -> str:
     """
     Processes a legal document through a multi-agent pipeline to extract clauses, analyze risks,
     summarize the content, and optionally translate the final output based on the desired language.
 
-    Steps:
-    1. Parses the document and normalizes its text (e.g., translates Nepali to English if detected).
+    Steps (see PIPELINE_STAGES):
+    1. Parses the document and normalizes its text (e.g., translates Nepali to English if detected,
+       using the fast translation mode since the text is only used for extraction).
     2. Extracts essential legal clauses using ClauseExtractorAgent.
-    3. Checks for risk-related keywords; if found, triggers RiskAnalysisAgent.
-    4. Summarizes the combined clause and risk content using SummarizerAgent.
-    5. If the desired output language is 'nepali', translates the summary using TranslationAgent.
+    3. In parallel: summarizes the clauses using SummarizerAgent and, if risk-related keywords
+       are found, analyzes the risks using RiskAnalysisAgent.
+    4. Merges the clause summary and the risk notes.
+    5. If the desired output language is 'nepali', translates the summary to Nepali with the local
+       NLLB translation pipeline (quality mode, batched and cached) instead of an LLM call.
 
     Parameters:
         document_path (str): The file path to the legal document (PDF, DOCX, image, etc.).
         language (str): The desired output language ("english" or "nepali"). Defaults to "english".
+        model_client: Optional model client to use for every agent, bypassing model routing
+            and the generation profiles.
+        on_stage_complete: Optional callable(stage name, result), called as each stage of
+            PIPELINE_STAGES finishes (see stage_scheduler.run_stages).
+        model_router (ModelRouter): Picks each agent's model (text model for the text stages)
+            and generation profile (see model_adapter.GENERATION_PROFILES) and caches the
+            clients; share one across documents. A new one is used if not given.
+        parsed_text (str): The document's already extracted text, if the caller has it.
+        cancellation_token (autogen_core.CancellationToken): Cancels the run, from any thread:
+            the task awaiting this call is cancelled (so the model calls in flight stop), no
+            further stage starts, the translation threads stop before their next batch, and
+            the call raises asyncio.CancelledError. Cancelling the task awaiting this call
+            does the same, so a caller whose client went away only has to cancel its task.
+        deadline (Deadline): The time budget; stages short of time take cheaper paths, which
+            are listed in deadline.degradations afterwards (see deadline.py). Defaults to
+            PIPELINE_DEADLINE_SECONDS (no deadline when unset).
+        token_usage (TokenUsage): Collects the tokens of the document's model calls, per stage,
+            as Ollama reported them; read token_usage.as_dict() afterwards. A new one is used
+            if not given. The totals are also recorded in the document_prompt_tokens and
+            document_completion_tokens metrics.
 
     Returns:
         str: The final summarized content, optionally translated to Nepali.
     """
+    if cancellation_token is None:
+        from autogen_core import CancellationToken
 
-    normalized_text = parse_document(document_path)
+        cancellation_token = CancellationToken()
+    # The model clients never link the token to their requests, so cancelling it cancels this
+    # task instead. The token may be cancelled from any thread, and only while the document
+    # is still processing: the caller's task must not be cancelled once this call returned.
+    loop = asyncio.get_running_loop()
+    task = asyncio.current_task()
+    processing = True
 
-    model_client = await get_model_client()
+    def cancel_task() -> None:
+        if processing:
+            task.cancel()
 
-    clause_extractor = AssistantAgent(
-        name="ClauseExtractorAgent",
-        model_client=model_client,
-        system_message=prompt_ClauseExtractorAgent,
-    )
+    cancellation_token.add_callback(lambda: loop.call_soon_threadsafe(cancel_task))
+    context = {
+        "cancellation_token": cancellation_token,
+        "deadline": deadline or Deadline(),
+        "document_path": document_path,
+        "language": language,
+        "model_client": model_client,
+        "model_router": model_router or ModelRouter(),
+        "parsed_text": parsed_text,
+        "token_usage": token_usage or TokenUsage(),
+    }
+    try:
+        await run_stages(PIPELINE_STAGES, context, max_concurrency=MAX_CONCURRENT_STAGES,
+                         on_stage_complete=on_stage_complete, cancellation_token=cancellation_token)
+    except asyncio.CancelledError:
+        # Threads started with asyncio.to_thread keep running after their task is cancelled;
+        # the token stops them at their next check.
+        processing = False
+        cancellation_token.cancel()
+        logger.info("Processing of %s cancelled", document_path)
+        metrics.increment("pipeline_cancelled")
+        raise
+    finally:
+        processing = False
 
-    risk_analysis = AssistantAgent(
-        name="RiskAnalysisAgent",
-        model_client=model_client,
-        system_message=prompt_RiskAnalysisAgent,
-    )
-
-    summarizer_agent = AssistantAgent(
-        name="SummarizerAgent",
-        model_client=model_client,
-        system_message=prompt_SummarizerAgent,
-    )
-    translation_agent = AssistantAgent(
-        name= "TranslationAgent",
-        model_client=model_client,
-        system_message=prompt_TranslationAgent,
-
-    )
+    usage = context["token_usage"].as_dict()
+    metrics.observe("document_prompt_tokens", usage["prompt_tokens"])
+    metrics.observe("document_completion_tokens", usage["completion_tokens"])
+    logger.info("Tokens used for %s: %d prompt, %d completion", document_path,
+                usage["prompt_tokens"], usage["completion_tokens"])
 
-    # Run ClauseExtractor
-    clause_task_input = get_clause_extraction_task(normalized_text)
-    clause_extraction_result = await clause_extractor.run(task=clause_task_input)
-    clause_text = clause_extraction_result.messages[-1].content
-
-    #Check for risky terms
-    risky = any(term.lower() in clause_text.lower() for term in RISK_KEYWORDS)
-
-    #If risky → run RiskAnalysisAgent
-    if risky:
-        risk_task = get_risk_analysis_task(clause_text)
-        risk_result = await risk_analysis.run(task=risk_task)
-        risk_text = risk_result.messages[-1].content
-        print("\n--- Risk Analysis ---\n", risk_text)
-    else:
-        risk_text = ""
-
-    # Run SummarizerAgent
-    summary_task = get_summary_task(clause_text + "\n" + risk_text)
-    summary_result = await summarizer_agent.run(task=summary_task)
-    summary_text = summary_result.messages[-1].content
-
-
-    #Run translation for nepali.
-    if language.lower() == "nepali":
-        print("\n--- Translating Summary to Nepali ---\n")
-        translation_result = await translation_agent.run(task=summary_text)
-        translated_summary = translation_result.messages[-1].content
-        return translated_summary
-    else:
-        return summary_text
+    if context["translate_output"] is not None:
+        return context["translate_output"]
+    return context["merge"]
@@ -0,0 +1,279 @@
+"""
+HTTP API around process_legal_document, for services that integrate without the Gradio UI.
+
+    POST   /jobs                 multipart upload (file, language, priority, deadline_seconds)
+                                 -> 202 {"job_id", ...}
+    GET    /jobs/{job_id}        job status, and the summary once it is done
+    GET    /jobs/{job_id}/events server-sent events: a "prescan" event (keyword risk heatmap,
+                                 see risk_prescan.py), one "stage" event per finished
+                                 pipeline stage, then "done", "failed" or "cancelled";
+                                 with ?cancel_on_disconnect=true, closing the stream
+                                 before the end cancels the job
+    DELETE /jobs/{job_id}        cancels the job
+    GET    /health
+
+Uploads are streamed to disk in chunks and rejected with 413 above MAX_UPLOAD_MB.
+Each worker process runs at most MAX_ACTIVE_JOBS documents (queued or running) and answers
+further submissions with 429 and a Retry-After header, so callers back off instead of
+piling up work. Jobs live in the file-based JobStore (JOB_STORE_DIR), so the API can run
+with several uvicorn workers: any worker can answer polling and event requests.
+Jobs submitted with priority=batch queue behind interactive ones for LLM calls (see
+concurrency_limiter.py).
+With deadline_seconds (default PIPELINE_DEADLINE_SECONDS), the job is given that long from
+its submission, queueing included; stages short of time take cheaper paths, listed in the
+job's "degradations" and in its "done" event (see deadline.py). The tokens the job's model
+calls used, as Ollama reported them, are in its "token_usage" and "done" event too.
+
+A cancelled job stops within about EVENT_POLL_SECONDS, whichever worker runs it: its LLM
+calls are cancelled (Ollama stops generating), its translation threads stop before their
+next batch, and its scheduler and concurrency slots go to the next job.
+
+Run:
+    uvicorn api:app --host 0.0.0.0 --port 8000 --workers 4
+"""
+import asyncio
+import json
+import logging
+import os
+import pathlib
+
+from dotenv import load_dotenv
+from fastapi import FastAPI, File, Form, HTTPException, Request, UploadFile
+from fastapi.responses import JSONResponse, StreamingResponse
+
+import metrics
+from deadline import DEFAULT_DEADLINE_SECONDS, Deadline
+from job_scheduler import JobScheduler, estimate_job
+from job_store import TERMINAL_STATUSES, JobStore
+from risk_prescan import prescan
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+MAX_UPLOAD_BYTES = int(float(os.getenv("MAX_UPLOAD_MB", "20")) * 2**20)
+MAX_ACTIVE_JOBS = int(os.getenv("MAX_ACTIVE_JOBS", "8"))
+# Concurrent process_legal_document runs per worker process; the rest of the active jobs wait,
+# and the cheapest of them starts next (see job_scheduler.py).
+MAX_RUNNING_JOBS = int(os.getenv("MAX_RUNNING_JOBS", "4"))
+UPLOAD_CHUNK_BYTES = 1 << 20
+EVENT_POLL_SECONDS = 0.5
+SUPPORTED_EXTENSIONS = {".pdf", ".doc", ".docx", ".jpg", ".jpeg", ".png", ".bmp", ".tiff"}
+SUPPORTED_LANGUAGES = {"english", "nepali"}
+SUPPORTED_PRIORITIES = {"interactive", "batch"}
+
+app = FastAPI(title="Legal Document Reviewer")
+store = JobStore()
+
+# Per worker process; job id -> task.
+_active_jobs = {}
+_scheduler = JobScheduler(MAX_RUNNING_JOBS)
+_model_router = None
+
+
+def _get_shared_model_router():
+    """One ModelRouter (and so one client per model) per worker process, shared by all of its jobs."""
+    global _model_router
+    if _model_router is None:
+        from model_adapter import ModelRouter
+
+        _model_router = ModelRouter()
+    return _model_router
+
+
+async def _save_upload(upload: UploadFile, path: str) -> int:
+    """Streams the upload to path in chunks; raises 413 once it exceeds MAX_UPLOAD_BYTES."""
+    size = 0
+    with open(path, "wb") as f:
+        while chunk := await upload.read(UPLOAD_CHUNK_BYTES):
+            size += len(chunk)
+            if size > MAX_UPLOAD_BYTES:
+                raise HTTPException(413, f"File is larger than {MAX_UPLOAD_BYTES // 2**20} MB")
+            f.write(chunk)
+    return size
+
+
+async def _watch_for_cancel(job_id: str, task: asyncio.Task) -> None:
+    """Cancels the job's task once any worker has asked for it (see JobStore.request_cancel)."""
+    while not store.cancel_requested(job_id):
+        await asyncio.sleep(EVENT_POLL_SECONDS)
+    task.cancel()
+
+
+async def _run_job(job_id: str, document_path: str, language: str, priority: str = "interactive",
+                   deadline: Deadline | None = None) -> None:
+    """Runs one job in this worker process, recording stage events and the outcome in the store."""
+    from agents import process_legal_document
+    from concurrency_limiter import PRIORITY_BATCH, PRIORITY_INTERACTIVE, REQUEST_PRIORITY
+    from model_prompt.registry import TokenUsage
+
+    # The job runs in its own task, so this only applies to its LLM calls.
+    REQUEST_PRIORITY.set(PRIORITY_BATCH if priority == "batch" else PRIORITY_INTERACTIVE)
+
+    deadline = deadline or Deadline()
+    token_usage = TokenUsage()
+
+    def on_stage_complete(stage: str, result) -> None:
+        store.append_event(job_id, "stage", {"stage": stage, "result": result})
+        store.update(job_id, last_stage=stage)
+
+    watcher = asyncio.create_task(_watch_for_cancel(job_id, asyncio.current_task()))
+    try:
+        estimate = await asyncio.to_thread(estimate_job, document_path, language)
+        store.update(job_id, pages=estimate["pages"], tokens=estimate["tokens"],
+                     nepali_ratio=estimate["nepali_ratio"], estimated_cost=round(estimate["cost"]))
+        if estimate["text"] is not None:
+            # The keyword heatmap is ready as soon as the text is, before the job even queues;
+            # the risk_analysis stage event replaces it later. Images have no text until the
+            # vision model has read them.
+            heatmap = prescan(estimate["text"])
+            store.append_event(job_id, "prescan", heatmap)
+            store.update(job_id, prescan=heatmap)
+        async with _scheduler.slot(estimate["cost"]):
+            store.update(job_id, status="running")
+            with metrics.timer("api_job_seconds"):
+                summary = await process_legal_document(
+                    document_path, language,
+                    model_router=_get_shared_model_router(),
+                    on_stage_complete=on_stage_complete,
+                    parsed_text=estimate["text"],
+                    deadline=deadline,
+                    token_usage=token_usage,
+                )
+        # The event goes first: streams stop at a terminal status once no events are left.
+        store.append_event(job_id, "done", {"result": summary, "degradations": deadline.degradations,
+                                            "token_usage": token_usage.as_dict()})
+        store.update(job_id, status="done", result=summary, degradations=deadline.degradations,
+                     token_usage=token_usage.as_dict())
+        metrics.increment("api_jobs", status="done")
+    except asyncio.CancelledError:
+        logger.info("Job %s cancelled", job_id)
+        store.append_event(job_id, "cancelled", {})
+        store.update(job_id, status="cancelled")
+        metrics.increment("api_jobs", status="cancelled")
+        raise
+    except Exception as e:
+        logger.exception("Job %s failed", job_id)
+        error = f"{type(e).__name__}: {e}"
+        store.append_event(job_id, "failed", {"error": error})
+        store.update(job_id, status="failed", error=error)
+        metrics.increment("api_jobs", status="failed")
+    finally:
+        watcher.cancel()
+
+
+@app.get("/health")
+async def health() -> dict:
+    return {"status": "ok", "active_jobs": len(_active_jobs), "max_active_jobs": MAX_ACTIVE_JOBS,
+            "queued_jobs": len(_active_jobs) - _scheduler.running}
+
+
+@app.post("/jobs", status_code=202)
+async def submit_job(request: Request, file: UploadFile = File(...), language: str = Form("english"),
+                     priority: str = Form("interactive"), deadline_seconds: float | None = Form(None)):
+    """Accepts a document and queues it for review. Returns the job id and its URLs."""
+    declared = request.headers.get("content-length")
+    if declared and declared.isdigit() and int(declared) > MAX_UPLOAD_BYTES + UPLOAD_CHUNK_BYTES:
+        raise HTTPException(413, f"File is larger than {MAX_UPLOAD_BYTES // 2**20} MB")
+    if len(_active_jobs) >= MAX_ACTIVE_JOBS:
+        metrics.increment("api_rejected", reason="busy")
+        return JSONResponse({"detail": "Too many jobs in progress, retry later."}, status_code=429,
+                            headers={"Retry-After": "5"})
+    # The budget starts now: time spent queued counts against it.
+    deadline = Deadline(deadline_seconds or DEFAULT_DEADLINE_SECONDS)
+
+    language = language.strip().lower() or "english"
+    if language not in SUPPORTED_LANGUAGES:
+        raise HTTPException(422, "Sorry, we currently only support English and Nepali.")
+    if priority not in SUPPORTED_PRIORITIES:
+        raise HTTPException(422, f"priority must be one of: {', '.join(sorted(SUPPORTED_PRIORITIES))}")
+    if deadline_seconds is not None and deadline_seconds <= 0:
+        raise HTTPException(422, "deadline_seconds must be positive")
+    extension = pathlib.Path(file.filename or "").suffix.lower()
+    if extension not in SUPPORTED_EXTENSIONS:
+        raise HTTPException(415, f"Unsupported file format: {extension or 'none'}")
+
+    job_id = store.create(language=language, filename=file.filename, priority=priority,
+                          deadline_seconds=deadline.seconds)
+    document_path = store.document_path(job_id, file.filename)
+    try:
+        size = await _save_upload(file, document_path)
+    except HTTPException as e:
+        store.update(job_id, status="failed", error=e.detail)
+        raise
+    store.update(job_id, size=size)
+
+    task = asyncio.create_task(_run_job(job_id, document_path, language, priority, deadline))
+    _active_jobs[job_id] = task
+    task.add_done_callback(lambda _: _active_jobs.pop(job_id, None))
+    metrics.set_gauge("api_active_jobs", len(_active_jobs))
+    return {"job_id": job_id, "status_url": f"/jobs/{job_id}", "events_url": f"/jobs/{job_id}/events"}
+
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str) -> dict:
+    try:
+        return store.get(job_id)
+    except KeyError:
+        raise HTTPException(404, "Unknown job") from None
+
+
+@app.delete("/jobs/{job_id}", status_code=202)
+async def cancel_job(job_id: str) -> dict:
+    """
+    Cancels a queued or running job. The worker running it records the "cancelled" status and
+    event once it has stopped; a job that has already ended is left as it is.
+    """
+    try:
+        job = store.get(job_id)
+    except KeyError:
+        raise HTTPException(404, "Unknown job") from None
+    if job["status"] in TERMINAL_STATUSES:
+        return job
+    store.request_cancel(job_id)
+    task = _active_jobs.get(job_id)
+    if task is not None:
+        # Running in this worker: no need to wait for the watcher.
+        task.cancel()
+    metrics.increment("api_cancel_requests", reason="delete")
+    return {**job, "cancel_requested": True}
+
+
+@app.get("/jobs/{job_id}/events")
+async def job_events(job_id: str, cancel_on_disconnect: bool = False):
+    """
+    Streams the job's events as server-sent events until it is done, has failed or was
+    cancelled. With cancel_on_disconnect, a client that closes the stream before then
+    cancels the job, so abandoned documents do not keep using the models.
+    """
+    try:
+        store.get(job_id)
+    except KeyError:
+        raise HTTPException(404, "Unknown job") from None
+
+    async def stream():
+        offset = 0
+        ended = False
+        try:
+            while True:
+                # Status first: every event written before a terminal status is in the read below.
+                finished = store.get(job_id)["status"] in TERMINAL_STATUSES
+                events, offset = store.read_events(job_id, offset)
+                for event in events:
+                    yield f"event: {event['event']}\ndata: {json.dumps(event['data'], ensure_ascii=False)}\n\n"
+                    if event["event"] in TERMINAL_STATUSES:
+                        ended = True
+                        return
+                if finished:
+                    # The job ended without a terminal event (e.g. a rejected upload).
+                    ended = True
+                    return
+                await asyncio.sleep(EVENT_POLL_SECONDS)
+        finally:
+            if cancel_on_disconnect and not ended:
+                # The client disconnected (Starlette cancels the stream when it does).
+                store.request_cancel(job_id)
+                metrics.increment("api_cancel_requests", reason="disconnect")
+
+    return StreamingResponse(stream(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
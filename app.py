@@ -1,16 +1,61 @@
 import gradio as gr
 import asyncio
-from agents import process_legal_document
+import pathlib
 
-# Wrapper to pass user language into agent (modification in agent.py required)
-def process_sync(document_path: str, user_language: str):
+# Session hash -> the task processing that session's document, so it can be cancelled when
+# the browser tab is closed (see cancel_session).
+_session_tasks = {}
+_model_router = None
+
+
+def _get_shared_model_router():
+    """One ModelRouter (and so one client per model) for every document of the app, created on first use."""
+    global _model_router
+    if _model_router is None:
+        from model_adapter import ModelRouter
+
+        _model_router = ModelRouter()
+    return _model_router
+
+
+# Reviews a document in the user's language.
+# Yields the keyword risk pre-scan first (see risk_prescan.py), then the final summary.
+async def review_document(document_path: str, user_language: str):
     # Validate language input
     user_language = user_language.strip().lower() if user_language else "english"
 
     if user_language not in ["english", "nepali"]:
-        return "Sorry, we currently only support English and Nepali."
+        yield "Sorry, we currently only support English and Nepali."
+        return
+
+    # The agent / model stack is imported on the first request, so the UI starts quickly.
+    from agents import process_legal_document
+    from deadline import Deadline
+    from job_scheduler import IMAGE_EXTENSIONS
+    from parse import extract_text
+    from risk_prescan import format_prescan, prescan
+
+    deadline = Deadline()
+    parsed_text = None
+    if pathlib.Path(document_path).suffix.lower() not in IMAGE_EXTENSIONS:
+        # Images only have text once the vision model has read them, so they get no pre-scan.
+        parsed_text = await asyncio.to_thread(extract_text, document_path)
+        yield format_prescan(prescan(parsed_text))
+
+    # Awaited on Gradio's event loop (no asyncio.run in a worker thread), so cancelling this
+    # task cancels the pipeline: its model calls and translation threads stop.
+    summary = await process_legal_document(document_path, user_language, deadline=deadline,
+                                           parsed_text=parsed_text, model_router=_get_shared_model_router())
+    if deadline.degradations:
+        summary += f"\n\n(Quick review to meet the time limit: {deadline.describe()}.)"
+    yield summary
+
 
-    return asyncio.run(process_legal_document(document_path, user_language))
+async def cancel_session(request: gr.Request):
+    """Called by Gradio when a browser session ends: cancels the document it was processing."""
+    task = _session_tasks.pop(request.session_hash, None)
+    if task is not None:
+        task.cancel()
 
 
 # Gradio UI
@@ -23,13 +68,26 @@ with gr.Blocks() as demo:
     output_box = gr.Textbox(label="📝 Final Summary", lines=20)
 
     process_button = gr.Button("Run Analysis")
+    cancel_button = gr.Button("Cancel")
 
-    def on_submit(file, language):
+    async def on_submit(file, language, request: gr.Request):
         if file is None:
-            return "Please upload a legal document."
-        return process_sync(file.name, language)
+            yield "Please upload a legal document."
+            return
+        _session_tasks[request.session_hash] = asyncio.current_task()
+        try:
+            async for output in review_document(file.name, language):
+                yield output
+        finally:
+            if _session_tasks.get(request.session_hash) is asyncio.current_task():
+                del _session_tasks[request.session_hash]
 
-    process_button.click(fn=on_submit, inputs=[file_input, lang_input], outputs=output_box)
+    run_event = process_button.click(fn=on_submit, inputs=[file_input, lang_input], outputs=output_box)
+    # Stop early, e.g. once the quick risk scan shows a document is benign.
+    cancel_button.click(fn=None, cancels=[run_event])
+    # Closing or reloading the tab ends the session; stop its document instead of finishing
+    # it for nobody.
+    demo.unload(cancel_session)
 
 # Launch Gradio app
 if __name__ == "__main__":
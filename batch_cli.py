@@ -0,0 +1,191 @@
+"""
+Batch mode: review many documents from the command line.
+
+Documents come from a directory (searched recursively for supported files) or a manifest:
+    - .jsonl: one {"path": ..., "language": ...} object per line (language is optional)
+    - anything else: one document path per line
+
+Each document goes through process_legal_document, at most --concurrency at a time. All
+documents share one model router (one client per model) and the process-wide translation
+model and cache.
+Results are appended to the output file as JSON Lines as soon as each document finishes:
+    {"path": ..., "language": ..., "status": "ok" | "error", "summary": ..., "error": ..., "seconds": ...}
+
+The output file doubles as the checkpoint: when the command is run again with the same
+output, documents that already have an "ok" line are skipped (and failed ones too, unless
+--retry-failed is given), so an interrupted backfill resumes where it stopped.
+
+Usage:
+    python batch_cli.py archive/contracts --output results.jsonl --concurrency 8
+    python batch_cli.py manifest.jsonl --output results.jsonl --language nepali --retry-failed
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import pathlib
+import sys
+import time
+
+from dotenv import load_dotenv
+
+import metrics
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+SUPPORTED_EXTENSIONS = {".pdf", ".doc", ".docx", ".jpg", ".jpeg", ".png", ".bmp", ".tiff"}
+SUPPORTED_LANGUAGES = {"english", "nepali"}
+
+
+def load_jobs(source: str, language: str) -> list[dict]:
+    """
+    Lists the documents to process as {"path", "language"} dicts, in a stable order.
+    Paths in a manifest are resolved relative to the manifest's directory.
+    """
+    source_path = pathlib.Path(source)
+    if source_path.is_dir():
+        return [
+            {"path": str(path.resolve()), "language": language}
+            for path in sorted(source_path.rglob("*"))
+            if path.is_file() and path.suffix.lower() in SUPPORTED_EXTENSIONS
+        ]
+
+    jobs = []
+    with open(source_path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            entry = json.loads(line) if source_path.suffix == ".jsonl" else {"path": line}
+            path = source_path.parent / entry["path"]
+            jobs.append({"path": str(path.resolve()), "language": (entry.get("language") or language).lower()})
+    return jobs
+
+
+def load_checkpoint(output_path: str) -> dict:
+    """
+    Reads the results already in the output file, keyed by (path, language).
+    A line cut off by an interrupted run is ignored, so that document is processed again.
+    """
+    done = {}
+    if not os.path.exists(output_path):
+        return done
+    with open(output_path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            done[(record["path"], record["language"])] = record["status"]
+    return done
+
+
+def _ends_with_newline(path: str) -> bool:
+    with open(path, "rb") as f:
+        f.seek(-1, os.SEEK_END)
+        return f.read(1) == b"\n"
+
+
+class ResultWriter:
+    """
+    Appends one JSON line per finished document and flushes it to disk right away.
+    If an interrupted run left a line cut off, a newline ends it first, so the next record
+    starts on its own line (load_checkpoint skips the cut-off one).
+    """
+
+    def __init__(self, output_path: str):
+        self.file = open(output_path, "a", encoding="utf-8")
+        if self.file.tell() and not _ends_with_newline(output_path):
+            self.file.write("\n")
+
+    def write(self, record: dict) -> None:
+        self.file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self.file.flush()
+        os.fsync(self.file.fileno())
+
+    def close(self) -> None:
+        self.file.close()
+
+
+async def run_batch(jobs: list[dict], output_path: str, concurrency: int) -> dict:
+    """
+    Processes the jobs with at most `concurrency` documents in flight and one shared model
+    router (one client per model), appending each result to output_path.
+
+    Returns:
+        dict: counts of "ok" and "error" documents.
+    """
+    from agents import process_legal_document
+    from concurrency_limiter import PRIORITY_BATCH, REQUEST_PRIORITY
+    from deadline import Deadline
+    from model_adapter import ModelRouter
+    from model_prompt.registry import TokenUsage
+
+    # Batch documents yield to interactive requests wherever they share a concurrency limit.
+    REQUEST_PRIORITY.set(PRIORITY_BATCH)
+    model_router = ModelRouter()
+    semaphore = asyncio.Semaphore(concurrency)
+    writer = ResultWriter(output_path)
+    counts = {"ok": 0, "error": 0}
+
+    async def run_one(job: dict) -> None:
+        async with semaphore:
+            started = time.perf_counter()
+            record = dict(job)
+            if job["language"] not in SUPPORTED_LANGUAGES:
+                record.update(status="error", error=f"Unsupported language: {job['language']}")
+            else:
+                try:
+                    # PIPELINE_DEADLINE_SECONDS, if set, applies to each document from its start.
+                    deadline = Deadline()
+                    token_usage = TokenUsage()
+                    summary = await process_legal_document(job["path"], job["language"], model_router=model_router,
+                                                           deadline=deadline, token_usage=token_usage)
+                    record.update(status="ok", summary=summary, degradations=deadline.degradations,
+                                  token_usage=token_usage.as_dict())
+                except Exception as e:
+                    logger.exception("Failed to process %s", job["path"])
+                    record.update(status="error", error=f"{type(e).__name__}: {e}")
+            record["seconds"] = round(time.perf_counter() - started, 3)
+            metrics.observe("batch_document_seconds", record["seconds"], status=record["status"])
+            writer.write(record)
+            counts[record["status"]] += 1
+            logger.info("[%d/%d] %s: %s", counts["ok"] + counts["error"], len(jobs), record["status"], job["path"])
+
+    try:
+        await asyncio.gather(*(run_one(job) for job in jobs))
+    finally:
+        writer.close()
+    return counts
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Process a directory or manifest of legal documents.")
+    parser.add_argument("source", help="Directory of documents, or a manifest (.jsonl or one path per line).")
+    parser.add_argument("--output", required=True, help="JSON Lines results file; also the resume checkpoint.")
+    parser.add_argument("--language", default="english", help="Output language for documents without one.")
+    parser.add_argument("--concurrency", type=int, default=4, help="Documents processed at once.")
+    parser.add_argument("--retry-failed", action="store_true", help="Process documents that failed earlier again.")
+    parser.add_argument("--limit", type=int, help="Process at most this many pending documents.")
+    args = parser.parse_args(argv)
+
+    jobs = load_jobs(args.source, args.language.lower())
+    checkpoint = load_checkpoint(args.output)
+    skip = {"ok", "error"} if not args.retry_failed else {"ok"}
+    pending = [job for job in jobs if checkpoint.get((job["path"], job["language"])) not in skip]
+    if args.limit is not None:
+        pending = pending[:args.limit]
+    print(f"{len(jobs)} documents, {len(jobs) - len(pending)} already done, {len(pending)} to process")
+    if not pending:
+        return 0
+
+    counts = asyncio.run(run_batch(pending, args.output, args.concurrency))
+    print(f"Finished: {counts['ok']} ok, {counts['error']} failed. Results in {args.output}")
+    return 1 if counts["error"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,76 @@
+"""
+Deterministic synthetic legal corpora (Nepali, English, Romanized Nepali) for benchmarks.
+
+Documents are built from clause templates with markdown bold, numbering, URLs and email
+addresses mixed in, so the URL masking, punctuation splitting and dictionary replacement
+paths all get exercised.
+"""
+import random
+
+NEPALI_CLAUSES = [
+    "यो सम्झौता ग्लोबल आईएमई बैंक र ग्राहक बीच काठमाडौँ मा गरिएको हो।",
+    "**भुक्तानी** सम्बन्धी सर्तहरू प्रत्येक महिनाको अन्त्यमा लागू हुनेछन्।",
+    "कुनै पनि पक्षले ३० दिनको सूचना दिएर सम्झौता अन्त्य गर्न सक्नेछ।",
+    "विवाद भएमा ललितपुर जिल्ला अदालतको क्षेत्राधिकार हुनेछ।",
+    "गोपनीयता: दुवै पक्षले जानकारी गोप्य राख्नेछन्।",
+    "क्षतिपूर्ति रकम रु. १,००,००० भन्दा बढी हुने छैन।",
+]
+
+ENGLISH_CLAUSES = [
+    "This Agreement is made between Global IME Bank and the Customer in Kathmandu.",
+    "**Payment** terms apply at the end of each month: invoices are due within 15 days.",
+    "Either party may terminate this Agreement with 30 days written notice.",
+    "Disputes shall be subject to the jurisdiction of the Lalitpur District Court.",
+    "Confidentiality: both parties shall keep all information confidential!",
+    "Liability is limited to Rs. 100,000 / per claim.",
+]
+
+ROMANIZED_CLAUSES = [
+    "tapai ko ghar kaha cha ra sanga ko sathi ko naam ke ho",
+    "aaja khana khayo ki chhaina dherai ramro cha",
+    "yo kasto cha timro naam ke ho hamro ghar ramailo cha",
+    "kina huncha hoina tara yo milxa",
+]
+
+URLS = [
+    "https://www.globalime.com/terms",
+    "www.nepallaw.gov.np/act/2074",
+    "legal@globalime.com",
+    "support@example.com.np",
+]
+
+
+def _with_links(rng: random.Random, clause: str, link_rate: float) -> str:
+    if rng.random() < link_rate:
+        return f"{clause} {rng.choice(URLS)}"
+    return clause
+
+
+def build_document(language: str, paragraphs: int, seed: int = 0, link_rate: float = 0.2) -> str:
+    """
+    This function builds one synthetic document with the given number of paragraphs.
+    language is 'nepali', 'english' or 'romanized'.
+    """
+    clauses = {
+        "nepali": NEPALI_CLAUSES,
+        "english": ENGLISH_CLAUSES,
+        "romanized": ROMANIZED_CLAUSES,
+    }[language]
+    rng = random.Random(f"{language}-{seed}")
+    lines = []
+    for index in range(1, paragraphs + 1):
+        sentences = [_with_links(rng, rng.choice(clauses), link_rate) for _ in range(rng.randint(1, 3))]
+        lines.append(f"{index}. " + " ".join(sentences))
+    return "\n".join(lines)
+
+
+def build_long_markdown_line(length: int, seed: int = 0) -> str:
+    """This function builds a single markdown line of roughly `length` characters with many bold spans."""
+    rng = random.Random(f"markdown-{seed}")
+    parts = []
+    size = 0
+    while size < length:
+        clause = rng.choice(ENGLISH_CLAUSES + NEPALI_CLAUSES)
+        parts.append(clause)
+        size += len(clause) + 1
+    return " ".join(parts)
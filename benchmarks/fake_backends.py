@@ -0,0 +1,137 @@
+"""
+Fake tokenizer and CTranslate2 translator backends so the translation pipeline can be
+benchmarked offline on CPU, without the NLLB checkpoint.
+
+Both fakes implement only the parts of the transformers / CTranslate2 APIs that
+TranslatorModel uses. The "translation" is an echo of the source tokens, which keeps the
+pre/postprocessing glue realistic while making model cost configurable.
+"""
+import re
+import time
+
+SPECIAL_TOKENS = ["<s>", "<pad>", "</s>", "<unk>", "eng_Latn", "npi_Deva"]
+
+
+class FakeBatchEncoding(dict):
+    """Dict of token ids that mimics transformers.BatchEncoding for our use."""
+
+    def to(self, device):
+        return self
+
+
+class FakeTokenizer:
+    """
+    A tokenizer that splits text into whitespace words and then into 4-character
+    sentencepiece-style pieces ("▁" marks the start of a word).
+    The vocabulary grows on demand, so any text can be encoded.
+    """
+
+    piece_length = 4
+
+    def __init__(self):
+        self.src_lang = "npi_Deva"
+        self.tgt_lang = "eng_Latn"
+        self.token_to_id = {}
+        self.id_to_token = []
+        for token in SPECIAL_TOKENS:
+            self._token_id(token)
+
+    def _token_id(self, token: str) -> int:
+        token_id = self.token_to_id.get(token)
+        if token_id is None:
+            token_id = len(self.id_to_token)
+            self.token_to_id[token] = token_id
+            self.id_to_token.append(token)
+        return token_id
+
+    def tokenize(self, text: str) -> list[str]:
+        """This function splits text into word pieces."""
+        pieces = []
+        for word in re.findall(r'\S+', text):
+            word = "▁" + word
+            pieces.extend(word[i:i + self.piece_length] for i in range(0, len(word), self.piece_length))
+        return pieces
+
+    def _encode(self, text: str, truncation: bool, max_length: int | None) -> list[int]:
+        tokens = [self.src_lang] + self.tokenize(text) + ["</s>"]
+        if truncation and max_length and len(tokens) > max_length:
+            tokens = tokens[:max_length - 1] + ["</s>"]
+        return [self._token_id(token) for token in tokens]
+
+    def __call__(self, text, return_tensors=None, padding=False, truncation=False, max_length=None, **kwargs):
+        texts = [text] if isinstance(text, str) else list(text)
+        input_ids = [self._encode(item, truncation, max_length) for item in texts]
+        if padding and len(input_ids) > 1:
+            longest = max(len(ids) for ids in input_ids)
+            pad_id = self.token_to_id["<pad>"]
+            input_ids = [ids + [pad_id] * (longest - len(ids)) for ids in input_ids]
+        if isinstance(text, str) and return_tensors is None:
+            return FakeBatchEncoding(input_ids=input_ids[0])
+        return FakeBatchEncoding(input_ids=input_ids)
+
+    def convert_ids_to_tokens(self, ids) -> list[str]:
+        return [self.id_to_token[int(token_id)] for token_id in ids]
+
+    def convert_tokens_to_ids(self, tokens) -> list[int]:
+        if isinstance(tokens, str):
+            return self._token_id(tokens)
+        return [self._token_id(token) for token in tokens]
+
+    def decode(self, ids, skip_special_tokens: bool = False) -> str:
+        tokens = self.convert_ids_to_tokens(ids)
+        if skip_special_tokens:
+            tokens = [token for token in tokens if token not in SPECIAL_TOKENS]
+        return ''.join(tokens).replace("▁", " ").strip()
+
+    def batch_decode(self, sequences, skip_special_tokens: bool = False) -> list[str]:
+        return [self.decode(ids, skip_special_tokens=skip_special_tokens) for ids in sequences]
+
+
+class FakeTranslationResult:
+    """Mimics ctranslate2.TranslationResult."""
+
+    def __init__(self, hypotheses: list[list[str]]):
+        self.hypotheses = hypotheses
+        self.scores = [0.0] * len(hypotheses)
+
+
+class FakeTranslator:
+    """
+    Mimics ctranslate2.Translator.translate_batch by echoing the source tokens.
+
+    seconds_per_token simulates decoding cost: each batch sleeps for
+    (longest source length x beam size x seconds_per_token), which is roughly how
+    padded beam search scales.
+    """
+
+    def __init__(self, seconds_per_token: float = 0.0):
+        self.seconds_per_token = seconds_per_token
+        self.calls = 0
+        self.tokens_translated = 0
+
+    def translate_batch(self, source, target_prefix=None, beam_size: int = 4, **kwargs):
+        self.calls += 1
+        results = []
+        longest = 0
+        for i, tokens in enumerate(source):
+            body = [token for token in tokens if token not in SPECIAL_TOKENS]
+            prefix = list(target_prefix[i]) if target_prefix else []
+            max_decoding_length = kwargs.get("max_decoding_length")
+            if max_decoding_length:
+                body = body[:max_decoding_length]
+            longest = max(longest, len(tokens))
+            self.tokens_translated += len(body)
+            results.append(FakeTranslationResult([prefix + body]))
+        if self.seconds_per_token:
+            time.sleep(longest * max(beam_size, 1) * self.seconds_per_token)
+        return results
+
+
+def build_fake_translator_model(seconds_per_token: float = 0.0):
+    """Builds a TranslatorModel that uses the fake tokenizer and translator."""
+    from translation_model.translator import TranslatorModel
+
+    return TranslatorModel(
+        translation_tokenizer=FakeTokenizer(),
+        translation_model=FakeTranslator(seconds_per_token=seconds_per_token),
+    )
@@ -0,0 +1,97 @@
+"""
+Import-time budget for the modules that worker processes and CLI tools start from.
+
+Each module is imported in a fresh interpreter with `python -X importtime`, so nothing is
+shared with earlier imports. The run fails (exit status 1) if a module takes longer than
+its budget, and lists the slowest imports it pulled in, which is usually enough to find the
+heavy dependency that should be deferred to first use.
+
+Usage:
+    python -m benchmarks.import_budget
+    python -m benchmarks.import_budget --budget 0.3 --repeats 5 parse agents
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+# Modules that must stay cheap to import. The Gradio UI (app.py) is not listed: gradio
+# itself takes seconds to import, but the agent and model stack is deferred there too.
+MODULES = [
+    "metrics",
+    "stage_scheduler",
+    "translation_model.dict_store",
+    "translation_model.pipeline",
+    "parse",
+    "model_adapter",
+    "agents",
+]
+DEFAULT_BUDGET_SECONDS = 0.5
+
+
+def measure_import(module: str) -> tuple[float, list[tuple[float, str]]]:
+    """
+    Imports the module in a fresh interpreter.
+
+    Returns:
+        tuple[float, list[tuple[float, str]]]: cumulative import time of the module in seconds,
+        and (cumulative seconds, name) of every module imported on the way.
+    """
+    env = dict(os.environ)
+    # parse.py logs to LOG_PATH; importing it must not depend on a configured .env.
+    env.setdefault("LOG_PATH", os.devnull)
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, env=env, cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr.strip().splitlines()[-1]}")
+
+    imports = []
+    total = 0.0
+    for line in result.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if not cumulative.strip().isdigit():
+            continue
+        seconds = int(cumulative) / 1e6
+        imports.append((seconds, name.rstrip()))
+        if name.strip() == module:
+            total = seconds
+    return total, imports
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Check the import time of the startup modules.")
+    parser.add_argument("modules", nargs="*", default=MODULES, help="Modules to check (default: all).")
+    parser.add_argument("--budget", type=float, default=DEFAULT_BUDGET_SECONDS,
+                        help="Allowed import time per module in seconds.")
+    parser.add_argument("--repeats", type=int, default=3, help="Fresh imports per module; the best is kept.")
+    parser.add_argument("--top", type=int, default=5, help="Slowest imports to list for a module over budget.")
+    args = parser.parse_args(argv)
+
+    over_budget = []
+    print(f"{'module':<32}{'seconds':>10}")
+    for module in args.modules:
+        best, imports = min((measure_import(module) for _ in range(args.repeats)), key=lambda item: item[0])
+        print(f"{module:<32}{best:>10.3f}{'  OVER BUDGET' if best > args.budget else ''}")
+        if best > args.budget:
+            over_budget.append(module)
+            # Only top-level imports of third-party or repo modules, not their submodules.
+            heaviest = sorted(
+                (item for item in imports if item[1].strip() != module and not item[1].startswith("    ")),
+                reverse=True,
+            )[:args.top]
+            for seconds, name in heaviest:
+                print(f"    {seconds:>8.3f}  {name.strip()}")
+
+    if over_budget:
+        print(f"\n{len(over_budget)} module(s) over the {args.budget:.2f}s budget: {', '.join(over_budget)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,261 @@
+"""
+End-to-end load test for agents.process_legal_document against a mock Ollama server.
+
+Generates documents of several sizes and formats (PDF, DOCX, image; English and Nepali),
+starts benchmarks.mock_ollama in-process, swaps the NLLB model for the fake backend and
+drives the documents through the full agent pipeline with a bounded number in flight.
+
+Reports throughput, queueing delay (time waiting for a concurrency slot), processing time,
+end-to-end latency (document_latency_seconds, queueing included) and per-stage latency
+distributions (from the `stage_seconds` metric).
+
+With --backends N, N mock servers are started and the pipeline balances over them
+(OLLAMA_HOSTS, see ollama_balancer.py); --slow-backend adds latency to the first one and
+--hedge turns on hedged requests.
+
+Usage:
+    python -m benchmarks.load_test --documents 40 --concurrency 8 --tokens-per-second 60
+    python -m benchmarks.load_test --backends 3 --slow-backend 2 --hedge
+"""
+import argparse
+import asyncio
+import contextlib
+import itertools
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+
+from benchmarks.corpus import build_document
+from benchmarks.mock_ollama import MockOllamaConfig, MockOllamaServer
+
+
+def _configure_environment(workdir: str, ollama_url: str) -> None:
+    """Points every output path and the Ollama host at the temporary work directory / mock server."""
+    os.environ["OLLAMA_HOST"] = ollama_url
+    os.environ["LOG_PATH"] = os.path.join(workdir, "load_test.log")
+    os.environ["PDF_OUTPUT_DIR"] = os.path.join(workdir, "pdf_output")
+    os.environ["DOCX_OUTPUT_DIR"] = os.path.join(workdir, "docx_output")
+    os.environ["IMAGE_OUTPUT_DIR"] = os.path.join(workdir, "image_output")
+    os.environ["CACHE_CSV"] = os.path.join(workdir, "translated_data.csv")
+    os.environ["NLLB_JSON"] = os.path.join(workdir, "nllb_data.json")
+
+
+def write_pdf(path: str, text: str) -> None:
+    import pymupdf
+
+    doc = pymupdf.open()
+    lines = text.split("\n")
+    for start in range(0, len(lines), 40):
+        page = doc.new_page()
+        page.insert_textbox(page.rect + (50, 50, -50, -50), "\n".join(lines[start:start + 40]), fontsize=9)
+    doc.save(path)
+
+
+def write_docx(path: str, text: str) -> None:
+    from docx import Document
+
+    doc = Document()
+    for line in text.split("\n"):
+        doc.add_paragraph(line)
+    doc.save(path)
+
+
+def write_image(path: str) -> None:
+    import pymupdf
+
+    pixmap = pymupdf.Pixmap(pymupdf.csRGB, pymupdf.IRect(0, 0, 64, 64), 0)
+    pixmap.clear_with(255)
+    pixmap.save(path)
+
+
+def build_documents(workdir: str, count: int, sizes: list[int], formats: list[str]) -> list[dict]:
+    """
+    Writes `count` documents cycling through sizes and formats.
+    DOCX documents alternate between English and Nepali; PDFs are English only
+    (the default PDF font has no Devanagari glyphs).
+    """
+    documents = []
+    variants = itertools.cycle(itertools.product(sizes, formats))
+    for index in range(count):
+        size, fmt = next(variants)
+        language = "nepali" if fmt == "docx" and index % 2 else "english"
+        text = build_document(language, size, seed=index)
+        path = os.path.join(workdir, f"doc_{index}.{'png' if fmt == 'image' else fmt}")
+        if fmt == "pdf":
+            write_pdf(path, text)
+        elif fmt == "docx":
+            write_docx(path, text)
+        else:
+            write_image(path)
+        documents.append({"path": path, "format": fmt, "size": size, "language": language})
+    return documents
+
+
+async def drive(documents: list[dict], concurrency: int, output_language: str, scheduler: str = "fifo",
+                deadline_seconds: float | None = None) -> dict:
+    """
+    Runs every document through process_legal_document with at most `concurrency` in flight,
+    started in submission order ("fifo") or cheapest first ("sjf", see job_scheduler.py),
+    each with a deadline of deadline_seconds from its submission if given (see deadline.py).
+    """
+    import metrics
+    from agents import process_legal_document
+    from deadline import Deadline
+    from job_scheduler import JobScheduler, estimate_job
+    from model_adapter import ModelRouter
+
+    model_router = ModelRouter()
+    semaphore = asyncio.Semaphore(concurrency)
+    job_scheduler = JobScheduler(concurrency)
+    errors = []
+
+    async def run_one(document: dict) -> None:
+        submitted = time.perf_counter()
+        deadline = Deadline(deadline_seconds)
+        parsed_text = None
+        if scheduler == "sjf":
+            estimate = await asyncio.to_thread(estimate_job, document["path"], output_language)
+            parsed_text = estimate["text"]
+            slot = job_scheduler.slot(estimate["cost"])
+        else:
+            slot = semaphore
+        async with slot:
+            started = time.perf_counter()
+            metrics.observe("queue_delay_seconds", started - submitted)
+            try:
+                await process_legal_document(document["path"], output_language, model_router=model_router,
+                                             parsed_text=parsed_text, deadline=deadline)
+            except Exception as e:
+                errors.append(f"{document['path']}: {e}")
+            finally:
+                finished = time.perf_counter()
+                metrics.observe("document_seconds", finished - started, format=document["format"])
+                metrics.observe("document_latency_seconds", finished - submitted)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(run_one(document) for document in documents))
+    wall = time.perf_counter() - start
+    return {"wall_seconds": wall, "documents_per_second": len(documents) / wall, "errors": errors}
+
+
+def drive_worker_pool(documents: list[dict], processes: int, jobs_per_worker: int, output_language: str,
+                      seconds_per_token: float) -> dict:
+    """
+    Runs every document through a WorkerPool of `processes` workers sharing one inference
+    process (with the fake NLLB backends). Stage metrics stay in the worker processes, so
+    only throughput and errors are reported.
+    """
+    from benchmarks.fake_backends import FakeTokenizer, FakeTranslator
+    from worker_pool import WorkerPool
+
+    errors = []
+    with WorkerPool(processes, jobs_per_worker, translation_model=FakeTranslator(seconds_per_token),
+                    translation_tokenizer=FakeTokenizer()) as pool:
+        start = time.perf_counter()
+        futures = [(document, pool.submit(document["path"], output_language)) for document in documents]
+        for document, future in futures:
+            try:
+                future.result()
+            except Exception as e:
+                errors.append(f"{document['path']}: {e}")
+        wall = time.perf_counter() - start
+    return {"wall_seconds": wall, "documents_per_second": len(documents) / wall, "errors": errors}
+
+
+def print_report(result: dict, snapshot: dict) -> None:
+    print(f"documents/s: {result['documents_per_second']:.2f}  wall: {result['wall_seconds']:.1f}s  "
+          f"errors: {len(result['errors'])}")
+    if len(result.get("mock_requests_by_backend", {})) > 1:
+        print("requests by backend: " + ", ".join(f"{url} {count}"
+                                                   for url, count in result["mock_requests_by_backend"].items()))
+    print(f"{'series':<48}{'count':>7}{'mean':>9}{'p50':>9}{'p95':>9}{'p99':>9}")
+    for series, summary in sorted(snapshot["summaries"].items()):
+        print(f"{series:<48}{summary['count']:>7}{summary['mean']:>9.3f}"
+              f"{summary['p50']:>9.3f}{summary['p95']:>9.3f}{summary['p99']:>9.3f}")
+    for series, count in sorted(snapshot["counters"].items()):
+        if series.startswith("pipeline_degradations"):
+            print(f"{series:<48}{count:>7.0f}")
+    for error in result["errors"][:10]:
+        print("  error: " + error)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Load-test process_legal_document against a mock Ollama server.")
+    parser.add_argument("--documents", type=int, default=20, help="Number of documents to process.")
+    parser.add_argument("--concurrency", type=int, default=4, help="Documents in flight at once.")
+    parser.add_argument("--sizes", default="5,20,80", help="Comma-separated paragraph counts.")
+    parser.add_argument("--formats", default="pdf,docx,image", help="Comma-separated formats: pdf, docx, image.")
+    parser.add_argument("--output-language", default="english", choices=["english", "nepali"])
+    parser.add_argument("--latency", type=float, default=0.05, help="Mock server fixed latency per request.")
+    parser.add_argument("--tokens-per-second", type=float, default=40.0, help="Mock server decode speed.")
+    parser.add_argument("--prefill-tokens-per-second", type=float, default=2000.0,
+                        help="Mock server prompt processing speed.")
+    parser.add_argument("--response-tokens", type=int, default=120, help="Tokens per mock response.")
+    parser.add_argument("--parallel", type=int, default=4, help="Mock server parallel slots.")
+    parser.add_argument("--scheduler", default="fifo", choices=["fifo", "sjf"],
+                        help="Order in which queued documents start (sjf: cheapest first, with aging).")
+    parser.add_argument("--deadline", type=float, default=None,
+                        help="Deadline in seconds per document, from its submission (degraded mode, see deadline.py).")
+    parser.add_argument("--backends", type=int, default=1,
+                        help="Mock servers to start; more than one balances over them via OLLAMA_HOSTS.")
+    parser.add_argument("--slow-backend", type=float, default=0.0,
+                        help="Extra latency in seconds of the first mock server.")
+    parser.add_argument("--hedge", action="store_true", help="Send hedged requests (OLLAMA_HEDGE=1).")
+    parser.add_argument("--prefix-cache", action="store_true",
+                        help="Simulate the server's prompt prefix cache (see benchmarks/mock_ollama.py).")
+    parser.add_argument("--seconds-per-token", type=float, default=0.0,
+                        help="Simulated NLLB decoding cost per token.")
+    parser.add_argument("--processes", type=int, default=0,
+                        help="Run the documents in a WorkerPool with this many worker processes "
+                             "(--concurrency documents per worker) instead of in this process.")
+    parser.add_argument("--output", help="Write the report and metric snapshot as JSON to this path.")
+    args = parser.parse_args(argv)
+
+    configs = [
+        MockOllamaConfig(args.latency + (args.slow_backend if index == 0 else 0.0), args.tokens_per_second,
+                         args.prefill_tokens_per_second, args.response_tokens, args.parallel, args.prefix_cache)
+        for index in range(max(1, args.backends))
+    ]
+    with tempfile.TemporaryDirectory() as workdir, contextlib.ExitStack() as stack:
+        servers = [stack.enter_context(MockOllamaServer(config)) for config in configs]
+        _configure_environment(workdir, servers[0].url)
+        if len(servers) > 1:
+            os.environ["OLLAMA_HOSTS"] = ",".join(server.url for server in servers)
+        if args.hedge:
+            os.environ["OLLAMA_HEDGE"] = "1"
+
+        import metrics
+        from translation_model import pipeline
+        from benchmarks.fake_backends import build_fake_translator_model
+
+        logging.disable(logging.INFO)
+        pipeline.set_translator_model(build_fake_translator_model(args.seconds_per_token))
+        documents = build_documents(workdir, args.documents,
+                                    [int(size) for size in args.sizes.split(",") if size],
+                                    [fmt for fmt in args.formats.split(",") if fmt])
+        metrics.reset()
+        if args.processes:
+            result = drive_worker_pool(documents, args.processes, args.concurrency, args.output_language,
+                                       args.seconds_per_token)
+        else:
+            result = asyncio.run(drive(documents, args.concurrency, args.output_language, args.scheduler,
+                                       args.deadline))
+        snapshot = metrics.snapshot()
+        result["mock_requests_by_model"] = {}
+        for server in servers:
+            for model, count in server.requests_by_model.items():
+                result["mock_requests_by_model"][model] = result["mock_requests_by_model"].get(model, 0) + count
+        result["mock_requests_by_backend"] = {server.url: sum(server.requests_by_model.values()) for server in servers}
+
+    print_report(result, snapshot)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"result": result, "metrics": snapshot}, f, indent=4)
+    return 1 if result["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
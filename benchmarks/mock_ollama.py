@@ -0,0 +1,253 @@
+"""
+A local stand-in for the Ollama HTTP API, for load tests that must not touch a GPU.
+
+Implements /api/chat (streaming and non-streaming), /api/generate, /api/tags and
+/api/version. Each request waits for a free "slot" (like OLLAMA_NUM_PARALLEL), then
+sleeps for a simulated prefill + decode time:
+
+    latency + prompt_tokens / prefill_tokens_per_second + response_tokens / tokens_per_second
+
+With prefix_cache, each slot remembers the last prompt it processed (per model), and only
+the part of a new prompt after the longest common prefix with a remembered prompt is
+prefilled and reported in prompt_eval_count, like the llama.cpp prompt cache in Ollama.
+
+Run standalone:
+    python -m benchmarks.mock_ollama --port 11434 --tokens-per-second 40
+or start it in-process with MockOllamaServer(...).start().
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+RESPONSE_WORDS = (
+    "The Agreement sets out a termination clause , a limitation of liability , "
+    "payment within thirty days and confidentiality obligations for both parties ."
+).split()
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about four characters per token)."""
+    return max(1, len(text) // 4)
+
+
+class MockOllamaConfig:
+    """Timing and output settings of the mock server."""
+
+    def __init__(self,
+                 latency: float = 0.05,
+                 tokens_per_second: float = 40.0,
+                 prefill_tokens_per_second: float = 2000.0,
+                 response_tokens: int = 120,
+                 parallel: int = 4,
+                 prefix_cache: bool = False):
+        self.latency = latency
+        self.tokens_per_second = tokens_per_second
+        self.prefill_tokens_per_second = prefill_tokens_per_second
+        self.response_tokens = response_tokens
+        self.parallel = parallel
+        self.prefix_cache = prefix_cache
+
+
+def _response_text(tokens: int) -> str:
+    return " ".join(RESPONSE_WORDS[i % len(RESPONSE_WORDS)] for i in range(tokens))
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server_version = "MockOllama/0.1"
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, payload: dict, status: int = 200) -> None:
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == "/api/tags":
+            self._send_json({"models": [{"name": name, "model": name} for name in self.server.models]})
+        elif self.path == "/api/version":
+            self._send_json({"version": "0.0.0-mock"})
+        else:
+            body = b"Ollama is running"
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        request = json.loads(self.rfile.read(length) or b"{}")
+        if self.path not in ("/api/chat", "/api/generate"):
+            self._send_json({"error": f"unknown path {self.path}"}, status=404)
+            return
+
+        if self.path == "/api/chat":
+            prompt = "".join(str(message.get("content", "")) for message in request.get("messages", []))
+        else:
+            prompt = str(request.get("system", "")) + str(request.get("prompt", ""))
+        self.server.record_request(request.get("model", ""))
+        self._complete(request, prompt)
+
+    def _complete(self, request: dict, prompt: str) -> None:
+        config = self.server.config
+        model = request.get("model", "mock")
+        options = request.get("options") or {}
+        response_tokens = min(config.response_tokens, int(options.get("num_predict") or config.response_tokens))
+        prompt_tokens = estimate_tokens(prompt[self.server.cached_prefix_length(model, prompt):])
+        prefill_seconds = prompt_tokens / config.prefill_tokens_per_second
+        decode_seconds = response_tokens / config.tokens_per_second
+        text = _response_text(response_tokens)
+        is_chat = self.path == "/api/chat"
+
+        def chunk(content: str, done: bool) -> dict:
+            payload = {
+                "model": model,
+                "created_at": datetime.now(timezone.utc).isoformat(),
+                "done": done,
+            }
+            if is_chat:
+                payload["message"] = {"role": "assistant", "content": content}
+            else:
+                payload["response"] = content
+            if done:
+                payload.update({
+                    "done_reason": "stop",
+                    "total_duration": int((config.latency + prefill_seconds + decode_seconds) * 1e9),
+                    "load_duration": 0,
+                    "prompt_eval_count": prompt_tokens,
+                    "prompt_eval_duration": int(prefill_seconds * 1e9),
+                    "eval_count": response_tokens,
+                    "eval_duration": int(decode_seconds * 1e9),
+                })
+            return payload
+
+        with self.server.slots:
+            time.sleep(config.latency + prefill_seconds)
+            if not request.get("stream", True):
+                time.sleep(decode_seconds)
+                self._send_json(chunk(text, done=True))
+                return
+
+            self.send_response(200)
+            self.send_header("Content-Type", "application/x-ndjson")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            words = text.split(" ")
+            step = 8
+            for start in range(0, len(words), step):
+                piece = " ".join(words[start:start + step]) + " "
+                time.sleep(min(step, len(words) - start) / config.tokens_per_second)
+                self._write_chunk(json.dumps(chunk(piece, done=False)) + "\n")
+            self._write_chunk(json.dumps(chunk("", done=True)) + "\n")
+            self.wfile.write(b"0\r\n\r\n")
+
+    def _write_chunk(self, data: str) -> None:
+        raw = data.encode()
+        self.wfile.write(f"{len(raw):x}\r\n".encode() + raw + b"\r\n")
+        self.wfile.flush()
+
+
+class MockOllamaServer(ThreadingHTTPServer):
+    """Threaded mock Ollama server; use start()/stop() or run as a context manager."""
+
+    daemon_threads = True
+
+    def __init__(self, config: MockOllamaConfig | None = None, host: str = "127.0.0.1", port: int = 0,
+                 models: tuple[str, ...] = ("llama3.2-vision:11b", "llama3.1:8b")):
+        super().__init__((host, port), _Handler)
+        self.config = config or MockOllamaConfig()
+        self.models = models
+        self.slots = threading.Semaphore(self.config.parallel)
+        self.requests_by_model = {}
+        self.slot_prompts = []
+        self._counter_lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def handle_error(self, request, client_address) -> None:
+        # Clients hang up on purpose (cancelled or hedged requests); only report real errors.
+        if not isinstance(sys.exc_info()[1], (BrokenPipeError, ConnectionResetError)):
+            super().handle_error(request, client_address)
+
+    def record_request(self, model: str) -> None:
+        with self._counter_lock:
+            self.requests_by_model[model] = self.requests_by_model.get(model, 0) + 1
+
+    def cached_prefix_length(self, model: str, prompt: str) -> int:
+        """
+        Returns how many leading characters of the prompt are served from the prefix cache
+        (0 without prefix_cache), and remembers the prompt in the best matching slot, or in
+        the least recently used slot on a miss.
+        """
+        if not self.config.prefix_cache:
+            return 0
+        with self._counter_lock:
+            best_index, best_length = None, 0
+            for index, (cached_model, cached_prompt) in enumerate(self.slot_prompts):
+                if cached_model != model:
+                    continue
+                length = len(os.path.commonprefix([cached_prompt, prompt]))
+                if length > best_length:
+                    best_index, best_length = index, length
+            if best_index is not None:
+                del self.slot_prompts[best_index]
+            elif len(self.slot_prompts) >= self.config.parallel:
+                del self.slot_prompts[0]
+            self.slot_prompts.append((model, prompt))
+            return best_length
+
+    def start(self) -> "MockOllamaServer":
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Run a mock Ollama server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11434)
+    parser.add_argument("--latency", type=float, default=0.05, help="Fixed per-request latency in seconds.")
+    parser.add_argument("--tokens-per-second", type=float, default=40.0, help="Simulated decode speed.")
+    parser.add_argument("--prefill-tokens-per-second", type=float, default=2000.0,
+                        help="Simulated prompt processing speed.")
+    parser.add_argument("--response-tokens", type=int, default=120, help="Tokens generated per response.")
+    parser.add_argument("--parallel", type=int, default=4, help="Requests processed at once (OLLAMA_NUM_PARALLEL).")
+    parser.add_argument("--prefix-cache", action="store_true", help="Simulate the server's prompt prefix cache.")
+    args = parser.parse_args(argv)
+
+    config = MockOllamaConfig(args.latency, args.tokens_per_second, args.prefill_tokens_per_second,
+                              args.response_tokens, args.parallel, args.prefix_cache)
+    server = MockOllamaServer(config, host=args.host, port=args.port)
+    print(f"Mock Ollama listening on {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Benchmark of the punctuation segmenter on long markdown lines.
+
+Compares translation_model.segmenter.split_on_punctuation with the regex it replaced
+(whose **bold** lookahead rescans the rest of the line at every punctuation mark) and
+checks both produce identical segments.
+
+Usage:
+    python -m benchmarks.segmenter_bench --lengths 1000,10000,50000
+"""
+import argparse
+import re
+import sys
+import time
+
+from benchmarks.corpus import build_long_markdown_line
+from translation_model.segmenter import split_on_punctuation
+
+LEGACY_SPLIT_PATTERN = re.compile(
+    r'(?<!\d)([!?:/]|(?<![A-Za-z])\.(?![A-Za-z]))(?=(?:[^*]*\*\*[^*]*\*\*)*[^*]*$)'
+    r'|([–!?:/]|(?<![A-Za-z])\.(?![A-Za-z]))(?!\d)(?=(?:[^*]*\*\*[^*]*\*\*)*[^*]*$)'
+)
+
+
+def legacy_split_on_punctuation(text_parts: list[str]) -> list[str]:
+    """The previous implementation, kept as the reference for equivalence checks."""
+    final_result = []
+    for part in text_parts:
+        final_result.extend(LEGACY_SPLIT_PATTERN.split(part))
+    return [item for item in final_result if item]
+
+
+def _best_time(fn, repeats: int) -> float:
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return max(best, 1e-9)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark punctuation splitting on long markdown lines.")
+    parser.add_argument("--lengths", default="1000,10000,50000", help="Comma-separated line lengths in chars.")
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    print(f"{'chars':>8}{'legacy s':>12}{'scanner s':>12}{'speedup':>10}")
+    for length in [int(value) for value in args.lengths.split(",") if value]:
+        parts = [build_long_markdown_line(length)]
+        if legacy_split_on_punctuation(parts) != split_on_punctuation(parts):
+            print(f"segments differ for a line of {length} chars")
+            return 1
+        legacy = _best_time(lambda: legacy_split_on_punctuation(parts), args.repeats)
+        scanner = _best_time(lambda: split_on_punctuation(parts), args.repeats)
+        print(f"{length:>8}{legacy:>12.4f}{scanner:>12.4f}{legacy / scanner:>9.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,211 @@
+"""
+Benchmark suite for the translation subsystem.
+
+Runs each preprocessing / postprocessing step of translation_model, plus the CSV cache
+lookups in file_ops, over synthetic corpora of increasing size. The tokenizer and
+CTranslate2 model are replaced by the fakes in benchmarks.fake_backends, so the suite
+runs offline on CPU.
+
+Usage:
+    python -m benchmarks.translation_bench --sizes 10,100,1000 --output bench.json
+    python -m benchmarks.translation_bench --baseline bench.json --max-regression 0.2
+
+With --baseline, the run exits with status 1 if any case's throughput dropped by more
+than --max-regression compared to the baseline file.
+"""
+import argparse
+import csv
+import gc
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.corpus import build_document
+from benchmarks.fake_backends import build_fake_translator_model
+
+
+def _measure(fn, repeats: int) -> tuple[float, int]:
+    """Returns (best wall time in seconds, peak traced memory in bytes) for fn()."""
+    best = float("inf")
+    for _ in range(repeats):
+        gc.collect()
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+
+    gc.collect()
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak
+
+
+def _write_cache_csv(path: str, rows: int) -> list[str]:
+    """Fills a cache CSV with `rows` entries and returns the original sentences."""
+    sentences = [f"वाक्य नम्बर {i}" for i in range(rows)]
+    with open(path, "w", newline="", encoding="utf-8") as file:
+        writer = csv.writer(file)
+        writer.writerow(["target_language_tag", "Original Sentence", "Translated Sentence", "context"])
+        for sentence in sentences:
+            writer.writerow(["eng_Latn", sentence, f"sentence {sentence}", "answer"])
+    return sentences
+
+
+def build_cases(size: int, workdir: str) -> list[tuple[str, int, int, object]]:
+    """
+    Returns benchmark cases for one corpus size as (name, segments, chars, fn) tuples.
+    `size` is the number of paragraphs in each synthetic document.
+    """
+    from translation_model import pipeline
+    from translation_model.file_ops import check_existing_translation, save_to_csv
+
+    model = pipeline.get_translator_model()
+    nepali = build_document("nepali", size)
+    english = build_document("english", size)
+    romanized = build_document("romanized", size)
+    annex = build_document("english", size, link_rate=1.0)
+
+    processed = pipeline._preprocess_text(nepali)
+    segments = processed["text_only"]
+    romanized_segments = romanized.split("\n")
+    english_segments = pipeline._preprocess_text(english)["text_only"]
+    segment_chars = sum(len(segment) for segment in segments)
+
+    cache_path = os.path.join(workdir, f"cache_{size}.csv")
+    cached = _write_cache_csv(cache_path, size * 10)
+    lookups = cached[-10:] + [f"missing {i}" for i in range(10)]
+    append_path = os.path.join(workdir, f"append_{size}.csv")
+
+    def reinsert_and_assemble():
+        with_symbols = model.reinsert_punctuation_tokens(processed["split_with_symbols"], segments)
+        model.assemble_final_text(with_symbols)
+
+    def mask_and_unmask_urls():
+        masked, placeholder_map = model.mask_urls_with_placeholders(annex)
+        model.unmask_urls_from_placeholders(masked, placeholder_map)
+
+    def cache_lookups():
+        for sentence in lookups:
+            check_existing_translation("eng_Latn", sentence, "answer", csv_path=cache_path)
+
+    def cache_appends():
+        for sentence in segments:
+            save_to_csv("eng_Latn", sentence, sentence, "answer", csv_path=append_path)
+
+    return [
+        ("preprocess_text", len(segments), len(nepali),
+         lambda: pipeline._preprocess_text(nepali)),
+        ("mask_unmask_urls_link_heavy", annex.count("\n") + 1, len(annex), mask_and_unmask_urls),
+        ("dictionary_replacements_npi", len(segments), segment_chars,
+         lambda: [model.apply_dictionary_replacements(s, "npi_Deva", "eng_Latn") for s in segments]),
+        ("dictionary_replacements_eng", len(english_segments), sum(map(len, english_segments)),
+         lambda: [model.apply_dictionary_replacements(s, "eng_Latn", "npi_Deva") for s in english_segments]),
+        ("dictionary_replacements_romanized", len(romanized_segments), len(romanized),
+         lambda: [model.apply_dictionary_replacements_romanized(s, "eng_Latn", "npi_Deva")
+                  for s in romanized_segments]),
+        ("replace_with_symspell", len(romanized_segments), len(romanized),
+         lambda: [model.replace_with_symspell(s) for s in romanized_segments]),
+        ("reinsert_and_assemble", len(segments), segment_chars, reinsert_and_assemble),
+        ("translate_sentences_fake_model", len(segments), segment_chars,
+         lambda: pipeline._translate_sentences(segments, "npi_Deva", "eng_Latn", context="answer")),
+        ("translate_sentences_fake_model_fast", len(segments), segment_chars,
+         lambda: pipeline._translate_sentences(segments, "npi_Deva", "eng_Latn", context="answer", mode="fast")),
+        ("postprocess_text", len(segments), segment_chars,
+         lambda: pipeline._postprocess_text(processed, segments, "npi_Deva")),
+        ("cache_lookup", len(lookups), sum(map(len, lookups)), cache_lookups),
+        ("cache_append", len(segments), segment_chars, cache_appends),
+    ]
+
+
+def run_benchmarks(sizes: list[int], repeats: int, seconds_per_token: float = 0.0) -> list[dict]:
+    """Runs every case for every corpus size and returns one result dict per (case, size)."""
+    from translation_model import pipeline
+
+    pipeline.set_translator_model(build_fake_translator_model(seconds_per_token))
+    results = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for size in sizes:
+            for name, segments, chars, fn in build_cases(size, workdir):
+                seconds, peak = _measure(fn, repeats)
+                seconds = max(seconds, 1e-9)
+                results.append({
+                    "case": name,
+                    "size": size,
+                    "segments": segments,
+                    "chars": chars,
+                    "seconds": seconds,
+                    "segments_per_second": segments / seconds,
+                    "chars_per_second": chars / seconds,
+                    "peak_memory_bytes": peak,
+                })
+    return results
+
+
+def find_regressions(results: list[dict], baseline: list[dict], max_regression: float) -> list[str]:
+    """Compares chars/s against a baseline run; returns a message for each regressed case."""
+    previous = {(item["case"], item["size"]): item for item in baseline}
+    regressions = []
+    for item in results:
+        old = previous.get((item["case"], item["size"]))
+        if not old:
+            continue
+        change = item["chars_per_second"] / old["chars_per_second"] - 1
+        if change < -max_regression:
+            regressions.append(
+                f"{item['case']} (size={item['size']}): {old['chars_per_second']:.0f} -> "
+                f"{item['chars_per_second']:.0f} chars/s ({change:+.1%})"
+            )
+    return regressions
+
+
+def print_report(results: list[dict]) -> None:
+    print(f"{'case':<36}{'size':>7}{'segments/s':>14}{'chars/s':>14}{'peak MiB':>10}")
+    for item in results:
+        print(
+            f"{item['case']:<36}{item['size']:>7}"
+            f"{item['segments_per_second']:>14.0f}{item['chars_per_second']:>14.0f}"
+            f"{item['peak_memory_bytes'] / 2**20:>10.2f}"
+        )
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the translation pipeline with fake model backends.")
+    parser.add_argument("--sizes", default="10,100,1000", help="Comma-separated paragraph counts per document.")
+    parser.add_argument("--repeats", type=int, default=3, help="Timed repetitions per case; the best is kept.")
+    parser.add_argument("--seconds-per-token", type=float, default=0.0,
+                        help="Simulated decoding cost of the fake translator.")
+    parser.add_argument("--output", help="Write results as JSON to this path.")
+    parser.add_argument("--baseline", help="JSON results of an earlier run to compare against.")
+    parser.add_argument("--max-regression", type=float, default=0.2,
+                        help="Allowed throughput drop versus the baseline (0.2 = 20%%).")
+    args = parser.parse_args(argv)
+
+    # The pipeline logs every intermediate step at INFO, which would dominate the timings.
+    logging.disable(logging.INFO)
+
+    sizes = [int(size) for size in args.sizes.split(",") if size]
+    results = run_benchmarks(sizes, args.repeats, args.seconds_per_token)
+    print_report(results)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=4)
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            regressions = find_regressions(results, json.load(f), args.max_regression)
+        if regressions:
+            print("\nRegressions:")
+            for message in regressions:
+                print("  " + message)
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,213 @@
+"""
+Adaptive concurrency limit for LLM calls.
+
+Without a limit every document fires its agent calls at Ollama as soon as they are ready.
+Past OLLAMA_NUM_PARALLEL the extra requests wait inside the server, where they only add
+latency; below it the GPU is under-used. AdaptiveLimiter finds the limit at runtime with
+AIMD (additive increase, multiplicative decrease), driven by the time each request spent
+queued inside the server: the latency measured here minus the total_duration Ollama
+reports for the request.
+
+    - queued longer than LLM_QUEUE_DELAY_TARGET_MS, or the server failed (5xx, refused
+      connection): the limit is multiplied by 0.8, at most once per request latency;
+    - otherwise, when the limit was fully used, it grows by about one per limit's worth
+      of completed requests, i.e. by one per round trip.
+
+A cancelled request (a deadline timeout, a client that went away) frees its slot without
+changing the limit.
+
+Over a BalancedAsyncClient, the duplicate of a hedged request takes a slot too, only if one
+is free (otherwise the request is not hedged), and its latency adapts the limit like any other.
+
+Requests above the limit wait here instead, in priority order (lower first, FIFO within a
+priority). The priority is read from the REQUEST_PRIORITY context variable, so a caller sets
+it once (e.g. batch_cli marks its documents PRIORITY_BATCH) and every agent call made from
+that task inherits it.
+
+Metrics: llm_concurrency_limit, llm_in_flight and llm_queue_depth gauges, and
+llm_queue_wait_seconds / ollama_server_queue_seconds samples.
+"""
+import asyncio
+import contextvars
+import heapq
+import itertools
+import os
+import time
+
+import ollama
+from dotenv import load_dotenv
+
+import metrics
+from ollama_balancer import BalancedAsyncClient, is_backend_failure
+
+load_dotenv()
+
+ADAPTIVE_CONCURRENCY = os.getenv("LLM_ADAPTIVE_CONCURRENCY", "1") == "1"
+INITIAL_LIMIT = int(os.getenv("LLM_CONCURRENCY_INITIAL", "4"))
+MIN_LIMIT = int(os.getenv("LLM_CONCURRENCY_MIN", "1"))
+MAX_LIMIT = int(os.getenv("LLM_CONCURRENCY_MAX", "64"))
+QUEUE_DELAY_TARGET_SECONDS = float(os.getenv("LLM_QUEUE_DELAY_TARGET_MS", "200")) / 1000
+BACKOFF_FACTOR = 0.8
+# Only generation requests count against the limit; /api/tags, /api/ps etc. pass through.
+LIMITED_PATHS = {"/api/chat", "/api/generate"}
+
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BATCH = 10
+REQUEST_PRIORITY = contextvars.ContextVar("llm_request_priority", default=PRIORITY_INTERACTIVE)
+
+
+class AdaptiveLimiter:
+    """AIMD concurrency limit with a priority queue for the requests above it (see the module docstring)."""
+
+    def __init__(self, initial: int = INITIAL_LIMIT, min_limit: int = MIN_LIMIT, max_limit: int = MAX_LIMIT,
+                 queue_delay_target: float = QUEUE_DELAY_TARGET_SECONDS):
+        self.limit = float(max(min_limit, min(initial, max_limit)))
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.queue_delay_target = queue_delay_target
+        self.in_flight = 0
+        self._waiters = []
+        self._order = itertools.count()
+        self._last_decrease = 0.0
+        metrics.set_gauge("llm_concurrency_limit", self.limit)
+
+    def _grant(self) -> None:
+        """Lets waiting requests in, best priority first, while there is room under the limit."""
+        while self._waiters and self.in_flight < int(self.limit):
+            _, _, future = heapq.heappop(self._waiters)
+            if future.done():
+                # The waiter was cancelled.
+                continue
+            self.in_flight += 1
+            future.set_result(None)
+        metrics.set_gauge("llm_in_flight", self.in_flight)
+        metrics.set_gauge("llm_queue_depth", len(self._waiters))
+
+    def try_acquire(self) -> bool:
+        """Takes a slot if one is free and nothing is waiting for it, without waiting; returns whether it did."""
+        if self.in_flight < int(self.limit) and not self._waiters:
+            self.in_flight += 1
+            metrics.set_gauge("llm_in_flight", self.in_flight)
+            return True
+        return False
+
+    async def acquire(self, priority: int | None = None) -> None:
+        """Waits for a slot under the limit; priority defaults to REQUEST_PRIORITY."""
+        if priority is None:
+            priority = REQUEST_PRIORITY.get()
+        if self.in_flight < int(self.limit) and not self._waiters:
+            self.in_flight += 1
+            metrics.set_gauge("llm_in_flight", self.in_flight)
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._order), future))
+        metrics.set_gauge("llm_queue_depth", len(self._waiters))
+        started = time.perf_counter()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # The slot was granted just as the caller gave up: hand it on.
+                self.in_flight -= 1
+                self._grant()
+            raise
+        metrics.observe("llm_queue_wait_seconds", time.perf_counter() - started, priority=priority)
+
+    def release(self, latency: float, queue_delay: float | None = None, failed: bool = False,
+                adapt: bool = True) -> None:
+        """
+        Frees the slot of a finished request and adapts the limit from it: its latency in
+        seconds, the time it spent queued in the server (None if unknown) and whether the
+        server failed it. With adapt=False (a cancelled request, e.g. a deadline timeout or a
+        client that went away) the slot is freed but the limit is left as it is: the request
+        says nothing about the server, and counting it as a success would raise the limit
+        exactly when requests are timing out.
+        """
+        saturated = self.in_flight >= int(self.limit) or bool(self._waiters)
+        self.in_flight -= 1
+        if not adapt:
+            self._grant()
+            return
+        now = time.monotonic()
+        if failed or (queue_delay is not None and queue_delay > self.queue_delay_target):
+            # One decrease per round trip: the requests finishing right after this one were
+            # sent under the same conditions and say nothing new.
+            if now - self._last_decrease >= latency:
+                self.limit = max(self.min_limit, self.limit * BACKOFF_FACTOR)
+                self._last_decrease = now
+        elif saturated:
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+        metrics.set_gauge("llm_concurrency_limit", self.limit)
+        self._grant()
+
+    def finish(self, started: float, response=None, failed: bool = False, cancelled: bool = False) -> None:
+        """
+        release() for a request that took its slot at time.perf_counter() == started: the
+        server queue delay is its latency minus the total_duration of the response, if any.
+        """
+        latency = time.perf_counter() - started
+        if cancelled:
+            self.release(latency, adapt=False)
+            return
+        queue_delay = None
+        server_seconds = getattr(response, "total_duration", None)
+        if server_seconds:
+            queue_delay = max(0.0, latency - server_seconds / 1e9)
+            metrics.observe("ollama_server_queue_seconds", queue_delay)
+        self.release(latency, queue_delay, failed=failed)
+
+
+class LimitedAsyncClient(ollama.AsyncClient):
+    """
+    An ollama.AsyncClient that sends its generation requests through another client (a plain
+    AsyncClient or a BalancedAsyncClient) under an AdaptiveLimiter. Like the clients it wraps,
+    use one per event loop.
+    """
+
+    def __init__(self, client: ollama.AsyncClient | None = None, limiter: AdaptiveLimiter | None = None):
+        super().__init__()
+        self.client = client or ollama.AsyncClient()
+        self.limiter = limiter or AdaptiveLimiter()
+        if isinstance(self.client, BalancedAsyncClient):
+            # A hedged request puts a second request on the servers; it takes a slot of its own.
+            self.client.limiter = self.limiter
+
+    def _finish(self, started: float, response=None, error: Exception | None = None,
+                cancelled: bool = False) -> None:
+        self.limiter.finish(started, response, failed=error is not None and is_backend_failure(error),
+                            cancelled=cancelled)
+
+    async def _stream(self, started: float, parts):
+        """Passes a streamed response through, holding the slot until it ends."""
+        last = None
+        try:
+            async for last in parts:
+                yield last
+        except Exception as e:
+            self._finish(started, error=e)
+            raise
+        except BaseException:
+            # Cancelled (or interrupted): free the slot without adapting the limit.
+            self._finish(started, cancelled=True)
+            raise
+        self._finish(started, last)
+
+    async def _request(self, cls, *args, stream: bool = False, **kwargs):
+        if len(args) < 2 or args[1] not in LIMITED_PATHS:
+            return await self.client._request(cls, *args, stream=stream, **kwargs)
+        await self.limiter.acquire()
+        started = time.perf_counter()
+        try:
+            response = await self.client._request(cls, *args, stream=stream, **kwargs)
+        except Exception as e:
+            self._finish(started, error=e)
+            raise
+        except BaseException:
+            # Cancelled (or interrupted): free the slot without adapting the limit.
+            self._finish(started, cancelled=True)
+            raise
+        if stream:
+            return self._stream(started, response)
+        self._finish(started, response)
+        return response
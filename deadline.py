@@ -0,0 +1,106 @@
+"""
+Per-request time budgets for process_legal_document, with a degraded mode.
+
+A Deadline is the time budget of one document. Before its expensive step, each pipeline
+stage compares the time left with how long the step usually takes (the p90 of its recent
+full-path runs, or DEFAULT_STAGE_SECONDS until there are enough samples), keeping enough
+for the stages after it, and takes a cheaper path when the budget is short:
+
+    small_model       clause extraction on SMALL_TEXT_MODEL (only when it is set)
+    partial_clauses   clause extraction stopped after the chunks done so far
+    keyword_risks     the risky keywords found in the clauses instead of RiskAnalysisAgent
+    short_summary     a brief summary (BriefSummarizerAgent, 256 tokens) instead of the full one
+    clauses_only      the extracted clauses instead of a summary (the summary ran out of time)
+    fast_translation  the Nepali summary translated in the fast (greedy) mode
+
+The risk analysis and the summary are also stopped when they run past the budget, and
+fall back to keyword_risks and clauses_only, so a request under load still returns a
+result on time, with less depth. The degradations applied are listed in
+Deadline.degradations (and counted in the pipeline_degradations metric).
+
+PIPELINE_DEADLINE_SECONDS sets the default budget; unset (or 0) means no deadline.
+"""
+import asyncio
+import logging
+import math
+import os
+import time
+
+from dotenv import load_dotenv
+
+import metrics
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DEADLINE_SECONDS = float(os.getenv("PIPELINE_DEADLINE_SECONDS", "0")) or None
+# Expected seconds of each stage's full path until MIN_SAMPLES runs have been measured.
+DEFAULT_STAGE_SECONDS = {
+    "clause_extraction": 30.0,
+    "risk_analysis": 15.0,
+    "clause_summary": 15.0,
+    "translate_output": 10.0,
+}
+MIN_SAMPLES = 5
+EXPECTED_PERCENTILE = 90
+STAGE_SECONDS_METRIC = "deadline_stage_seconds"
+
+DEGRADATIONS = {
+    "small_model": "clauses extracted with the small model",
+    "partial_clauses": "only the first part of the document was reviewed",
+    "keyword_risks": "risks listed from keyword matches, without analysis",
+    "short_summary": "shortened summary",
+    "clauses_only": "extracted clauses shown instead of a summary",
+    "fast_translation": "fast translation",
+}
+
+
+def expected_seconds(stage: str) -> float:
+    """Returns how long the full path of a stage usually takes (see the module docstring)."""
+    samples = metrics.samples(STAGE_SECONDS_METRIC, stage=stage)
+    if len(samples) < MIN_SAMPLES:
+        return DEFAULT_STAGE_SECONDS.get(stage, 0.0)
+    return metrics.percentile(samples, EXPECTED_PERCENTILE)
+
+
+def observe_stage(stage: str, seconds: float) -> None:
+    """Records the duration of a stage's full (not degraded) path for expected_seconds."""
+    metrics.observe(STAGE_SECONDS_METRIC, seconds, stage=stage)
+
+
+class Deadline:
+    """The time budget of one request and the degradations applied to meet it."""
+
+    def __init__(self, seconds: float | None = DEFAULT_DEADLINE_SECONDS):
+        self.seconds = seconds
+        self.expires_at = time.monotonic() + seconds if seconds else None
+        self.degradations = []
+
+    def remaining(self) -> float:
+        """Seconds left (infinite without a deadline)."""
+        if self.expires_at is None:
+            return math.inf
+        return self.expires_at - time.monotonic()
+
+    def allows(self, stage: str, reserve: float = 0.0) -> bool:
+        """Whether the full path of the stage fits in the time left, keeping reserve seconds for later stages."""
+        return self.remaining() - reserve >= expected_seconds(stage)
+
+    def degrade(self, name: str) -> None:
+        """Records a degradation (one of DEGRADATIONS)."""
+        if name in self.degradations:
+            return
+        logger.info("Deadline of %ss: %s", self.seconds, DEGRADATIONS[name])
+        self.degradations.append(name)
+        metrics.increment("pipeline_degradations", kind=name)
+
+    def describe(self) -> str:
+        """Returns the degradations applied, in words, or an empty string."""
+        return "; ".join(DEGRADATIONS[name] for name in self.degradations)
+
+    async def run(self, awaitable, reserve: float = 0.0):
+        """Awaits awaitable, cancelling it with TimeoutError once only reserve seconds are left."""
+        if self.expires_at is None:
+            return await awaitable
+        return await asyncio.wait_for(awaitable, max(0.0, self.remaining() - reserve))
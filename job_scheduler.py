@@ -0,0 +1,134 @@
+"""
+Shortest-job-first scheduling of queued documents, with aging.
+
+With first-come-first-served, a one-page NDA queued behind a 300-page contract waits for
+the whole contract. JobScheduler runs at most max_running documents at a time and, whenever
+one finishes, starts the waiting job with the lowest estimated cost, minus an allowance for
+the time it has waited so far, so a large job is not postponed forever:
+
+    effective cost = estimated cost - AGING_TOKENS_PER_SECOND * seconds waited
+
+The cost estimate (estimate_job) is in tokens of work and comes from the document itself:
+its extracted text (token count and Nepali share, since Nepali text goes through NLLB
+first), its page count, and whether the summary has to be translated. Extracting the text is
+the first step of the pipeline anyway; pass it on as process_legal_document(parsed_text=...)
+so the document is not read twice.
+
+Metrics: scheduler_queue_depth and scheduler_running gauges, scheduler_wait_seconds and
+scheduler_job_cost samples.
+"""
+import asyncio
+import heapq
+import itertools
+import os
+import pathlib
+import time
+from contextlib import asynccontextmanager
+
+from dotenv import load_dotenv
+
+import metrics
+from model_adapter import estimate_tokens
+from translation_model.script_profile import profile_script
+
+load_dotenv()
+
+# Cost model, in tokens of work.
+TRANSLATION_COST_FACTOR = float(os.getenv("SCHEDULER_TRANSLATION_COST_FACTOR", "3"))
+PAGE_COST_TOKENS = 100
+# The text of an image is only known after the vision model has read it.
+IMAGE_COST_TOKENS = 2000
+# A Nepali summary goes through NLLB after the agents.
+OUTPUT_TRANSLATION_COST_TOKENS = 1000
+AGING_TOKENS_PER_SECOND = float(os.getenv("SCHEDULER_AGING_TOKENS_PER_SECOND", "100"))
+TOKENS_PER_PAGE = 500
+
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".bmp", ".tiff"}
+
+
+def _page_count(document_path: str, tokens: int) -> int:
+    """Pages of a PDF, or an estimate from the text length for other formats."""
+    if pathlib.Path(document_path).suffix.lower() == ".pdf":
+        import pymupdf
+
+        with pymupdf.open(document_path) as document:
+            return document.page_count
+    return max(1, tokens // TOKENS_PER_PAGE)
+
+
+def estimate_job(document_path: str, language: str = "english") -> dict:
+    """
+    Estimates the cost of processing a document, extracting its text on the way
+    (except for images, which need the vision model).
+
+    Returns:
+        dict: pages, tokens, nepali_ratio (Devanagari share of its letters), cost (tokens of
+        work) and text (the extracted text, or None for images).
+    """
+    from parse import extract_text
+
+    if pathlib.Path(document_path).suffix.lower() in IMAGE_EXTENSIONS:
+        text, tokens, pages, nepali_ratio = None, 0, 1, 0.0
+        cost = IMAGE_COST_TOKENS
+    else:
+        text = extract_text(document_path)
+        tokens = estimate_tokens(text)
+        pages = _page_count(document_path, tokens)
+        nepali_ratio = profile_script(text)["devanagari_ratio"]
+        cost = tokens * (1 + nepali_ratio * TRANSLATION_COST_FACTOR) + pages * PAGE_COST_TOKENS
+    if language.lower() == "nepali":
+        cost += OUTPUT_TRANSLATION_COST_TOKENS
+    metrics.observe("scheduler_job_cost", cost)
+    return {"pages": pages, "tokens": tokens, "nepali_ratio": round(nepali_ratio, 3), "cost": cost, "text": text}
+
+
+class JobScheduler:
+    """Runs at most max_running jobs at a time; waiting jobs start shortest first, with aging."""
+
+    def __init__(self, max_running: int, aging_tokens_per_second: float = AGING_TOKENS_PER_SECOND):
+        self.max_running = max_running
+        self.aging_tokens_per_second = aging_tokens_per_second
+        self.running = 0
+        self._waiting = []
+        self._order = itertools.count()
+
+    def _start_next(self) -> None:
+        while self._waiting and self.running < self.max_running:
+            _, _, future = heapq.heappop(self._waiting)
+            if future.done():
+                # The waiting job was cancelled.
+                continue
+            self.running += 1
+            future.set_result(None)
+        metrics.set_gauge("scheduler_queue_depth", len(self._waiting))
+        metrics.set_gauge("scheduler_running", self.running)
+
+    @asynccontextmanager
+    async def slot(self, cost: float):
+        """
+        Waits until the job with this estimated cost may run, and holds its slot inside the block.
+        """
+        submitted = time.monotonic()
+        if self.running < self.max_running and not self._waiting:
+            self.running += 1
+            metrics.set_gauge("scheduler_running", self.running)
+        else:
+            # The effective cost at time t is cost - aging * (t - submitted); ordering by it at
+            # any t is the same as ordering by this key, so the heap never needs rebuilding.
+            key = cost + self.aging_tokens_per_second * submitted
+            future = asyncio.get_running_loop().create_future()
+            heapq.heappush(self._waiting, (key, next(self._order), future))
+            metrics.set_gauge("scheduler_queue_depth", len(self._waiting))
+            try:
+                await future
+            except asyncio.CancelledError:
+                if future.done() and not future.cancelled():
+                    self.running -= 1
+                    self._start_next()
+                raise
+        metrics.observe("scheduler_wait_seconds", time.monotonic() - submitted)
+        try:
+            yield
+        finally:
+            self.running -= 1
+            self._start_next()
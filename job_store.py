@@ -0,0 +1,107 @@
+"""
+File-based store for API jobs, shared by every uvicorn worker process.
+
+Each job is a directory under JOB_STORE_DIR:
+    <job id>/job.json       job record (status, language, result, error, timestamps)
+    <job id>/events.jsonl   one JSON line per event (stage results, done, failed, cancelled)
+    <job id>/cancel         present once cancellation of the job has been requested
+    <job id>/<upload>       the uploaded document
+
+A job is written only by the worker process running it: job.json is replaced atomically
+and events are appended one line at a time, so any worker can serve polling and event
+streams by reading the files. Other workers ask for a job to be cancelled by creating its
+cancel file, which the running worker polls for.
+"""
+import json
+import os
+import time
+import uuid
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+JOB_STORE_DIR = os.getenv("JOB_STORE_DIR", "jobs")
+
+TERMINAL_STATUSES = {"done", "failed", "cancelled"}
+
+
+class JobStore:
+    """Creates, updates and reads jobs under a root directory."""
+
+    def __init__(self, root: str = JOB_STORE_DIR):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def _job_dir(self, job_id: str) -> str:
+        # Job ids are uuid4 hex strings; anything else could escape the root directory.
+        if not job_id.isalnum():
+            raise KeyError(job_id)
+        return os.path.join(self.root, job_id)
+
+    def create(self, **fields) -> str:
+        """Creates a queued job with the given fields and returns its id."""
+        job_id = uuid.uuid4().hex
+        os.makedirs(self._job_dir(job_id))
+        now = time.time()
+        self._write(job_id, {"job_id": job_id, "status": "queued", "created_at": now, "updated_at": now, **fields})
+        return job_id
+
+    def document_path(self, job_id: str, filename: str) -> str:
+        """Path where the job's uploaded document is stored."""
+        return os.path.join(self._job_dir(job_id), "document" + os.path.splitext(filename)[1].lower())
+
+    def _write(self, job_id: str, job: dict) -> None:
+        path = os.path.join(self._job_dir(job_id), "job.json")
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(job, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    def get(self, job_id: str) -> dict:
+        """Returns the job record; raises KeyError for an unknown job."""
+        try:
+            with open(os.path.join(self._job_dir(job_id), "job.json"), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            raise KeyError(job_id) from None
+
+    def update(self, job_id: str, **fields) -> dict:
+        """Updates fields of the job record and returns it."""
+        job = self.get(job_id)
+        job.update(fields, updated_at=time.time())
+        self._write(job_id, job)
+        return job
+
+    def append_event(self, job_id: str, event: str, data: dict) -> None:
+        """Appends an event to the job's event log."""
+        line = json.dumps({"event": event, "data": data, "time": time.time()}, ensure_ascii=False)
+        with open(os.path.join(self._job_dir(job_id), "events.jsonl"), "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+    def request_cancel(self, job_id: str) -> None:
+        """Asks the worker running the job to cancel it; raises KeyError for an unknown job."""
+        try:
+            open(os.path.join(self._job_dir(job_id), "cancel"), "a").close()
+        except FileNotFoundError:
+            raise KeyError(job_id) from None
+
+    def cancel_requested(self, job_id: str) -> bool:
+        """Whether cancellation of the job has been requested (see request_cancel)."""
+        return os.path.exists(os.path.join(self._job_dir(job_id), "cancel"))
+
+    def read_events(self, job_id: str, offset: int = 0) -> tuple[list[dict], int]:
+        """
+        Returns the complete events written after byte `offset`, and the offset to continue from.
+        A line that is still being written is left for the next read.
+        """
+        path = os.path.join(self._job_dir(job_id), "events.jsonl")
+        try:
+            with open(path, "rb") as f:
+                f.seek(offset)
+                chunk = f.read()
+        except FileNotFoundError:
+            return [], offset
+        end = chunk.rfind(b"\n") + 1
+        events = [json.loads(line) for line in chunk[:end].decode("utf-8").split("\n") if line]
+        return events, offset + end
@@ -1,4 +1,10 @@
 # markdown_loader.py
+#
+# Every task is a fixed instruction block followed by the variable content, last and with
+# nothing after it. With the agent's system message in front, all calls of a stage (e.g. the
+# chunks of a long document) share a byte-identical prefix that the Ollama server can serve
+# from its prompt cache instead of prefilling it again. Keep variable text out of the
+# instruction block.
 
 def load_markdown(path: str) -> str:
     """
@@ -18,8 +24,8 @@ def get_clause_extraction_task(document_text: str) -> str:
     Generates a prompt for the ClauseExtractorAgent to extract key legal clauses
     from the provided document text.
 
-    The agent is instructed to return only the exact text of each clause without
-    summaries, interpretations, or extra formatting.
+    The agent's system message already asks for the clauses only, without summaries or
+    commentary; the task adds the list of clauses to look for.
 
     Parameters:
         document_text (str): The full legal document content in text format.
@@ -28,13 +34,7 @@ def get_clause_extraction_task(document_text: str) -> str:
         str: A formatted prompt string instructing clause extraction.
     """
 
-    return f"""
-You are a legal clause extractor.
-
-Your job is to extract the following essential clauses from the legal document.
-Return only the exact text of each clause — no summaries, interpretations, or commentary.
-
-Clauses to extract:
+    return f"""Extract the following essential clauses from the legal document, returning the exact text of each:
 - Parties involved
 - Effective date and term
 - Purpose / Scope
@@ -54,8 +54,7 @@ Clauses to extract:
 - Signatures and execution
 
 Document:
-{document_text}
-"""
+{document_text}"""
 
 def get_risk_analysis_task(extracted_clauses: str) -> str:
     """
@@ -68,39 +67,41 @@ def get_risk_analysis_task(extracted_clauses: str) -> str:
     Returns:
         str: A formatted prompt string instructing risk evaluation in bullet-point form.
     """
-    return f"""
-You are a legal risk analysis agent.
-
-Analyze the following legal clauses and identify potential risks based on dangerous or vague terms such as:
-- Termination
-- Penalty
-- Indemnify
-- Liability
-- Compensation
-- Damages
-
+    return f"""Analyze these legal clauses for risks, paying attention to dangerous or vague terms such as termination, penalty, indemnify, liability, compensation and damages.
 Return your analysis in short bullet points.
 
 Clauses:
-{extracted_clauses}
-"""
+{extracted_clauses}"""
 
 def get_summary_task(content: str) -> str:
     """
-    Generates a prompt for the SummarizerAgent to summarize the combined legal clauses
-    and risk analysis in simple, plain English for a non-lawyer audience.
+    Generates a prompt for the SummarizerAgent to summarize the extracted legal clauses
+    in simple, plain English for a non-lawyer audience. The risk analysis runs in
+    parallel and is merged into the summary afterwards.
 
     Parameters:
-        content (str): Combined text of clauses and risk analysis.
+        content (str): Text of the extracted clauses.
 
     Returns:
         str: A formatted prompt string instructing summarization.
     """
-    return f"""
-You are a legal summarizer.
+    return f"""Summarize these legal clauses in simple, plain English for a non-lawyer audience.
+
+Content:
+{content}"""
+
+def get_brief_summary_task(content: str) -> str:
+    """
+    Generates a prompt for a short plain English summary of the extracted legal clauses,
+    used instead of get_summary_task when a request is short of time (see deadline.py).
 
-Summarize the following legal clauses and risk notes in simple, plain English for a non-lawyer audience. Avoid legal jargon.
+    Parameters:
+        content (str): Text of the extracted clauses.
+
+    Returns:
+        str: A formatted prompt string instructing a brief summary.
+    """
+    return f"""Summarize these legal clauses in simple, plain English for a non-lawyer audience, in at most five short bullet points.
 
 Content:
-{content}
-"""
+{content}"""
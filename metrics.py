@@ -0,0 +1,106 @@
+"""
+Lightweight in-process metrics: counters, gauges and latency samples.
+
+Every metric is identified by a name plus optional labels, e.g.
+    metrics.observe("stage_seconds", 1.2, stage="clause_extraction")
+
+Samples are kept in a bounded window per series so percentiles can be reported
+by the load-testing tools and the service without an external metrics backend.
+"""
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+
+MAX_SAMPLES = 10000
+
+_lock = threading.Lock()
+_counters = defaultdict(float)
+_gauges = {}
+_samples = defaultdict(lambda: deque(maxlen=MAX_SAMPLES))
+
+
+def _series(name: str, labels: dict) -> str:
+    """Formats a series key like 'stage_seconds{stage=parse}'."""
+    if not labels:
+        return name
+    label_text = ",".join(f"{key}={labels[key]}" for key in sorted(labels))
+    return f"{name}{{{label_text}}}"
+
+
+def increment(name: str, value: float = 1, **labels) -> None:
+    """Adds value to a counter."""
+    with _lock:
+        _counters[_series(name, labels)] += value
+
+
+def set_gauge(name: str, value: float, **labels) -> None:
+    """Sets a gauge to the given value."""
+    with _lock:
+        _gauges[_series(name, labels)] = value
+
+
+def observe(name: str, value: float, **labels) -> None:
+    """Records one sample (e.g. a latency in seconds) for a summary metric."""
+    with _lock:
+        _samples[_series(name, labels)].append(value)
+
+
+@contextmanager
+def timer(name: str, **labels):
+    """Context manager that observes the elapsed wall time in seconds."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(name, time.perf_counter() - start, **labels)
+
+
+def percentile(values: list[float], q: float) -> float:
+    """Returns the q-th percentile (0-100) of values using nearest-rank."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, int(round(q / 100 * len(ordered))) - 1))
+    return ordered[rank]
+
+
+def summarize(values: list[float]) -> dict:
+    """Returns count, mean and p50/p95/p99/max of a list of samples."""
+    if not values:
+        return {"count": 0, "mean": 0.0, "p50": 0.0, "p95": 0.0, "p99": 0.0, "max": 0.0}
+    return {
+        "count": len(values),
+        "mean": sum(values) / len(values),
+        "p50": percentile(values, 50),
+        "p95": percentile(values, 95),
+        "p99": percentile(values, 99),
+        "max": max(values),
+    }
+
+
+def samples(name: str, **labels) -> list[float]:
+    """Returns a copy of the recorded samples for one series."""
+    with _lock:
+        return list(_samples.get(_series(name, labels), ()))
+
+
+def snapshot() -> dict:
+    """Returns all counters, gauges and sample summaries keyed by series."""
+    with _lock:
+        counters = dict(_counters)
+        gauges = dict(_gauges)
+        series = {key: list(values) for key, values in _samples.items()}
+    return {
+        "counters": counters,
+        "gauges": gauges,
+        "summaries": {key: summarize(values) for key, values in series.items()},
+    }
+
+
+def reset() -> None:
+    """Clears every metric (used between benchmark runs)."""
+    with _lock:
+        _counters.clear()
+        _gauges.clear()
+        _samples.clear()
@@ -1,34 +1,252 @@
 import asyncio
-from autogen_ext.models.semantic_kernel import SKChatCompletionAdapter
-from semantic_kernel import Kernel
-from semantic_kernel.connectors.ai.ollama import OllamaChatCompletion, OllamaChatPromptExecutionSettings
-from semantic_kernel.memory.null_memory import NullMemory
+import concurrent.futures
+from functools import lru_cache
+import json
+import logging
 from dotenv import load_dotenv
 import os
 
+import metrics
+
 load_dotenv()
 
-async def get_model_client():
+logger = logging.getLogger(__name__)
+
+# Models served by Ollama. The vision model is only needed to read images; every text
+# stage runs on the faster text-only model.
+VISION_MODEL = os.getenv("VISION_MODEL", "llama3.2-vision:11b")
+TEXT_MODEL = os.getenv("TEXT_MODEL", "llama3.1:8b")
+# Optional small model for short inputs (e.g. "llama3.2:3b"); unset disables it.
+SMALL_TEXT_MODEL = os.getenv("SMALL_TEXT_MODEL")
+SMALL_INPUT_MAX_TOKENS = int(os.getenv("SMALL_INPUT_MAX_TOKENS", "512"))
+
+# Agent / stage -> "vision" or "text".
+STAGE_MODEL_KINDS = {
+    "image_parse": "vision",
+    "ClauseExtractorAgent": "text",
+    "RiskAnalysisAgent": "text",
+    "SummarizerAgent": "text",
+    "BriefSummarizerAgent": "text",
+}
+
+
+# Generation profile per agent: output token cap (num_predict), stop sequences and how long
+# Ollama keeps the model loaded after the call (keep_alive). The context window (num_ctx) is
+# sized per request from the prompt, see context_window, unless the profile pins it with a
+# "num_ctx" field. Override any field per agent with a JSON object in GENERATION_PROFILES,
+# e.g. {"SummarizerAgent": {"num_predict": 300}, "ClauseExtractorAgent": {"num_ctx": 8192}}.
+OLLAMA_KEEP_ALIVE = os.getenv("OLLAMA_KEEP_ALIVE", "30m")
+# The prompts are plain text (Ollama applies the chat template). The Llama 3 end-of-turn tokens
+# are still sent as stop sequences because TEXT_MODEL / SMALL_TEXT_MODEL may be a model created
+# without them in its Modelfile (e.g. an imported GGUF), which would then write a new turn until
+# num_predict. A "stop" option replaces the Modelfile's stop list rather than extending it, so
+# overrides must keep these two; profiles with "stop": [] send none and keep the Modelfile's.
+DEFAULT_STOP = ["<|eot_id|>", "<|start_header_id|>"]
+GENERATION_PROFILES = {
+    "image_parse": {"num_predict": 2048, "stop": [], "keep_alive": OLLAMA_KEEP_ALIVE},
+    "ClauseExtractorAgent": {"num_predict": 1536, "stop": DEFAULT_STOP, "keep_alive": OLLAMA_KEEP_ALIVE},
+    "RiskAnalysisAgent": {"num_predict": 512, "stop": DEFAULT_STOP, "keep_alive": OLLAMA_KEEP_ALIVE},
+    "SummarizerAgent": {"num_predict": 768, "stop": DEFAULT_STOP, "keep_alive": OLLAMA_KEEP_ALIVE},
+    # The shorter summary of the degraded mode (see deadline.py).
+    "BriefSummarizerAgent": {"num_predict": 256, "stop": DEFAULT_STOP, "keep_alive": OLLAMA_KEEP_ALIVE},
+}
+for _stage, _overrides in json.loads(os.getenv("GENERATION_PROFILES") or "{}").items():
+    GENERATION_PROFILES[_stage] = {**GENERATION_PROFILES.get(_stage, GENERATION_PROFILES["SummarizerAgent"]),
+                                   **_overrides}
+
+# Context windows are rounded up to one of these sizes, so that a model is reloaded for a
+# few distinct num_ctx values only (Ollama reloads the model whenever num_ctx changes).
+NUM_CTX_BUCKETS = sorted(int(size) for size in os.getenv("NUM_CTX_BUCKETS", "2048,4096,8192,16384").split(","))
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count of the text for sizing decisions (about four characters per token)."""
+    return len(text) // 4 + 1
+
+
+def select_model(stage: str, text: str = "", prefer_small: bool = False) -> str:
+    """
+    Returns the model for a stage or agent name: the vision model for image parsing,
+    otherwise the text model, or SMALL_TEXT_MODEL when it is set and the input is short
+    (or prefer_small is set, e.g. to meet a deadline).
+    The choice is counted in the model_requests metric.
+    """
+    if STAGE_MODEL_KINDS.get(stage, "text") == "vision":
+        model = VISION_MODEL
+    elif SMALL_TEXT_MODEL and (prefer_small or text and estimate_tokens(text) <= SMALL_INPUT_MAX_TOKENS):
+        model = SMALL_TEXT_MODEL
+    else:
+        model = TEXT_MODEL
+    metrics.increment("model_requests", stage=stage, model=model)
+    return model
+
+
+def generation_profile(stage: str) -> dict:
+    """Returns the generation profile of a stage or agent (the SummarizerAgent one for unknown names)."""
+    return GENERATION_PROFILES.get(stage, GENERATION_PROFILES["SummarizerAgent"])
+
+
+def context_window(prompt_tokens: int, num_predict: int) -> int:
+    """
+    Returns the num_ctx for a request: the smallest NUM_CTX_BUCKETS size that fits the prompt
+    and the output cap, or the largest size (Ollama then truncates the start of the prompt).
+    """
+    needed = prompt_tokens + num_predict
+    for size in NUM_CTX_BUCKETS:
+        if needed <= size:
+            return size
+    logger.warning("Prompt of ~%d tokens does not fit num_ctx %d; it will be truncated",
+                   prompt_tokens, NUM_CTX_BUCKETS[-1])
+    return NUM_CTX_BUCKETS[-1]
+
+
+def generation_options(stage: str, prompt: str = "") -> dict:
+    """
+    Returns the Ollama request settings for a stage and its full prompt (system message and
+    task): {"options": {temperature, num_ctx, num_predict, stop}, "keep_alive": ...}.
+    Pinning num_ctx in a profile keeps one loaded model (and its prompt cache) for every
+    call of the stage, whatever the prompt size; Ollama reloads the model when it changes.
+    """
+    profile = generation_profile(stage)
+    num_ctx = profile.get("num_ctx") or context_window(estimate_tokens(prompt), profile["num_predict"])
+    metrics.observe("num_ctx", num_ctx, stage=stage)
+    options = {"temperature": 0.1, "num_ctx": num_ctx, "num_predict": profile["num_predict"]}
+    if profile["stop"]:
+        options["stop"] = list(profile["stop"])
+    return {"options": options, "keep_alive": profile["keep_alive"]}
+
+
+@lru_cache(maxsize=None)
+def _ollama_classes():
+    """
+    Semantic Kernel's Ollama settings have no keep_alive field, and the connector rebuilds the
+    settings from its own settings class on every call, dropping unknown fields. These
+    subclasses add the field and make the connector keep it.
+    """
+    from semantic_kernel.connectors.ai.ollama import OllamaChatCompletion, OllamaChatPromptExecutionSettings
+
+    class KeepAliveOllamaSettings(OllamaChatPromptExecutionSettings):
+        keep_alive: str | float | None = None
+
+    class KeepAliveOllamaChatCompletion(OllamaChatCompletion):
+        def get_prompt_execution_settings_class(self):
+            return KeepAliveOllamaSettings
+
+    return KeepAliveOllamaChatCompletion, KeepAliveOllamaSettings
+
+
+async def get_model_client(model: str = VISION_MODEL, generation: dict | None = None, sk_client=None):
     """
     Initializes and returns an asynchronous model client for use in Autogen agents,
-    using the LLaMA 3.2 Vision 11B model served via Ollama and Semantic Kernel.
+    using the given Ollama model (LLaMA 3.2 Vision 11B by default) via Semantic Kernel.
 
     The client is wrapped in a Semantic Kernel ChatCompletionAdapter with:
-        - LLaMA3.2-vision:11b as the model backend
-        - Low temperature (0.1) for deterministic responses
+        - the given model as the backend
+        - the given generation settings (see generation_options), or just a low
+          temperature (0.1) for deterministic responses
         - Null memory (no context retention across invocations)
 
+    Pass an existing Ollama connector as sk_client to reuse its HTTP connections.
+
     Returns:
         SKChatCompletionAdapter: A model client compatible with Autogen agents.
+
+    Semantic Kernel takes seconds to import, so it is imported here, on first use,
+    instead of at module import.
     """
-    sk_client = OllamaChatCompletion(
-        ai_model_id="llama3.2-vision:11b",
-    )
-    ollama_settings = OllamaChatPromptExecutionSettings(
-        options={"temperature": 0.1},
-    )
+    from autogen_ext.models.semantic_kernel import SKChatCompletionAdapter
+    from semantic_kernel import Kernel
+    from semantic_kernel.memory.null_memory import NullMemory
+
+    chat_completion_class, settings_class = _ollama_classes()
+    if sk_client is None:
+        sk_client = chat_completion_class(
+            ai_model_id=model,
+        )
+    ollama_settings = settings_class(**(generation or {"options": {"temperature": 0.1}}))
 
     model_client = SKChatCompletionAdapter(
         sk_client, kernel=Kernel(memory=NullMemory()), prompt_settings=ollama_settings
     )
-    return model_client
\ No newline at end of file
+    return model_client
+
+
+class ModelRouter:
+    """
+    Hands out the model client for each agent (see select_model), with the agent's generation
+    profile and a context window sized to the prompt (see generation_options). Clients share
+    one Ollama connector per model and are cached per (model, stage, num_ctx), so a router
+    holds a handful of them. Share one router across documents to share the clients, but
+    not across event loops.
+    """
+
+    def __init__(self):
+        self.connectors = {}
+        self.clients = {}
+        self._lock = asyncio.Lock()
+        # The event loop the router's clients belong to, for chat_from_thread.
+        try:
+            self.loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self.loop = None
+        # With OLLAMA_HOSTS set, every connector of the router sends its requests through one
+        # load balancer over those servers (see ollama_balancer.py); otherwise to OLLAMA_HOST.
+        # Either way, one adaptive concurrency limit covers all of the router's calls
+        # (see concurrency_limiter.py) unless LLM_ADAPTIVE_CONCURRENCY=0.
+        self.ollama_client = None
+        if os.getenv("OLLAMA_HOSTS"):
+            from ollama_balancer import BalancedAsyncClient
+
+            self.ollama_client = BalancedAsyncClient()
+        if os.getenv("LLM_ADAPTIVE_CONCURRENCY", "1") == "1":
+            from concurrency_limiter import LimitedAsyncClient
+
+            self.ollama_client = LimitedAsyncClient(self.ollama_client)
+
+    async def client_for(self, stage: str, text: str = "", system_message: str = "", prefer_small: bool = False):
+        """
+        Returns the model client for a stage or agent, given its input text and system message;
+        prefer_small picks SMALL_TEXT_MODEL (if set) whatever the input size.
+        """
+        self.loop = asyncio.get_running_loop()
+        model = select_model(stage, text, prefer_small)
+        generation = generation_options(stage, system_message + text)
+        key = (model, stage, generation["options"]["num_ctx"])
+        async with self._lock:
+            if key not in self.clients:
+                if model not in self.connectors:
+                    self.connectors[model] = _ollama_classes()[0](ai_model_id=model, client=self.ollama_client)
+                self.clients[key] = await get_model_client(model, generation, sk_client=self.connectors[model])
+        return self.clients[key]
+
+    async def chat(self, stage: str, messages: list[dict], text: str = ""):
+        """
+        Sends one chat request for a stage straight to Ollama (no agent), with the stage's
+        model and generation profile, through the router's client: the same load balancer and
+        concurrency limit as the agents' calls. text is the prompt, for sizing the context.
+        """
+        self.loop = asyncio.get_running_loop()
+        if self.ollama_client is None:
+            import ollama
+
+            self.ollama_client = ollama.AsyncClient()
+        return await self.ollama_client.chat(model=select_model(stage, text), messages=messages,
+                                             **generation_options(stage, text))
+
+    def chat_from_thread(self, stage: str, messages: list[dict], text: str = "", cancellation_token=None):
+        """
+        chat() for code running in a worker thread (e.g. parsing in asyncio.to_thread): the
+        request runs on the router's event loop and the thread waits for its response.
+        The caller's context (e.g. REQUEST_PRIORITY) goes with it, and cancelling
+        cancellation_token cancels the request.
+        """
+        if self.loop is None:
+            raise RuntimeError("chat_from_thread needs the router to be used on an event loop first")
+        future = asyncio.run_coroutine_threadsafe(self.chat(stage, messages, text), self.loop)
+        if cancellation_token is not None:
+            cancellation_token.link_future(future)
+        try:
+            return future.result()
+        except concurrent.futures.CancelledError:
+            # Raised like translator.check_cancelled does, for the pipeline's cancellation path.
+            raise asyncio.CancelledError() from None
@@ -0,0 +1,131 @@
+"""
+Prompt registry: the system message and task builder of every agent, in one place.
+
+render() returns the (system message, task) pair an agent is called with and records the
+estimated prompt size per stage in the prompt_tokens_estimate metric before the call is sent.
+The actual token counts reported by Ollama (prompt_eval_count / eval_count, which autogen
+passes on as models_usage) are recorded after each call by record_usage()
+(llm_prompt_tokens / llm_completion_tokens).
+
+Both also add to a TokenUsage when given one: process_legal_document keeps one per document
+in its pipeline context, so the tokens a document cost, per stage and in total, are known
+when it is done (document_prompt_tokens / document_completion_tokens, and the
+"token_usage" of batch records and API jobs).
+
+To see what each stage pays in prefill for a document:
+    python -m model_prompt.registry path/to/parsed_document.txt
+"""
+import sys
+import threading
+
+import metrics
+from markdown_loader import (
+    get_brief_summary_task,
+    get_clause_extraction_task,
+    get_risk_analysis_task,
+    get_summary_task,
+)
+from model_adapter import estimate_tokens
+from model_prompt.prompt_agents import (
+    prompt_ClauseExtractorAgent,
+    prompt_ImageParse,
+    prompt_RiskAnalysisAgent,
+    prompt_SummarizerAgent,
+)
+
+# Agent or stage name -> (system message, task builder taking the stage's input text).
+PROMPTS = {
+    "image_parse": ("", lambda content: prompt_ImageParse),
+    "ClauseExtractorAgent": (prompt_ClauseExtractorAgent, get_clause_extraction_task),
+    "RiskAnalysisAgent": (prompt_RiskAnalysisAgent, get_risk_analysis_task),
+    "SummarizerAgent": (prompt_SummarizerAgent, get_summary_task),
+    "BriefSummarizerAgent": (prompt_SummarizerAgent, get_brief_summary_task),
+}
+
+
+class TokenUsage:
+    """
+    The tokens of one request's model calls (e.g. one document), per stage: the estimated
+    prompt size (render) and the prompt and completion tokens Ollama reported (record_usage).
+    Calls may be recorded from worker threads (image parsing).
+    """
+
+    def __init__(self):
+        self.stages = {}
+        self._lock = threading.Lock()
+
+    def _add(self, agent: str, **counts: int) -> None:
+        with self._lock:
+            stage = self.stages.setdefault(
+                agent, {"calls": 0, "estimated_prompt_tokens": 0, "prompt_tokens": 0, "completion_tokens": 0})
+            for name, count in counts.items():
+                stage[name] += count
+
+    def as_dict(self) -> dict:
+        """Returns the per-stage counts and the reported totals, for job records and logs."""
+        with self._lock:
+            stages = {agent: dict(stage) for agent, stage in self.stages.items()}
+        return {
+            "prompt_tokens": sum(stage["prompt_tokens"] for stage in stages.values()),
+            "completion_tokens": sum(stage["completion_tokens"] for stage in stages.values()),
+            "stages": stages,
+        }
+
+
+def prompt_tokens(agent: str, content: str = "") -> dict:
+    """Returns the estimated tokens of an agent's system message, of its task for the content, and their total."""
+    system_message, task = build(agent, content)
+    system_tokens = estimate_tokens(system_message)
+    task_tokens = estimate_tokens(task)
+    return {"system": system_tokens, "task": task_tokens, "total": system_tokens + task_tokens}
+
+
+def build(agent: str, content: str) -> tuple[str, str]:
+    """Returns the system message and the task for an agent and its input text."""
+    system_message, build_task = PROMPTS[agent]
+    return system_message, build_task(content)
+
+
+def render(agent: str, content: str, usage: TokenUsage | None = None) -> tuple[str, str]:
+    """
+    Returns the system message and the task for an agent and its input text, and records
+    the estimated prompt size in the prompt_tokens_estimate metric (per stage) and in usage.
+    """
+    system_message, task = build(agent, content)
+    estimate = estimate_tokens(system_message) + estimate_tokens(task)
+    metrics.observe("prompt_tokens_estimate", estimate, stage=agent)
+    if usage is not None:
+        usage._add(agent, estimated_prompt_tokens=estimate)
+    return system_message, task
+
+
+def record_usage(agent: str, prompt_tokens: int | None, completion_tokens: int | None,
+                 usage: TokenUsage | None = None) -> None:
+    """
+    Records the prompt and completion tokens Ollama reported for one call, per call and
+    as running totals, and adds them to usage. Nothing is recorded when the server sent no counts.
+    """
+    if prompt_tokens is None or completion_tokens is None:
+        return
+    if usage is not None:
+        usage._add(agent, calls=1, prompt_tokens=prompt_tokens, completion_tokens=completion_tokens)
+    metrics.observe("llm_prompt_tokens", prompt_tokens, stage=agent)
+    metrics.observe("llm_completion_tokens", completion_tokens, stage=agent)
+    metrics.increment("llm_prompt_tokens_total", prompt_tokens, stage=agent)
+    metrics.increment("llm_completion_tokens_total", completion_tokens, stage=agent)
+
+
+def main(argv=None) -> None:
+    argv = sys.argv[1:] if argv is None else argv
+    content = ""
+    if argv:
+        with open(argv[0], "r", encoding="utf-8") as f:
+            content = f.read()
+    print(f"{'agent':<24}{'system':>8}{'task':>8}{'total':>8}")
+    for agent in PROMPTS:
+        counts = prompt_tokens(agent, content)
+        print(f"{agent:<24}{counts['system']:>8}{counts['task']:>8}{counts['total']:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,244 @@
+"""
+Client-side load balancing over several Ollama servers.
+
+Set OLLAMA_HOSTS to a comma-separated list of servers, e.g.
+    OLLAMA_HOSTS=http://gpu-1:11434,http://gpu-2:11434
+
+and every model client made by model_adapter.ModelRouter sends its requests through one
+BalancedAsyncClient (an ollama.AsyncClient, so Semantic Kernel's Ollama connector takes it
+as its `client`):
+
+    - least outstanding requests: each request goes to the healthy server with the fewest
+      requests in flight from this process (ties go to the least recently picked one);
+    - health checks: a server that refuses connections or answers 5xx is marked unhealthy
+      and the request is retried once on another server; unhealthy servers get no traffic
+      and are probed (GET /api/tags) every OLLAMA_HEALTH_CHECK_SECONDS until they answer;
+    - hedged requests (OLLAMA_HEDGE=1): when a non-streaming chat or generate request
+      (HEDGED_PATHS) is still running after the p95 latency of recent requests for the same
+      model, a duplicate is sent to another server and whichever answers first wins; the
+      other one is cancelled, which makes Ollama stop generating it.
+
+Under a LimitedAsyncClient (concurrency_limiter.py), a duplicate needs a free slot of the
+adaptive concurrency limit and holds it until it ends, so hedging never pushes the requests
+in flight above the limit; without a free slot the request is not hedged.
+
+Hedging trades extra load for tail latency, so it is off by default. Try it against local
+mock servers with `python -m benchmarks.load_test --backends 3 --slow-backend 2 --hedge`.
+"""
+import asyncio
+import logging
+import os
+import time
+from collections import defaultdict, deque
+
+import ollama
+from dotenv import load_dotenv
+
+import metrics
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+OLLAMA_HOSTS = [host.strip() for host in os.getenv("OLLAMA_HOSTS", "").split(",") if host.strip()]
+HEDGE_REQUESTS = os.getenv("OLLAMA_HEDGE", "0") == "1"
+HEDGE_PERCENTILE = float(os.getenv("OLLAMA_HEDGE_PERCENTILE", "95"))
+# No hedging until this many latencies have been seen for a model.
+HEDGE_MIN_SAMPLES = 20
+HEALTH_CHECK_SECONDS = float(os.getenv("OLLAMA_HEALTH_CHECK_SECONDS", "10"))
+HEALTH_CHECK_TIMEOUT_SECONDS = 2.0
+LATENCY_WINDOW = 200
+# Only generation is worth duplicating: other calls (embed, pull, create, delete, ...) are
+# either cheap or must not run twice.
+HEDGED_PATHS = ("/api/chat", "/api/generate")
+
+
+def is_backend_failure(error: Exception) -> bool:
+    """Errors that say the server could not take the request, as opposed to a bad request."""
+    if isinstance(error, ConnectionError):
+        return True
+    return isinstance(error, ollama.ResponseError) and error.status_code >= 500
+
+
+class Backend:
+    """One Ollama server: its client, in-flight request count and health."""
+
+    def __init__(self, host: str):
+        self.host = host
+        self.client = ollama.AsyncClient(host=host)
+        self.outstanding = 0
+        self.healthy = True
+        self.last_picked = 0.0
+        self.next_check = 0.0
+
+
+class BalancedAsyncClient(ollama.AsyncClient):
+    """
+    An ollama.AsyncClient that spreads its requests over several servers (see the module
+    docstring). Use one per event loop: the underlying HTTP clients belong to the loop
+    they are first used on.
+    """
+
+    def __init__(self, hosts: list[str] | None = None, hedge: bool = HEDGE_REQUESTS,
+                 health_check_seconds: float = HEALTH_CHECK_SECONDS):
+        hosts = hosts or OLLAMA_HOSTS
+        if not hosts:
+            raise ValueError("BalancedAsyncClient needs at least one host (OLLAMA_HOSTS)")
+        super().__init__(host=hosts[0])
+        self.backends = [Backend(host) for host in hosts]
+        self.hedge = hedge
+        self.health_check_seconds = health_check_seconds
+        self.latencies = defaultdict(lambda: deque(maxlen=LATENCY_WINDOW))
+        self._probes = set()
+        # The AdaptiveLimiter of the LimitedAsyncClient wrapping this client, if any (it sets it).
+        self.limiter = None
+
+    def _pick(self, exclude: tuple = ()) -> Backend | None:
+        """Returns the healthy server with the fewest requests in flight, or None."""
+        candidates = [backend for backend in self.backends if backend.healthy and backend not in exclude]
+        if not candidates:
+            # Nothing known to be healthy: try the servers anyway rather than fail outright.
+            candidates = [backend for backend in self.backends if backend not in exclude]
+        if not candidates:
+            return None
+        backend = min(candidates, key=lambda candidate: (candidate.outstanding, candidate.last_picked))
+        backend.last_picked = time.monotonic()
+        return backend
+
+    def _mark_unhealthy(self, backend: Backend, error: Exception) -> None:
+        if backend.healthy:
+            logger.warning("Ollama server %s marked unhealthy: %s", backend.host, error)
+            metrics.increment("ollama_backend_failures", host=backend.host)
+        backend.healthy = False
+        backend.next_check = time.monotonic() + self.health_check_seconds
+        metrics.set_gauge("ollama_backend_healthy", 0, host=backend.host)
+
+    def _schedule_health_checks(self) -> None:
+        """Starts a background probe for every unhealthy server that is due for one."""
+        now = time.monotonic()
+        for backend in self.backends:
+            if not backend.healthy and now >= backend.next_check:
+                backend.next_check = now + self.health_check_seconds
+                task = asyncio.create_task(self._probe(backend))
+                self._probes.add(task)
+                task.add_done_callback(self._probes.discard)
+
+    async def _probe(self, backend: Backend) -> None:
+        try:
+            await asyncio.wait_for(backend.client.list(), HEALTH_CHECK_TIMEOUT_SECONDS)
+        except Exception:
+            return
+        logger.info("Ollama server %s is healthy again", backend.host)
+        backend.healthy = True
+        metrics.set_gauge("ollama_backend_healthy", 1, host=backend.host)
+
+    def hedge_delay(self, key: tuple) -> float | None:
+        """Seconds to wait before hedging a request, or None if there are too few samples yet."""
+        samples = self.latencies[key]
+        if len(samples) < HEDGE_MIN_SAMPLES:
+            return None
+        return metrics.percentile(list(samples), HEDGE_PERCENTILE)
+
+    async def _send(self, backend: Backend, key: tuple, cls, *args, **kwargs):
+        """Sends one non-streaming request to a server, tracking its load, latency and health."""
+        backend.outstanding += 1
+        metrics.set_gauge("ollama_backend_outstanding", backend.outstanding, host=backend.host)
+        started = time.perf_counter()
+        try:
+            response = await backend.client._request(cls, *args, **kwargs)
+        except Exception as e:
+            if is_backend_failure(e):
+                self._mark_unhealthy(backend, e)
+            raise
+        finally:
+            backend.outstanding -= 1
+            metrics.set_gauge("ollama_backend_outstanding", backend.outstanding, host=backend.host)
+        elapsed = time.perf_counter() - started
+        self.latencies[key].append(elapsed)
+        metrics.observe("ollama_backend_seconds", elapsed, host=backend.host)
+        return response
+
+    async def _send_with_failover(self, backend: Backend, key: tuple, cls, *args, **kwargs):
+        """Sends the request, retrying once on another server if this one could not take it."""
+        try:
+            return await self._send(backend, key, cls, *args, **kwargs)
+        except Exception as e:
+            retry_backend = self._pick(exclude=(backend,)) if is_backend_failure(e) else None
+            if retry_backend is None:
+                raise
+            metrics.increment("ollama_failovers")
+            return await self._send(retry_backend, key, cls, *args, **kwargs)
+
+    async def _send_hedge(self, backend: Backend, key: tuple, cls, *args, **kwargs):
+        """Sends the duplicate of a hedged request, releasing its limiter slot (if any) when it ends."""
+        if self.limiter is None:
+            return await self._send(backend, key, cls, *args, **kwargs)
+        started = time.perf_counter()
+        try:
+            response = await self._send(backend, key, cls, *args, **kwargs)
+        except Exception as e:
+            self.limiter.finish(started, failed=is_backend_failure(e))
+            raise
+        except BaseException:
+            # The loser of the race is cancelled: free the slot without adapting the limit.
+            self.limiter.finish(started, cancelled=True)
+            raise
+        self.limiter.finish(started, response)
+        return response
+
+    async def _hedged(self, backend: Backend, key: tuple, cls, *args, **kwargs):
+        """Sends the request and, if it is slower than the hedge delay, a duplicate to another server."""
+        primary = asyncio.create_task(self._send_with_failover(backend, key, cls, *args, **kwargs))
+        pending = {primary}
+        try:
+            delay = self.hedge_delay(key)
+            if delay is not None:
+                done, pending = await asyncio.wait(pending, timeout=delay)
+            hedge_backend = self._pick(exclude=(backend,)) if delay is not None and pending else None
+            if hedge_backend is None:
+                return await primary
+            if self.limiter is not None and not self.limiter.try_acquire():
+                metrics.increment("ollama_hedges_skipped")
+                return await primary
+
+            metrics.increment("ollama_hedged_requests")
+            hedge = asyncio.create_task(self._send_hedge(hedge_backend, key, cls, *args, **kwargs))
+            pending.add(hedge)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is hedge:
+                            metrics.increment("ollama_hedge_wins")
+                        return task.result()
+            # Both failed: report the original request's error.
+            return primary.result()
+        finally:
+            # The loser (or both, if the caller gave up) is cancelled; Ollama stops generating it.
+            for task in pending:
+                task.cancel()
+
+    async def _stream(self, backend: Backend, cls, *args, **kwargs):
+        """Streams a response from one server, counting it as outstanding until the stream ends."""
+        backend.outstanding += 1
+        try:
+            async for part in await backend.client._request(cls, *args, stream=True, **kwargs):
+                yield part
+        except Exception as e:
+            if is_backend_failure(e):
+                self._mark_unhealthy(backend, e)
+            raise
+        finally:
+            backend.outstanding -= 1
+
+    async def _request(self, cls, *args, stream: bool = False, **kwargs):
+        # Every AsyncClient API method (chat, generate, list, ...) ends up here.
+        self._schedule_health_checks()
+        backend = self._pick()
+        metrics.increment("ollama_backend_requests", host=backend.host)
+        if stream:
+            return self._stream(backend, cls, *args, **kwargs)
+        key = (args[1] if len(args) > 1 else "", (kwargs.get("json") or {}).get("model", ""))
+        if self.hedge and len(self.backends) > 1 and key[0] in HEDGED_PATHS:
+            return await self._hedged(backend, key, cls, *args, **kwargs)
+        return await self._send_with_failover(backend, key, cls, *args, **kwargs)
@@ -1,12 +1,12 @@
 import os
-import re
-import pymupdf4llm
 import pathlib
-from docx import Document
-import ollama
 import logging
 from dotenv import load_dotenv
 from translation_model.pipeline import run_translation_pipeline
+from translation_model.translator import check_cancelled
+from translation_model.script_profile import DEVANAGARI_PATTERN, split_script_spans
+from model_adapter import generation_options, select_model
+from model_prompt.registry import record_usage, render
 
 load_dotenv()
 
@@ -14,6 +14,9 @@ LOG_PATH = os.getenv("LOG_PATH")
 PDF_OUTPUT_DIR = os.getenv("PDF_OUTPUT_DIR")
 DOCX_OUTPUT_DIR = os.getenv("DOCX_OUTPUT_DIR")
 IMAGE_OUTPUT_DIR = os.getenv("IMAGE_OUTPUT_DIR")
+# Between the pages of a parsed PDF (a markdown rule), so page positions can be recovered
+# (see risk_prescan.py).
+PAGE_SEPARATOR = "\n\n-----\n\n"
 
 logging.basicConfig(
     level=logging.INFO,
@@ -28,7 +31,37 @@ logging.basicConfig(
 
 def contains_nepali(text: str) -> bool:
     """Detect Devanagari (Nepali) characters."""
-    return bool(re.search(r'[\u0900-\u097F]', text))
+    return bool(DEVANAGARI_PATTERN.search(text))
+
+
+def translate_nepali_spans(text: str, translation_mode: str = "quality", cancellation_token=None) -> str:
+    """
+    Translates only the Nepali-dominant spans of the text to English.
+    English spans (and their line breaks) are kept exactly as they are.
+    Stops with asyncio.CancelledError once cancellation_token is cancelled.
+    """
+    spans = split_script_spans(text)
+    nepali_chars = sum(len(span) for span, is_nepali in spans if is_nepali)
+    if not nepali_chars:
+        return text
+
+    logging.info(f"Detected Nepali text. Translating {nepali_chars} of {len(text)} characters to English...")
+    parts = []
+    for span, is_nepali in spans:
+        if not is_nepali:
+            parts.append(span)
+            continue
+        check_cancelled(cancellation_token)
+        body = span.rstrip()
+        translated = run_translation_pipeline(
+            body,
+            src_lang="npi_Deva",
+            tgt_lang="eng_Latn",
+            mode=translation_mode,
+            cancellation_token=cancellation_token,
+        ) if body else body
+        parts.append(translated + span[len(body):])
+    return ''.join(parts)
 
 def get_next_filename(dir_path, base_name):
     """Find next available file name like base_name_1.md, base_name_2.md, etc."""
@@ -48,9 +81,12 @@ def get_next_filename(dir_path, base_name):
     return dir_path / f"{base_name}_{max_index + 1}.md"
 
 def pdf_parse(document_path: str) -> None:
-    """ This function parses the pdf."""
+    """ This function parses the pdf. Pages are separated by a "-----" line (PAGE_SEPARATOR)."""
+    import pymupdf4llm
+
     try:
-        md_text = pymupdf4llm.to_markdown(document_path, ignore_images=True)
+        pages = pymupdf4llm.to_markdown(document_path, ignore_images=True, page_chunks=True)
+        md_text = PAGE_SEPARATOR.join(page["text"].strip("\n") for page in pages)
         output_path = get_next_filename(PDF_OUTPUT_DIR,
                                          "pdf_output")
         output_path.write_bytes(md_text.encode())
@@ -62,6 +98,8 @@ def pdf_parse(document_path: str) -> None:
 
 def docx_parse(document_path):
     """Parse DOCX and save as incrementing markdown file"""
+    from docx import Document
+
     try:
         doc = Document(document_path)
         full_text = '\n'.join([para.text for para in doc.paragraphs])
@@ -75,17 +113,30 @@ def docx_parse(document_path):
         raise
 
 
-def image_parse(document_path):
-    """Parse Image using LLaMA Vision and save as incrementing markdown file"""
+def image_parse(document_path, token_usage=None, model_router=None, cancellation_token=None):
+    """Parse Image using LLaMA Vision and save as incrementing markdown file.
+    The tokens of the call are added to token_usage (a model_prompt.registry.TokenUsage), if given.
+    With a model_router (model_adapter.ModelRouter), the call goes through its client, so it
+    shares the load balancer and the concurrency limit of the agents' calls; cancelling
+    cancellation_token then cancels it. Without one (standalone use), it goes to OLLAMA_HOST."""
+    _, prompt = render("image_parse", "", token_usage)
+    messages = [{
+        'role': 'user',
+        'content': prompt,
+        'images': [document_path]
+    }]
     try:
-        response = ollama.chat(
-            model='llama3.2-vision:11b',
-            messages=[{
-                'role': 'user',
-                'content': 'Extract all the text from the image. Please don’t write anything else',
-                'images': [document_path]
-            }]
-        )
+        if model_router is not None:
+            response = model_router.chat_from_thread("image_parse", messages, prompt, cancellation_token)
+        else:
+            import ollama
+
+            response = ollama.chat(
+                model=select_model("image_parse"),
+                messages=messages,
+                **generation_options("image_parse", prompt),
+            )
+        record_usage("image_parse", response.get('prompt_eval_count'), response.get('eval_count'), token_usage)
         text = response['message']['content']
         output_path = get_next_filename(IMAGE_OUTPUT_DIR,
                                          "image_output")
@@ -97,28 +148,36 @@ def image_parse(document_path):
         raise
 
 
-def parse_document(document_path: str) -> str:
-    """Parse document (any format) → English text (auto-translated if needed)"""
+def extract_text(document_path: str, token_usage=None, model_router=None, cancellation_token=None) -> str:
+    """Extracts the raw text of a document (any format), without translating it.
+    Images are read by the vision model (see image_parse for the other arguments)."""
     extension = pathlib.Path(document_path).suffix.lower()
     logging.info(f"Received file with extension: {extension}")
 
     if extension == ".pdf":
-        text = pdf_parse(document_path)
+        return pdf_parse(document_path)
     elif extension in ['.doc', '.docx']:
-        text = docx_parse(document_path)
+        return docx_parse(document_path)
     elif extension in ['.jpg', '.jpeg', '.png', '.bmp', '.tiff']:
-        text = image_parse(document_path)
+        return image_parse(document_path, token_usage, model_router, cancellation_token)
     else:
         logging.error(f"Unsupported file format: {extension}")
         raise ValueError(f"Unsupported file format: {extension}")
 
+
+def parse_document(document_path: str, translation_mode: str = "quality", text: str | None = None,
+                   cancellation_token=None, token_usage=None, model_router=None) -> str:
+    """Parse document (any format) → English text (auto-translated if needed).
+    translation_mode is passed to run_translation_pipeline ("quality" or "fast").
+    text is the document's already extracted text (see extract_text), if a caller such as the
+    job scheduler has it; the document is then not read again.
+    Once cancellation_token is cancelled, raises asyncio.CancelledError before the next step.
+    token_usage and model_router are used for the vision model call of images (see image_parse)."""
+    if text is None:
+        text = extract_text(document_path, token_usage, model_router, cancellation_token)
+
     if contains_nepali(text):
-        logging.info("Detected Nepali text. Translating to English...")
-        text = run_translation_pipeline(
-            text,
-            src_lang="npi_Deva",
-            tgt_lang="eng_Latn",
-        )
+        check_cancelled(cancellation_token)
+        text = translate_nepali_spans(text, translation_mode, cancellation_token)
 
     return text
-
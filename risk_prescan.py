@@ -0,0 +1,106 @@
+"""
+Keyword-only risk pre-scan, available as soon as the document's text is extracted.
+
+The agent pipeline takes tens of seconds before it says anything about risk. prescan()
+looks for the RISK_KEYWORDS in the extracted text in milliseconds and returns a heatmap:
+which terms were found and how often, how many hits each section has, and where each hit
+is (page and character offset in the page). It is shown first (a "prescan" event in the
+API, the first output in the UI) and replaced by the agents' analysis when that is done,
+so users can stop early on documents that are obviously benign.
+
+Pages are separated by a "-----" line, as parse.pdf_parse writes them; other formats are
+one page. Sections start at markdown headings ("## Termination") and numbered or
+"Section 4" style heading lines. The keywords are English, so untranslated Nepali passages
+have no hits.
+"""
+import re
+import time
+
+import metrics
+from legal_risky_keywords import RISK_KEYWORDS
+
+PAGE_BREAK_PATTERN = re.compile(r"\n*^-{5,}[ \t]*$\n*", re.MULTILINE)
+HEADING_PATTERN = re.compile(
+    r"^[ \t]*(?:#{1,6}[ \t]+(?P<markdown>.+)"
+    r"|\**(?P<numbered>(?:(?:section|article|clause|schedule)[ \t]+\w+|\d+(?:\.\d+)*\.?)[ \t]+[^.\n]{1,60}?)\**)"
+    r"[ \t]*$",
+    re.IGNORECASE | re.MULTILINE,
+)
+# Longest terms first, so "termination for cause" is one hit rather than "termination".
+# Plurals ("disputes", "fines") count for their term.
+KEYWORD_PATTERN = re.compile(
+    r"\b(?P<term>" + "|".join(re.escape(term) for term in sorted(RISK_KEYWORDS, key=len, reverse=True))
+    + r")(?:e?s)?\b",
+    re.IGNORECASE,
+)
+PREAMBLE = "Preamble"
+# Positions listed per document; the counts always cover every hit.
+MAX_MATCHES = 500
+
+_TERMS = {term.lower(): term for term in RISK_KEYWORDS}
+
+
+def _sections(page: str) -> list[tuple[int, str]]:
+    """Returns (offset, title) of every heading line of a page."""
+    return [(match.start(), (match.group("markdown") or match.group("numbered")).strip("*# \t"))
+            for match in HEADING_PATTERN.finditer(page)]
+
+
+def prescan(text: str) -> dict:
+    """
+    Finds the RISK_KEYWORDS in the text.
+
+    Returns:
+        dict: terms (term -> hits, most frequent first), sections (title, page and per-term
+        counts of each section, in document order), matches (term, page, offset in the page
+        and section of the first MAX_MATCHES hits), total hits, pages and the seconds taken.
+    """
+    started = time.perf_counter()
+    terms = {}
+    sections = [{"title": PREAMBLE, "page": 1, "counts": {}, "total": 0}]
+    matches = []
+    pages = PAGE_BREAK_PATTERN.split(text)
+    for page_number, page in enumerate(pages, start=1):
+        headings = _sections(page)
+        next_heading = 0
+        for match in KEYWORD_PATTERN.finditer(page):
+            while next_heading < len(headings) and headings[next_heading][0] <= match.start():
+                sections.append({"title": headings[next_heading][1], "page": page_number, "counts": {}, "total": 0})
+                next_heading += 1
+            term = _TERMS[match.group("term").lower()]
+            section = sections[-1]
+            terms[term] = terms.get(term, 0) + 1
+            section["counts"][term] = section["counts"].get(term, 0) + 1
+            section["total"] += 1
+            if len(matches) < MAX_MATCHES:
+                matches.append({"term": term, "page": page_number, "offset": match.start(),
+                                "section": section["title"]})
+        sections.extend({"title": title, "page": page_number, "counts": {}, "total": 0}
+                        for _, title in headings[next_heading:])
+    if not sections[0]["total"] and len(sections) > 1:
+        del sections[0]
+
+    seconds = time.perf_counter() - started
+    metrics.observe("prescan_seconds", seconds)
+    return {
+        "terms": dict(sorted(terms.items(), key=lambda item: -item[1])),
+        "sections": sections,
+        "matches": matches,
+        "total": sum(terms.values()),
+        "pages": len(pages),
+        "seconds": round(seconds, 4),
+    }
+
+
+def format_prescan(result: dict, max_sections: int = 10) -> str:
+    """Returns the pre-scan as plain text for the UI: the terms, then the sections with the most hits."""
+    if not result["total"]:
+        return "Quick risk scan: no risky keywords found."
+    lines = ["Quick risk scan (keywords only; the full analysis follows):",
+             "Terms: " + ", ".join(f"{term} ({count})" for term, count in result["terms"].items())]
+    hot = sorted((section for section in result["sections"] if section["total"]), key=lambda section: -section["total"])
+    lines.append("Sections with the most hits:")
+    for section in hot[:max_sections]:
+        counts = ", ".join(f"{term} {count}" for term, count in section["counts"].items())
+        lines.append(f"- {section['title']} (page {section['page']}): {section['total']} — {counts}")
+    return "\n".join(lines)
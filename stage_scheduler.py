@@ -0,0 +1,122 @@
+"""
+A small DAG scheduler for the stages of the document pipeline.
+
+Each Stage names the stages it depends on. run_stages starts every stage as soon as all of
+its dependencies have finished, so independent stages run concurrently and the end-to-end
+latency is the critical path rather than the sum of all stages.
+
+Stage functions are async callables that take the shared context dict. The result of each
+stage is stored in the context under the stage name, where later stages can read it.
+"""
+import asyncio
+import logging
+
+import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class Stage:
+    """
+    One node of the pipeline graph.
+
+    Parameters:
+        name (str): Unique stage name; its result is stored in the context under this key.
+        run: Async callable taking the context dict and returning the stage result.
+        depends_on (tuple[str]): Names of the stages that must finish first.
+        when: Optional callable taking the context; if it returns False the stage is
+            skipped and its result is None (dependents still run).
+    """
+
+    def __init__(self, name: str, run, depends_on: tuple[str, ...] = (), when=None):
+        self.name = name
+        self.run = run
+        self.depends_on = tuple(depends_on)
+        self.when = when
+
+    def __repr__(self):
+        return f"Stage({self.name!r}, depends_on={self.depends_on!r})"
+
+
+def validate_stages(stages: list[Stage]) -> None:
+    """Raises ValueError for duplicate names, unknown dependencies or cycles."""
+    names = [stage.name for stage in stages]
+    if len(names) != len(set(names)):
+        raise ValueError(f"Duplicate stage names in {names}")
+    known = set(names)
+    for stage in stages:
+        unknown = set(stage.depends_on) - known
+        if unknown:
+            raise ValueError(f"Stage {stage.name!r} depends on unknown stages {sorted(unknown)}")
+
+    remaining = {stage.name: set(stage.depends_on) for stage in stages}
+    while remaining:
+        ready = [name for name, deps in remaining.items() if not deps]
+        if not ready:
+            raise ValueError(f"Stage dependencies form a cycle among {sorted(remaining)}")
+        for name in ready:
+            del remaining[name]
+        for deps in remaining.values():
+            deps.difference_update(ready)
+
+
+async def _run_stage(stage: Stage, context: dict, semaphore: asyncio.Semaphore | None):
+    if stage.when is not None and not stage.when(context):
+        logger.info("Skipping stage %s", stage.name)
+        return None
+    if semaphore is None:
+        with metrics.timer("stage_seconds", stage=stage.name):
+            return await stage.run(context)
+    async with semaphore:
+        with metrics.timer("stage_seconds", stage=stage.name):
+            return await stage.run(context)
+
+
+async def run_stages(stages: list[Stage], context: dict, max_concurrency: int | None = None,
+                     on_stage_complete=None, cancellation_token=None) -> dict:
+    """
+    Runs the stages in dependency order, each as soon as its dependencies are done.
+
+    Parameters:
+        stages (list[Stage]): The pipeline graph.
+        context (dict): Shared inputs; stage results are added to it by name.
+        max_concurrency (int | None): Upper bound on stages running at once (None = unbounded).
+        on_stage_complete: Optional callable(name, result), called as each stage finishes
+            (result is None for a skipped stage), e.g. to stream progress to a client.
+        cancellation_token: Optional token with is_cancelled() (e.g. an
+            autogen_core.CancellationToken); once it is cancelled, no further stage is started
+            and asyncio.CancelledError is raised.
+
+    Returns:
+        dict: The context, including every stage result.
+
+    If a stage raises, the stages still running are cancelled and the error is re-raised.
+    """
+    validate_stages(stages)
+    semaphore = asyncio.Semaphore(max_concurrency) if max_concurrency else None
+    pending = {stage.name: stage for stage in stages}
+    done = set()
+    running = {}
+
+    try:
+        while pending or running:
+            if cancellation_token is not None and cancellation_token.is_cancelled():
+                raise asyncio.CancelledError()
+            for name, stage in list(pending.items()):
+                if all(dependency in done for dependency in stage.depends_on):
+                    running[asyncio.create_task(_run_stage(stage, context, semaphore))] = name
+                    del pending[name]
+
+            finished, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+            for task in finished:
+                name = running.pop(task)
+                context[name] = task.result()
+                done.add(name)
+                if on_stage_complete is not None:
+                    on_stage_complete(name, context[name])
+    finally:
+        for task in running:
+            task.cancel()
+        if running:
+            await asyncio.gather(*running, return_exceptions=True)
+    return context
@@ -0,0 +1,4 @@
+import os
+
+# parse.py (imported by agents) logs to LOG_PATH; the tests must not depend on a configured .env.
+os.environ.setdefault("LOG_PATH", os.devnull)
@@ -0,0 +1,64 @@
+import asyncio
+import threading
+import time
+
+import pytest
+from autogen_core import CancellationToken
+
+import agents
+from stage_scheduler import Stage
+
+
+def test_cancelling_the_token_cancels_the_document(monkeypatch):
+    started = threading.Event()
+
+    async def slow_stage(context):
+        # Like a model call that never looks at the token.
+        started.set()
+        await asyncio.sleep(5)
+
+    monkeypatch.setattr(agents, "PIPELINE_STAGES", [Stage("slow", slow_stage)])
+    token = CancellationToken()
+    # The token is cancelled from another thread, as the API's cancel watcher or a UI may do.
+    canceller = threading.Thread(target=lambda: started.wait() and token.cancel())
+    canceller.start()
+
+    began = time.perf_counter()
+    with pytest.raises(asyncio.CancelledError):
+        asyncio.run(agents.process_legal_document("contract.pdf", model_client=object(), cancellation_token=token))
+    canceller.join()
+
+    assert time.perf_counter() - began < 1
+
+
+def test_a_token_cancelled_before_the_start_runs_no_stage(monkeypatch):
+    ran = []
+
+    async def stage(context):
+        ran.append(True)
+
+    monkeypatch.setattr(agents, "PIPELINE_STAGES", [Stage("parse", stage)])
+    token = CancellationToken()
+    token.cancel()
+
+    with pytest.raises(asyncio.CancelledError):
+        asyncio.run(agents.process_legal_document("contract.pdf", model_client=object(), cancellation_token=token))
+    assert ran == []
+
+
+def test_the_token_does_not_cancel_the_caller_after_the_document(monkeypatch):
+    async def stage(context):
+        return "summary"
+
+    monkeypatch.setattr(agents, "PIPELINE_STAGES", [Stage("merge", stage), Stage("translate_output", stage,
+                                                                                    when=lambda context: False)])
+    token = CancellationToken()
+
+    async def caller():
+        summary = await agents.process_legal_document("contract.pdf", model_client=object(),
+                                                      cancellation_token=token)
+        token.cancel()
+        await asyncio.sleep(0.05)
+        return summary
+
+    assert asyncio.run(caller()) == "summary"
@@ -0,0 +1,16 @@
+import json
+
+from batch_cli import ResultWriter, load_checkpoint
+
+
+def test_results_after_a_cut_off_line_start_on_their_own_line(tmp_path):
+    output = tmp_path / "results.jsonl"
+    output.write_text('{"path": "a.pdf", "language": "english", "status": "ok"}\n{"path": "b.pdf", "lang',
+                      encoding="utf-8")
+
+    writer = ResultWriter(str(output))
+    writer.write({"path": "b.pdf", "language": "english", "status": "ok"})
+    writer.close()
+
+    assert load_checkpoint(str(output)) == {("a.pdf", "english"): "ok", ("b.pdf", "english"): "ok"}
+    assert json.loads(output.read_text(encoding="utf-8").splitlines()[-1])["path"] == "b.pdf"
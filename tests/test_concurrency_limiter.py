@@ -0,0 +1,50 @@
+import asyncio
+
+import ollama
+
+from concurrency_limiter import AdaptiveLimiter, LimitedAsyncClient
+
+
+class SlowClient(ollama.AsyncClient):
+    """Answers every request after `seconds`, like a server that is never done in time."""
+
+    def __init__(self, seconds: float):
+        super().__init__()
+        self.seconds = seconds
+
+    async def _request(self, cls, *args, stream: bool = False, **kwargs):
+        await asyncio.sleep(self.seconds)
+        return {}
+
+
+def test_release_without_adapt_keeps_the_limit():
+    async def run():
+        limiter = AdaptiveLimiter(initial=2, min_limit=1, max_limit=64)
+        await limiter.acquire()
+        await limiter.acquire()
+        waiter = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0)
+        limiter.release(0.1, adapt=False)
+        await waiter
+        assert limiter.limit == 2
+        assert limiter.in_flight == 2
+
+    asyncio.run(run())
+
+
+def test_cancelled_requests_do_not_raise_the_limit():
+    async def run():
+        limiter = AdaptiveLimiter(initial=2, min_limit=1, max_limit=64)
+        client = LimitedAsyncClient(SlowClient(10), limiter)
+        # Saturated: 2 in flight and 10 waiting, all timing out.
+        results = await asyncio.gather(
+            *(asyncio.wait_for(client._request(dict, "POST", "/api/chat", json={"model": "m"}), 0.05)
+              for _ in range(12)),
+            return_exceptions=True,
+        )
+        assert all(isinstance(result, TimeoutError) for result in results)
+        assert limiter.limit == 2
+        assert limiter.in_flight == 0
+        assert not limiter._waiters
+
+    asyncio.run(run())
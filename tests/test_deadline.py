@@ -0,0 +1,213 @@
+import asyncio
+import math
+import types
+
+import pytest
+
+import agents
+import deadline
+import metrics
+from deadline import Deadline, expected_seconds, observe_stage
+
+CLAUSES = "1. Either party may seek termination for cause after a breach.\n\n2. Late payment carries a penalty."
+
+
+@pytest.fixture(autouse=True)
+def fresh_metrics():
+    metrics.reset()
+    yield
+    metrics.reset()
+
+
+class FakeClock:
+    """Stands in for deadline.time; the tests move it forward by hand."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+def _fast_stages(*stages):
+    """Records enough quick runs that the stages are expected to take 10 ms."""
+    for stage in stages:
+        for _ in range(deadline.MIN_SAMPLES):
+            observe_stage(stage, 0.01)
+
+
+def _context(budget, language="english", **values):
+    return {"deadline": Deadline(budget), "language": language, "model_client": object(),
+            "clause_extraction": CLAUSES, **values}
+
+
+def test_remaining_allows_and_describe_follow_the_clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(deadline, "time", types.SimpleNamespace(monotonic=clock.monotonic))
+    budget = Deadline(60)
+
+    assert budget.remaining() == 60
+    assert budget.allows("clause_extraction", reserve=15)
+    clock.now += 20
+    assert budget.remaining() == 40
+    assert budget.allows("clause_extraction")
+    assert not budget.allows("clause_extraction", reserve=15)
+
+    budget.degrade("short_summary")
+    budget.degrade("keyword_risks")
+    budget.degrade("short_summary")
+    assert budget.degradations == ["short_summary", "keyword_risks"]
+    assert budget.describe() == "shortened summary; risks listed from keyword matches, without analysis"
+    assert metrics.snapshot()["counters"]["pipeline_degradations{kind=short_summary}"] == 1
+
+
+def test_no_deadline_allows_everything():
+    budget = Deadline(None)
+
+    assert budget.remaining() == math.inf
+    assert budget.allows("clause_extraction", reserve=1000)
+    assert asyncio.run(budget.run(asyncio.sleep(0, result="done"), reserve=1000)) == "done"
+    assert budget.describe() == ""
+
+
+def test_expected_seconds_uses_the_defaults_until_enough_runs_are_measured():
+    for _ in range(deadline.MIN_SAMPLES - 1):
+        observe_stage("risk_analysis", 2.0)
+    assert expected_seconds("risk_analysis") == deadline.DEFAULT_STAGE_SECONDS["risk_analysis"]
+
+    observe_stage("risk_analysis", 2.0)
+    assert expected_seconds("risk_analysis") == pytest.approx(2.0)
+
+
+def test_run_stops_the_awaitable_when_the_budget_runs_out():
+    with pytest.raises(TimeoutError):
+        asyncio.run(Deadline(0.05).run(asyncio.sleep(5)))
+
+
+def test_clause_extraction_uses_the_small_model_and_drops_later_chunks(monkeypatch):
+    calls = []
+
+    async def model_client(name, content, context, prefer_small=False):
+        calls.append(("client", prefer_small))
+        return object()
+
+    async def run_agent(name, content, context, model_client=None):
+        calls.append(("agent", name))
+        return f"clauses of {content[:7]}"
+
+    monkeypatch.setattr(agents, "SMALL_TEXT_MODEL", "small-model")
+    monkeypatch.setattr(agents, "CLAUSE_CHUNK_TOKENS", 5)
+    monkeypatch.setattr(agents, "_model_client", model_client)
+    monkeypatch.setattr(agents, "_run_agent", run_agent)
+    # One second is far less than clause extraction and the stages after it are expected to take.
+    context = _context(1, parse="First chunk of text.\n\nSecond chunk of text.\n\nThird chunk.")
+
+    clauses = asyncio.run(agents.clause_extraction_stage(context))
+
+    assert calls == [("client", True), ("agent", "ClauseExtractorAgent")]
+    assert clauses == "clauses of First c"
+    assert context["deadline"].degradations == ["small_model", "partial_clauses"]
+
+
+def test_clause_extraction_runs_in_full_with_time_to_spare(monkeypatch):
+    async def model_client(name, content, context, prefer_small=False):
+        return object()
+
+    async def run_agent(name, content, context, model_client=None):
+        return "clauses"
+
+    monkeypatch.setattr(agents, "SMALL_TEXT_MODEL", "small-model")
+    monkeypatch.setattr(agents, "CLAUSE_CHUNK_TOKENS", 5)
+    monkeypatch.setattr(agents, "_model_client", model_client)
+    monkeypatch.setattr(agents, "_run_agent", run_agent)
+    context = _context(600, parse="First chunk.\n\nSecond chunk.")
+
+    assert asyncio.run(agents.clause_extraction_stage(context)) == "clauses\n\nclauses"
+    assert context["deadline"].degradations == []
+    assert len(metrics.samples(deadline.STAGE_SECONDS_METRIC, stage="clause_extraction")) == 1
+
+
+def test_risk_analysis_is_skipped_for_keyword_notes_when_short_of_time(monkeypatch):
+    agents_run = []
+
+    async def run_agent(name, content, context, model_client=None):
+        agents_run.append(name)
+        return "analysis"
+
+    monkeypatch.setattr(agents, "_run_agent", run_agent)
+    context = _context(1)
+
+    notes = asyncio.run(agents.risk_analysis_stage(context))
+
+    assert agents_run == []
+    assert "- termination for cause (1x)" in notes
+    assert "- penalty (1x)" in notes
+    assert context["deadline"].degradations == ["keyword_risks"]
+
+
+def test_risk_analysis_running_past_the_budget_falls_back_to_keyword_notes(monkeypatch):
+    async def run_agent(name, content, context, model_client=None):
+        await asyncio.sleep(5)
+
+    monkeypatch.setattr(agents, "_run_agent", run_agent)
+    _fast_stages("risk_analysis")
+    context = _context(0.1)
+
+    notes = asyncio.run(agents.risk_analysis_stage(context))
+
+    assert notes.startswith("Risky terms found (keyword scan only")
+    assert context["deadline"].degradations == ["keyword_risks"]
+
+
+def test_clause_summary_is_brief_when_short_of_time(monkeypatch):
+    agents_run = []
+
+    async def run_agent(name, content, context, model_client=None):
+        agents_run.append(name)
+        return "brief summary"
+
+    monkeypatch.setattr(agents, "_run_agent", run_agent)
+    context = _context(1)
+
+    assert asyncio.run(agents.clause_summary_stage(context)) == "brief summary"
+    assert agents_run == ["BriefSummarizerAgent"]
+    assert context["deadline"].degradations == ["short_summary"]
+
+
+def test_clause_summary_running_past_the_budget_returns_the_clauses(monkeypatch):
+    async def run_agent(name, content, context, model_client=None):
+        await asyncio.sleep(5)
+
+    monkeypatch.setattr(agents, "_run_agent", run_agent)
+    _fast_stages("clause_summary")
+    context = _context(0.1)
+
+    assert asyncio.run(agents.clause_summary_stage(context)) == CLAUSES
+    assert context["deadline"].degradations == ["clauses_only"]
+
+
+def test_translation_uses_the_fast_mode_when_short_of_time(monkeypatch):
+    modes = []
+
+    def translate(text, src_lang, tgt_lang, mode, cancellation_token=None):
+        modes.append(mode)
+        return "अनुवाद"
+
+    monkeypatch.setattr(agents, "run_translation_pipeline", translate)
+    context = _context(1, language="nepali", merge="summary")
+
+    assert asyncio.run(agents.translate_output_stage(context)) == "अनुवाद"
+    assert modes == ["fast"]
+    assert context["deadline"].degradations == ["fast_translation"]
+
+
+def test_no_stage_degrades_without_a_deadline(monkeypatch):
+    async def run_agent(name, content, context, model_client=None):
+        return name
+
+    monkeypatch.setattr(agents, "_run_agent", run_agent)
+    context = _context(None)
+
+    assert asyncio.run(agents.risk_analysis_stage(context)) == "RiskAnalysisAgent"
+    assert asyncio.run(agents.clause_summary_stage(context)) == "SummarizerAgent"
+    assert context["deadline"].degradations == []
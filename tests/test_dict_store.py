@@ -0,0 +1,29 @@
+import os
+
+from translation_model.dict_store import CompiledDictionary, open_reverse, reverse_mapping, write_compiled_dictionary
+
+
+def test_open_reverse_compiles_the_reverse_next_to_the_dictionary(tmp_path):
+    path = str(tmp_path / "nepali_to_romanized.dict")
+    write_compiled_dictionary({"राम्रो": ["ramro", "raamro"], "धेरै": ["dherai", "ramro"]}, path)
+    dictionary = CompiledDictionary(path)
+
+    reverse = open_reverse(dictionary)
+
+    # "ramro" is listed by both words: the first in key order (धेरै sorts first) wins.
+
+    assert reverse.path == f"{path}.reverse"
+    assert dict(reverse) == reverse_mapping(dictionary) == {"ramro": "धेरै", "raamro": "राम्रो", "dherai": "धेरै"}
+
+
+def test_open_reverse_reuses_a_fresh_file_and_rebuilds_a_stale_one(tmp_path):
+    path = str(tmp_path / "nepali_to_english.dict")
+    write_compiled_dictionary({"पोखरा": "Pokhara"}, path)
+    reverse_path = open_reverse(CompiledDictionary(path)).path
+    modified = os.path.getmtime(reverse_path)
+
+    assert os.path.getmtime(open_reverse(CompiledDictionary(path)).path) == modified
+
+    write_compiled_dictionary({"पोखरा": "Pokhara", "धरान": "Dharan"}, path)
+    os.utime(path, (modified + 10, modified + 10))
+    assert dict(open_reverse(CompiledDictionary(path))) == {"pokhara": "पोखरा", "dharan": "धरान"}
@@ -0,0 +1,20 @@
+from translation_model import file_ops
+
+
+def test_multi_line_field_written_in_two_steps_is_indexed_once_complete(tmp_path):
+    path = str(tmp_path / "cache.csv")
+    file_ops.save_to_csv("eng_Latn", "पहिलो", "first", "answer", csv_path=path)
+    complete_size = (tmp_path / "cache.csv").stat().st_size
+    with open(path, "a", encoding="utf-8", newline="") as file:
+        file.write('eng_Latn,"पहिलो लाइन\n')
+        file.flush()
+
+        assert file_ops.check_existing_translation("eng_Latn", "पहिलो", "answer", csv_path=path) == "first"
+        assert file_ops.check_existing_translation("eng_Latn", "पहिलो लाइन\n", "answer", csv_path=path) is None
+        assert file_ops._cache_index[path]["offset"] == complete_size
+
+        file.write('दोस्रो लाइन",two lines,answer\n')
+
+    assert file_ops.check_existing_translation(
+        "eng_Latn", "पहिलो लाइन\nदोस्रो लाइन", "answer", csv_path=path) == "two lines"
+    assert file_ops._cache_index[path]["offset"] == (tmp_path / "cache.csv").stat().st_size
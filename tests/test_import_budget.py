@@ -0,0 +1,10 @@
+import pytest
+
+from benchmarks.import_budget import DEFAULT_BUDGET_SECONDS, MODULES, measure_import
+
+
+@pytest.mark.parametrize("module", MODULES)
+def test_startup_module_imports_within_budget(module):
+    # Best of three fresh interpreters, like `python -m benchmarks.import_budget`.
+    best = min(measure_import(module)[0] for _ in range(3))
+    assert best <= DEFAULT_BUDGET_SECONDS, f"import {module} took {best:.3f}s"
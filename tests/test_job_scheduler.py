@@ -0,0 +1,138 @@
+import asyncio
+import types
+
+import job_scheduler
+import metrics
+from job_scheduler import JobScheduler
+
+
+class FakeClock:
+    """Stands in for job_scheduler.time; the tests move it forward by hand."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def monotonic(self):
+        return self.now
+
+
+class Jobs:
+    """Queues jobs on a one-slot scheduler behind a blocker and records the order they start in."""
+
+    def __init__(self, scheduler):
+        self.scheduler = scheduler
+        self.started = []
+        self.release = asyncio.Event()
+        self.tasks = {}
+
+    async def hold(self):
+        async with self.scheduler.slot(0):
+            await self.release.wait()
+
+    async def job(self, name, cost):
+        async with self.scheduler.slot(cost):
+            self.started.append(name)
+
+    async def submit(self, name, cost):
+        self.tasks[name] = asyncio.create_task(self.job(name, cost))
+        # Let the job reach the queue before the next one is submitted.
+        await asyncio.sleep(0)
+
+
+def _run(scenario, monkeypatch, aging=100.0):
+    clock = FakeClock()
+    monkeypatch.setattr(job_scheduler, "time", types.SimpleNamespace(monotonic=clock.monotonic))
+
+    async def main():
+        jobs = Jobs(JobScheduler(1, aging_tokens_per_second=aging))
+        blocker = asyncio.create_task(jobs.hold())
+        await asyncio.sleep(0)
+        await scenario(jobs, clock)
+        jobs.release.set()
+        await blocker
+        await asyncio.gather(*jobs.tasks.values(), return_exceptions=True)
+        return jobs
+
+    return asyncio.run(main())
+
+
+def test_a_short_job_overtakes_a_long_one(monkeypatch):
+    async def scenario(jobs, clock):
+        await jobs.submit("300-page contract", 5000)
+        clock.now += 1
+        await jobs.submit("one-page NDA", 100)
+
+    jobs = _run(scenario, monkeypatch)
+
+    assert jobs.started == ["one-page NDA", "300-page contract"]
+    assert jobs.scheduler.running == 0
+
+
+def test_a_long_job_that_waited_long_enough_starts_before_newer_short_ones(monkeypatch):
+    async def scenario(jobs, clock):
+        await jobs.submit("contract", 5000)
+        # After a minute the contract has aged by 6000 tokens, more than the gap to a short job.
+        clock.now += 60
+        await jobs.submit("nda 1", 100)
+        await jobs.submit("nda 2", 100)
+
+    jobs = _run(scenario, monkeypatch)
+
+    assert jobs.started == ["contract", "nda 1", "nda 2"]
+
+
+def test_without_aging_the_long_job_waits_for_every_short_one(monkeypatch):
+    async def scenario(jobs, clock):
+        await jobs.submit("contract", 5000)
+        clock.now += 60
+        await jobs.submit("nda 1", 100)
+        await jobs.submit("nda 2", 100)
+
+    jobs = _run(scenario, monkeypatch, aging=0)
+
+    assert jobs.started == ["nda 1", "nda 2", "contract"]
+
+
+def test_a_cancelled_queued_job_never_starts(monkeypatch):
+    async def scenario(jobs, clock):
+        await jobs.submit("nda", 100)
+        await jobs.submit("contract", 5000)
+        jobs.tasks["nda"].cancel()
+        await asyncio.sleep(0)
+
+    jobs = _run(scenario, monkeypatch)
+
+    assert jobs.started == ["contract"]
+    assert jobs.tasks["nda"].cancelled()
+    assert jobs.scheduler.running == 0
+    assert metrics.snapshot()["gauges"]["scheduler_queue_depth"] == 0
+
+
+def test_a_job_cancelled_as_its_turn_came_passes_the_slot_on(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(job_scheduler, "time", types.SimpleNamespace(monotonic=clock.monotonic))
+
+    async def main():
+        jobs = Jobs(JobScheduler(1))
+        release = asyncio.Event()
+
+        async def hold_then_cancel_the_next():
+            async with jobs.scheduler.slot(0):
+                await release.wait()
+            # The slot was just handed to "nda", which has not resumed yet.
+            jobs.tasks["nda"].cancel()
+
+        blocker = asyncio.create_task(hold_then_cancel_the_next())
+        await asyncio.sleep(0)
+        await jobs.submit("nda", 100)
+        await jobs.submit("contract", 5000)
+        release.set()
+        await blocker
+        # Had the slot been lost with the cancelled job, the contract would wait forever.
+        await asyncio.wait_for(asyncio.gather(*jobs.tasks.values(), return_exceptions=True), 1)
+        return jobs
+
+    jobs = asyncio.run(main())
+
+    assert jobs.started == ["contract"]
+    assert jobs.scheduler.running == 0
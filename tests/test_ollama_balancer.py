@@ -0,0 +1,78 @@
+import asyncio
+import types
+
+import ollama
+
+from concurrency_limiter import AdaptiveLimiter, LimitedAsyncClient
+from ollama_balancer import BalancedAsyncClient
+
+
+class RecordingClient(BalancedAsyncClient):
+    """Records whether each request was hedged instead of sending it."""
+
+    def __init__(self):
+        super().__init__(hosts=["http://gpu-1:11434", "http://gpu-2:11434"], hedge=True)
+        self.calls = []
+
+    async def _hedged(self, backend, key, cls, *args, **kwargs):
+        self.calls.append(("hedged", key[0]))
+
+    async def _send_with_failover(self, backend, key, cls, *args, **kwargs):
+        self.calls.append(("single", key[0]))
+
+
+def test_only_chat_and_generate_are_hedged():
+    client = RecordingClient()
+
+    async def run():
+        for path in ["/api/chat", "/api/generate", "/api/embed", "/api/pull", "/api/delete"]:
+            await client._request(ollama.ProcessResponse, "POST", path, json={"model": "llama3.1:8b"})
+
+    asyncio.run(run())
+
+    assert client.calls == [("hedged", "/api/chat"), ("hedged", "/api/generate"), ("single", "/api/embed"),
+                            ("single", "/api/pull"), ("single", "/api/delete")]
+
+
+class SlowFirstServerClient(BalancedAsyncClient):
+    """Two servers; the first takes 0.5 s per request, the second 0.01 s. Records what is sent."""
+
+    def __init__(self):
+        super().__init__(hosts=["http://gpu-1:11434", "http://gpu-2:11434"], hedge=True)
+        # Enough fast samples for a hedge delay of about 0.01 s.
+        self.latencies[("/api/chat", "llama3.1:8b")].extend([0.01] * 20)
+        self.sent = []
+        self.peak_in_flight = 0
+
+    async def _send(self, backend, key, cls, *args, **kwargs):
+        self.sent.append(backend.host)
+        self.peak_in_flight = max(self.peak_in_flight, self.limiter.in_flight)
+        await asyncio.sleep(0.5 if backend is self.backends[0] else 0.01)
+        return types.SimpleNamespace(total_duration=None)
+
+
+def _hedged_chat(limit: int):
+    balanced = SlowFirstServerClient()
+    client = LimitedAsyncClient(balanced, AdaptiveLimiter(initial=limit, min_limit=1, max_limit=limit))
+
+    async def run():
+        await client._request(ollama.ChatResponse, "POST", "/api/chat", json={"model": "llama3.1:8b"})
+
+    asyncio.run(run())
+    return balanced, client.limiter
+
+
+def test_a_hedge_takes_a_slot_of_the_concurrency_limit():
+    balanced, limiter = _hedged_chat(limit=2)
+
+    assert balanced.sent == ["http://gpu-1:11434", "http://gpu-2:11434"]
+    assert balanced.peak_in_flight == 2
+    assert limiter.in_flight == 0
+
+
+def test_no_hedge_without_a_free_slot():
+    balanced, limiter = _hedged_chat(limit=1)
+
+    assert balanced.sent == ["http://gpu-1:11434"]
+    assert balanced.peak_in_flight == 1
+    assert limiter.in_flight == 0
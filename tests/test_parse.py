@@ -0,0 +1,45 @@
+import asyncio
+
+import parse
+from benchmarks.load_test import write_image
+from benchmarks.mock_ollama import MockOllamaServer
+from concurrency_limiter import PRIORITY_BATCH, REQUEST_PRIORITY, AdaptiveLimiter
+from model_adapter import VISION_MODEL, ModelRouter
+
+
+class RecordingLimiter(AdaptiveLimiter):
+    """Records the priority of every request that takes a slot."""
+
+    def __init__(self):
+        super().__init__()
+        self.priorities = []
+
+    async def acquire(self, priority=None):
+        self.priorities.append(REQUEST_PRIORITY.get() if priority is None else priority)
+        await super().acquire(priority)
+
+
+def test_image_parse_goes_through_the_routers_client(tmp_path, monkeypatch):
+    image = str(tmp_path / "scan.png")
+    write_image(image)
+    monkeypatch.setattr(parse, "IMAGE_OUTPUT_DIR", str(tmp_path / "image_output"))
+
+    with MockOllamaServer() as server:
+        monkeypatch.setenv("OLLAMA_HOST", server.url)
+        monkeypatch.delenv("OLLAMA_HOSTS", raising=False)
+        monkeypatch.setenv("LLM_ADAPTIVE_CONCURRENCY", "1")
+
+        async def run():
+            router = ModelRouter()
+            router.ollama_client.limiter = RecordingLimiter()
+            REQUEST_PRIORITY.set(PRIORITY_BATCH)
+            text = await asyncio.to_thread(parse.image_parse, image, None, router)
+            return text, router.ollama_client.limiter
+
+        text, limiter = asyncio.run(run())
+
+    assert text
+    assert server.requests_by_model == {VISION_MODEL: 1}
+    # The call took a limiter slot, with the priority of the task that started the thread.
+    assert limiter.priorities == [PRIORITY_BATCH]
+    assert limiter.in_flight == 0
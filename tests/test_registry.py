@@ -0,0 +1,20 @@
+from model_prompt.registry import TokenUsage, record_usage, render
+
+
+def test_token_usage_adds_up_the_reported_counts_per_stage():
+    usage = TokenUsage()
+    render("ClauseExtractorAgent", "clause text", usage)
+    record_usage("ClauseExtractorAgent", 120, 40, usage)
+    render("ClauseExtractorAgent", "more clause text", usage)
+    record_usage("ClauseExtractorAgent", 130, 50, usage)
+    record_usage("SummarizerAgent", 80, 200, usage)
+    record_usage("SummarizerAgent", None, None, usage)
+
+    totals = usage.as_dict()
+
+    assert totals["prompt_tokens"] == 330
+    assert totals["completion_tokens"] == 290
+    extraction = totals["stages"]["ClauseExtractorAgent"]
+    assert (extraction["calls"], extraction["prompt_tokens"], extraction["completion_tokens"]) == (2, 250, 90)
+    assert extraction["estimated_prompt_tokens"] > 0
+    assert totals["stages"]["SummarizerAgent"]["calls"] == 1
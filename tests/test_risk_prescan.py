@@ -0,0 +1,84 @@
+import risk_prescan
+from risk_prescan import format_prescan, prescan
+
+PAGE_ONE = """This Agreement is governed by the laws of Nepal.
+
+## Termination
+Either party may end it by termination for cause. Termination needs notice."""
+PAGE_TWO = """Section 7 Payment
+Late payment carries a penalty and fines.
+
+Disputes go to arbitration.
+
+8. Notices"""
+TEXT = f"{PAGE_ONE}\n\n-----\n\n{PAGE_TWO}"
+
+
+def test_prescan_counts_terms_per_section():
+    result = prescan(TEXT)
+
+    assert result["pages"] == 2
+    assert result["total"] == 7
+    # The longest term wins ("termination for cause" is not also a "termination"), and plurals count.
+    assert result["terms"] == {"termination": 2, "termination for cause": 1, "penalty": 1, "fine": 1,
+                               "dispute": 1, "arbitration": 1}
+    # The preamble has no hits and is left out; a heading without hits is still listed.
+    assert result["sections"] == [
+        {"title": "Termination", "page": 1, "counts": {"termination": 2, "termination for cause": 1}, "total": 3},
+        {"title": "Section 7 Payment", "page": 2,
+         "counts": {"penalty": 1, "fine": 1, "dispute": 1, "arbitration": 1}, "total": 4},
+        {"title": "8. Notices", "page": 2, "counts": {}, "total": 0},
+    ]
+
+
+def test_prescan_locates_hits_by_page_and_offset():
+    matches = prescan(TEXT)["matches"]
+
+    assert [(match["term"], match["page"], match["offset"]) for match in matches] == [
+        ("termination", 1, PAGE_ONE.index("Termination")),
+        ("termination for cause", 1, PAGE_ONE.index("termination for cause")),
+        ("termination", 1, PAGE_ONE.index("Termination needs")),
+        ("penalty", 2, PAGE_TWO.index("penalty")),
+        ("fine", 2, PAGE_TWO.index("fines")),
+        ("dispute", 2, PAGE_TWO.index("Disputes")),
+        ("arbitration", 2, PAGE_TWO.index("arbitration")),
+    ]
+    assert {match["section"] for match in matches[:3]} == {"Termination"}
+    assert {match["section"] for match in matches[3:]} == {"Section 7 Payment"}
+
+
+def test_hits_before_the_first_heading_go_to_the_preamble():
+    result = prescan("Any breach leads to liability.\n\n## Payment\nNo risks here.")
+
+    assert result["sections"] == [
+        {"title": "Preamble", "page": 1, "counts": {"breach": 1, "liability": 1}, "total": 2},
+        {"title": "Payment", "page": 1, "counts": {}, "total": 0},
+    ]
+
+
+def test_matches_are_capped_but_counts_cover_every_hit(monkeypatch):
+    monkeypatch.setattr(risk_prescan, "MAX_MATCHES", 3)
+    result = prescan(TEXT)
+
+    assert len(result["matches"]) == 3
+    assert result["total"] == 7
+    assert sum(section["total"] for section in result["sections"]) == 7
+
+
+def test_format_prescan_lists_terms_and_the_busiest_sections():
+    assert format_prescan(prescan(TEXT)).splitlines() == [
+        "Quick risk scan (keywords only; the full analysis follows):",
+        "Terms: termination (2), termination for cause (1), penalty (1), fine (1), dispute (1), arbitration (1)",
+        "Sections with the most hits:",
+        "- Section 7 Payment (page 2): 4 — penalty 1, fine 1, dispute 1, arbitration 1",
+        "- Termination (page 1): 3 — termination 2, termination for cause 1",
+    ]
+    assert format_prescan(prescan(TEXT), max_sections=1).splitlines()[-1].startswith("- Section 7 Payment")
+
+
+def test_format_prescan_without_hits():
+    result = prescan("यो सम्झौता नेपालको कानुन अनुसार हुनेछ।\n\n-----\n\nThe parties agree.")
+
+    assert result["total"] == 0
+    assert result["pages"] == 2
+    assert format_prescan(result) == "Quick risk scan: no risky keywords found."
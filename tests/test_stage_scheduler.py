@@ -0,0 +1,122 @@
+import asyncio
+
+import pytest
+from autogen_core import CancellationToken
+
+from stage_scheduler import Stage, run_stages, validate_stages
+
+
+def _stage(name, log, depends_on=(), seconds=0.01, when=None, error=None):
+    async def run(context):
+        log.append(("start", name))
+        await asyncio.sleep(seconds)
+        if error is not None:
+            raise error
+        log.append(("end", name))
+        return f"{name} result"
+
+    return Stage(name, run, depends_on, when)
+
+
+def test_stages_start_after_their_dependencies_and_independent_ones_overlap():
+    log = []
+    stages = [
+        _stage("parse", log),
+        _stage("clauses", log, ("parse",)),
+        _stage("risks", log, ("clauses",), seconds=0.05),
+        _stage("summary", log, ("clauses",), seconds=0.05),
+        _stage("merge", log, ("risks", "summary")),
+    ]
+
+    context = asyncio.run(run_stages(stages, {"input": "text"}))
+
+    assert log.index(("end", "parse")) < log.index(("start", "clauses"))
+    assert log.index(("end", "clauses")) < min(log.index(("start", "risks")), log.index(("start", "summary")))
+    # risks and summary run at the same time.
+    assert max(log.index(("start", "risks")), log.index(("start", "summary"))) < \
+        min(log.index(("end", "risks")), log.index(("end", "summary")))
+    assert log[-2:] == [("start", "merge"), ("end", "merge")]
+    assert context["merge"] == "merge result"
+    assert context["input"] == "text"
+
+
+def test_max_concurrency_bounds_the_stages_running_at_once():
+    running = 0
+    peak = 0
+
+    async def run(context):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.02)
+        running -= 1
+
+    stages = [Stage(f"stage_{index}", run) for index in range(6)]
+    asyncio.run(run_stages(stages, {}, max_concurrency=2))
+
+    assert peak == 2
+
+
+def test_a_failing_stage_cancels_its_siblings_and_is_re_raised():
+    log = []
+    cancelled = []
+
+    async def slow(context):
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            cancelled.append("slow")
+            raise
+
+    stages = [
+        Stage("slow", slow),
+        _stage("failing", log, error=ValueError("model down")),
+        _stage("after", log, ("failing",)),
+    ]
+
+    with pytest.raises(ValueError, match="model down"):
+        asyncio.run(run_stages(stages, {}))
+    assert cancelled == ["slow"]
+    assert ("start", "after") not in log
+
+
+def test_skipped_stages_report_none_and_dependents_still_run():
+    log = []
+    completed = []
+    stages = [
+        _stage("translate", log, when=lambda context: context["language"] == "nepali"),
+        _stage("merge", log, ("translate",)),
+    ]
+
+    context = asyncio.run(run_stages(stages, {"language": "english"},
+                                     on_stage_complete=lambda name, result: completed.append((name, result))))
+
+    assert completed == [("translate", None), ("merge", "merge result")]
+    assert context["translate"] is None
+    assert ("start", "translate") not in log
+
+
+def test_no_stage_starts_once_the_token_is_cancelled():
+    log = []
+    token = CancellationToken()
+
+    async def first(context):
+        token.cancel()
+
+    stages = [Stage("first", first), _stage("second", log, ("first",))]
+
+    with pytest.raises(asyncio.CancelledError):
+        asyncio.run(run_stages(stages, {}, cancellation_token=token))
+    assert log == []
+
+
+@pytest.mark.parametrize("stages, message", [
+    ([Stage("a", None, ("b",)), Stage("b", None, ("a",))], "cycle"),
+    ([Stage("a", None, ("missing",))], "unknown stages"),
+    ([Stage("a", None), Stage("a", None)], "Duplicate"),
+])
+def test_invalid_graphs_are_rejected(stages, message):
+    with pytest.raises(ValueError, match=message):
+        validate_stages(stages)
+    with pytest.raises(ValueError, match=message):
+        asyncio.run(run_stages(stages, {}))
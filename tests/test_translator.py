@@ -0,0 +1,52 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.fake_backends import FakeTokenizer, FakeTranslator
+from translation_model.translator import TranslatorModel
+
+
+class SlowTokenizer(FakeTokenizer):
+    """A FakeTokenizer that takes a moment per text, so concurrent callers interleave."""
+
+    def tokenize(self, text: str) -> list[str]:
+        time.sleep(0.0005)
+        return super().tokenize(text)
+
+
+class RecordingTranslator(FakeTranslator):
+    """Records the source language tag and target prefix of every piece it is given."""
+
+    def __init__(self):
+        super().__init__()
+        self.pairs = []
+
+    def translate_batch(self, source, target_prefix=None, **kwargs):
+        self.pairs.extend((tokens[0], prefix[0]) for tokens, prefix in zip(source, target_prefix))
+        return super().translate_batch(source, target_prefix=target_prefix, **kwargs)
+
+
+def test_concurrent_language_pairs_encode_with_their_own_source_tag():
+    translator = RecordingTranslator()
+    model = TranslatorModel(translation_tokenizer=SlowTokenizer(), translation_model=translator)
+    texts = [f"sentence number {i} of the agreement" for i in range(20)]
+
+    def translate(pair):
+        src_lang, tgt_lang = pair
+        return model.translate_batch_with_model(texts, src_lang, tgt_lang)
+
+    pairs = [("npi_Deva", "eng_Latn"), ("eng_Latn", "npi_Deva")] * 8
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(translate, pairs))
+
+    assert translator.pairs
+    expected_source = {"eng_Latn": "npi_Deva", "npi_Deva": "eng_Latn"}
+    assert all(source == expected_source[target] for source, target in translator.pairs)
+
+
+def test_variants_of_several_words_keep_their_original_mapping():
+    model = TranslatorModel(translation_tokenizer=FakeTokenizer(), translation_model=FakeTranslator())
+
+    # "ramro" is listed under "राम्र्रो" and then "राम्रो", "ek" under "एक" and then "एउटा":
+    # SymSpell corrections take the first word, exact phrase replacement the last.
+    assert model.replace_with_symspell("ramro ek") == "राम्र्रो एक"
+    assert model.romanized_patterns.apply("ramro ek") == "राम्रो एउटा"
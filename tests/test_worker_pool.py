@@ -0,0 +1,51 @@
+import asyncio
+import queue
+import sys
+import types
+
+import pytest
+
+import worker_pool
+
+
+def test_a_cancelled_job_still_posts_a_result(monkeypatch):
+    started = asyncio.Event()
+
+    async def process_legal_document(document_path, language, model_router=None):
+        started.set()
+        await asyncio.sleep(60)
+
+    monkeypatch.setitem(sys.modules, "agents", types.SimpleNamespace(process_legal_document=process_legal_document))
+    results = queue.Queue()
+
+    async def run():
+        task = asyncio.create_task(worker_pool._process_job((7, "contract.pdf", "english"), results, None))
+        await started.wait()
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+    asyncio.run(run())
+
+    job_id, summary, error = results.get_nowait()
+    assert (job_id, summary) == (7, None)
+    assert error.startswith("CancelledError")
+
+
+def test_submit_fails_at_once_after_a_worker_died():
+    from benchmarks.fake_backends import FakeTokenizer, FakeTranslator
+
+    pool = worker_pool.WorkerPool(processes=1, jobs_per_worker=1, translation_model=FakeTranslator(),
+                                  translation_tokenizer=FakeTokenizer())
+    try:
+        pool.workers[0].kill()
+        pool.workers[0].join()
+        # The collector notices the dead process within a second of an empty result queue.
+        pool._collector.join(timeout=10)
+        assert not pool._collector.is_alive()
+
+        future = pool.submit("contract.pdf")
+
+        with pytest.raises(RuntimeError, match="exited unexpectedly"):
+            future.result(timeout=1)
+    finally:
+        pool.close()
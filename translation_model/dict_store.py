@@ -0,0 +1,282 @@
+"""
+Compact, memory-mapped dictionary store for translation glossaries.
+
+A compiled dictionary is one file:
+
+    header        magic "LGDICT01", entry count (uint64), value kind (0 = str, 1 = list of str)
+    key offsets   (count + 1) x uint64, into the key blob
+    value offsets (count + 1) x uint64, into the value blob
+    key blob      UTF-8 keys, sorted by their bytes
+    value blob    UTF-8 values (list values joined with \\x1f)
+
+The file is opened with mmap, so loading is instant whatever the size, lookups are a binary
+search over the sorted keys, and worker processes share the same pages of the OS page cache.
+CompiledDictionary is a read-only Mapping, so it can stand in for the dict literals in
+mapping_dictionary.py / romanized_to_nepali.py (and behind get_mapping_dict).
+
+The reverse direction (English -> Nepali, romanized variant -> Nepali) is a compiled file
+too: written with --reverse-output, or by open_reverse() next to the dictionary on first use,
+so no process has to rebuild it as a dict from the mapped one.
+
+Build from CSV / JSON sources:
+    python -m translation_model.dict_store build glossary.csv extra.json \\
+        --output nepali_to_english.dict --reverse-output english_to_nepali.dict
+Compile the built-in dictionaries:
+    python -m translation_model.dict_store builtin --output-dir dicts/
+Look up a key:
+    python -m translation_model.dict_store lookup nepali_to_english.dict "पोखरा"
+"""
+import argparse
+import csv
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from collections.abc import Mapping
+
+MAGIC = b"LGDICT01"
+HEADER = struct.Struct("<8sQB7x")
+VALUE_STR = 0
+VALUE_LIST = 1
+LIST_SEPARATOR = "\x1f"
+
+
+class CompiledDictionary(Mapping):
+    """Read-only Mapping over a compiled dictionary file, backed by mmap."""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as file:
+            self._mm = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self._count, self._value_kind = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a compiled dictionary")
+
+        offsets_size = (self._count + 1) * 8
+        view = memoryview(self._mm)
+        start = HEADER.size
+        self._key_offsets = view[start:start + offsets_size].cast("Q")
+        self._value_offsets = view[start + offsets_size:start + 2 * offsets_size].cast("Q")
+        self._key_base = start + 2 * offsets_size
+        self._value_base = self._key_base + self._key_offsets[self._count]
+
+    def _key_bytes(self, index: int) -> bytes:
+        return self._mm[self._key_base + self._key_offsets[index]:self._key_base + self._key_offsets[index + 1]]
+
+    def _value(self, index: int):
+        raw = self._mm[self._value_base + self._value_offsets[index]:
+                       self._value_base + self._value_offsets[index + 1]].decode("utf-8")
+        if self._value_kind == VALUE_LIST:
+            return raw.split(LIST_SEPARATOR) if raw else []
+        return raw
+
+    def _lower_bound(self, key: bytes, lo: int = 0, hi: int | None = None) -> int:
+        """Index of the first key >= key within [lo, hi)."""
+        if hi is None:
+            hi = self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._key_bytes(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def __getitem__(self, key: str):
+        encoded = key.encode("utf-8")
+        index = self._lower_bound(encoded)
+        if index < self._count and self._key_bytes(index) == encoded:
+            return self._value(index)
+        raise KeyError(key)
+
+    def __iter__(self):
+        for index in range(self._count):
+            yield self._key_bytes(index).decode("utf-8")
+
+    def __len__(self) -> int:
+        return self._count
+
+    def keys_prefixing(self, text: str, start: int = 0):
+        """
+        Yields (index, key) for every key that text[start:] starts with, shortest first.
+        The range of keys sharing the prefix is narrowed one character at a time and the
+        walk stops as soon as no key starts with the prefix.
+        """
+        lo, hi = 0, self._count
+        prefix = b""
+        for char in text[start:]:
+            prefix += char.encode("utf-8")
+            lo = self._lower_bound(prefix, lo, hi)
+            # UTF-8 never contains 0xff, so every key with this prefix sorts before prefix + 0xff.
+            hi = self._lower_bound(prefix + b"\xff", lo, hi)
+            if lo == hi:
+                return
+            if self._key_bytes(lo) == prefix:
+                yield lo, prefix.decode("utf-8")
+
+    def close(self) -> None:
+        self._key_offsets.release()
+        self._value_offsets.release()
+        self._mm.close()
+
+
+def write_compiled_dictionary(mapping: Mapping, path: str) -> None:
+    """
+    Writes the mapping as a compiled dictionary. Values must all be str or all be lists of str.
+    The file is written next to the target and renamed into place, so processes that have
+    the old file mapped (or are writing it at the same time) keep reading a consistent copy.
+    """
+    items = sorted(((key.encode("utf-8"), value) for key, value in mapping.items()), key=lambda item: item[0])
+    value_kind = VALUE_LIST if items and isinstance(items[0][1], (list, tuple)) else VALUE_STR
+
+    key_offsets = array("Q", [0])
+    value_offsets = array("Q", [0])
+    key_blob = bytearray()
+    value_blob = bytearray()
+    for key, value in items:
+        if value_kind == VALUE_LIST:
+            value = LIST_SEPARATOR.join(value)
+        key_blob += key
+        value_blob += value.encode("utf-8")
+        key_offsets.append(len(key_blob))
+        value_offsets.append(len(value_blob))
+    if sys.byteorder != "little":
+        key_offsets.byteswap()
+        value_offsets.byteswap()
+
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as file:
+        file.write(HEADER.pack(MAGIC, len(items), value_kind))
+        key_offsets.tofile(file)
+        value_offsets.tofile(file)
+        file.write(key_blob)
+        file.write(value_blob)
+    os.replace(tmp_path, path)
+
+
+def reverse_mapping(mapping: Mapping) -> dict:
+    """
+    Returns the value -> key direction of a mapping, as the translator derived it from the
+    built-in dictionaries:
+    - str values are lowercased, and the last key with a value wins (english_to_nepali_dict);
+    - every variant of list values maps to the first key listing it (romanized variant ->
+      Nepali word, as the SymSpell correction looks it up).
+    Keys are taken in iteration order (for a compiled dictionary, sorted order).
+    """
+    reverse = {}
+    for key, value in mapping.items():
+        if isinstance(value, (list, tuple)):
+            for variant in value:
+                reverse.setdefault(variant, key)
+        else:
+            reverse[value.lower()] = key
+    return reverse
+
+
+def open_reverse(dictionary: CompiledDictionary, path: str | None = None) -> CompiledDictionary:
+    """
+    Returns the compiled reverse (see reverse_mapping) of a compiled dictionary, read from
+    path (default: the dictionary's path + ".reverse"). It is compiled there first when it is
+    missing or older than the dictionary; later processes only map it.
+    """
+    path = path or f"{dictionary.path}.reverse"
+    if not os.path.exists(path) or os.path.getmtime(path) < os.path.getmtime(dictionary.path):
+        write_compiled_dictionary(reverse_mapping(dictionary), path)
+    return CompiledDictionary(path)
+
+
+def read_source(path: str, list_values: bool) -> dict:
+    """
+    Reads a glossary source file.
+    - .json: an object of key -> value (or key -> list of values)
+    - .csv: rows of key,value (first two columns); lines starting with # are skipped.
+      With list_values, repeated keys collect their values into a list.
+    """
+    if path.endswith(".json"):
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if list_values:
+            return {key: value if isinstance(value, list) else [value] for key, value in data.items()}
+        return data
+
+    entries = {}
+    with open(path, "r", newline="", encoding="utf-8") as f:
+        for row in csv.reader(f):
+            if len(row) < 2 or row[0].startswith("#"):
+                continue
+            key, value = row[0].strip(), row[1].strip()
+            if list_values:
+                values = entries.setdefault(key, [])
+                if value not in values:
+                    values.append(value)
+            else:
+                entries[key] = value
+    return entries
+
+
+def build(sources: list[str], output: str, reverse_output: str | None = None, list_values: bool = False) -> int:
+    """
+    Merges the sources (later ones win for str values, list values are combined) and
+    compiles them. With reverse_output, also compiles the value -> key direction there
+    (see reverse_mapping).
+    Returns the number of entries written.
+    """
+    merged = {}
+    for source in sources:
+        for key, value in read_source(source, list_values).items():
+            if list_values and key in merged:
+                merged[key] += [item for item in value if item not in merged[key]]
+            else:
+                merged[key] = value
+    write_compiled_dictionary(merged, output)
+    if reverse_output:
+        write_compiled_dictionary(reverse_mapping(merged), reverse_output)
+    return len(merged)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Build and query compiled translation dictionaries.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    build_parser = commands.add_parser("build", help="Compile CSV/JSON sources into a dictionary file.")
+    build_parser.add_argument("sources", nargs="+", help="CSV or JSON glossary files.")
+    build_parser.add_argument("--output", required=True)
+    build_parser.add_argument("--reverse-output", help="Also write the value -> key dictionary here.")
+    build_parser.add_argument("--list-values", action="store_true",
+                              help="Values are lists (e.g. romanized variants of a Nepali word).")
+
+    builtin_parser = commands.add_parser("builtin", help="Compile the built-in dictionaries.")
+    builtin_parser.add_argument("--output-dir", required=True)
+
+    lookup_parser = commands.add_parser("lookup", help="Look up a key in a compiled dictionary.")
+    lookup_parser.add_argument("path")
+    lookup_parser.add_argument("key")
+
+    args = parser.parse_args(argv)
+    if args.command == "build":
+        count = build(args.sources, args.output, args.reverse_output, args.list_values)
+        print(f"Wrote {count} entries to {args.output}")
+    elif args.command == "builtin":
+        from translation_model import mapping_dictionary, romanized_to_nepali
+
+        os.makedirs(args.output_dir, exist_ok=True)
+        for name, mapping in [
+            ("nepali_to_english.dict", mapping_dictionary.nepali_to_english_dict),
+            ("english_to_nepali.dict", mapping_dictionary.english_to_nepali_dict),
+            ("nepali_to_romanized.dict", romanized_to_nepali.nepali_to_romanized_dict),
+        ]:
+            write_compiled_dictionary(mapping, os.path.join(args.output_dir, name))
+            print(f"Wrote {len(mapping)} entries to {os.path.join(args.output_dir, name)}")
+    else:
+        value = CompiledDictionary(args.path).get(args.key)
+        if value is None:
+            print(f"{args.key!r} not found")
+            return 1
+        print(value)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
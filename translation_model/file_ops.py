@@ -4,6 +4,7 @@ Functions for saving and retrieving translation results from CSV as cache and JS
 import os
 import csv
 import json
+import threading
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -11,6 +12,11 @@ load_dotenv()
 cache_path = os.getenv("CACHE_CSV")
 nllb_json_file = os.getenv("NLLB_JSON")
 
+# In-memory index of each cache CSV: {csv_path: {"offset": bytes read so far, "entries": {...}}}.
+# Lookups only parse rows appended since the last lookup instead of rereading the whole file.
+_cache_index = {}
+_cache_lock = threading.Lock()
+
 
 def save_to_csv(
     target_language_tag: str,
@@ -37,6 +43,59 @@ def save_to_csv(
         writer.writerow([target_language_tag ,original_sentence, final_response, context])
 
 
+def _complete_rows(data: bytes):
+    """
+    Yields (row, end) for every complete CSV row in data, end being the byte offset just after it.
+    A row whose last line has no newline yet, or whose quoted field runs past the end of data
+    (a multi-line field another writer has flushed in parts), is incomplete and ends the rows.
+    """
+    consumed = 0
+    exhausted = False
+
+    def lines():
+        nonlocal consumed, exhausted
+        start = 0
+        while (newline := data.find(b'\n', start)) != -1:
+            consumed = newline + 1
+            yield data[start:consumed].decode('utf-8')
+            start = consumed
+        exhausted = True
+
+    # csv.reader only asks for another line while the row is unfinished, so a row it returns
+    # after running out of lines was cut off by the end of data.
+    for row in csv.reader(lines()):
+        if exhausted:
+            return
+        yield row, consumed
+
+
+def _refresh_cache_index(csv_path: str) -> dict:
+    """
+    Reads rows appended to the cache CSV since the last call into the in-memory index
+    and returns its entries, keyed by (target_language_tag, original_sentence, context).
+    The first row for a key wins, like a top-to-bottom scan of the file.
+    """
+    index = _cache_index.setdefault(csv_path, {"offset": 0, "entries": {}})
+    size = os.path.getsize(csv_path)
+    if size < index["offset"]:
+        # The file was truncated or replaced, start over.
+        index["offset"] = 0
+        index["entries"] = {}
+    if size > index["offset"]:
+        with open(csv_path, mode='rb') as file:
+            file.seek(index["offset"])
+            data = file.read()
+        # Rows that another writer has only partly written are left for the next call.
+        end = 0
+        for number, (row, end) in enumerate(_complete_rows(data)):
+            if number == 0 and index["offset"] == 0:
+                continue  # header
+            if len(row) >= 4:
+                index["entries"].setdefault((row[0], row[1], row[3]), row[2])
+        index["offset"] += end
+    return index["entries"]
+
+
 def check_existing_translation(
     target_language_tag: str,
     original_sentence: str,
@@ -54,15 +113,11 @@ def check_existing_translation(
         str or None: The existing translated sentence if found, otherwise None.
     """
     try:
-        with open(csv_path, mode='r', newline='', encoding= 'utf-8') as file:
-            reader = csv.reader(file)
-            next(reader)
-            for row in reader:
-                if row[0] == target_language_tag and row[1] == original_sentence and row[3] == context:
-                    return row[2]
+        with _cache_lock:
+            entries = _refresh_cache_index(csv_path)
+            return entries.get((target_language_tag, original_sentence, context))
     except FileNotFoundError:
         return None
-    return None
 
 
 def save_debug_json(data: dict, path= nllb_json_file):
@@ -1,7 +1,9 @@
 #this is the mapping for nepali -english dict
-import json
-import pandas as pd
 import os
+from dotenv import load_dotenv
+from translation_model.dict_store import CompiledDictionary, open_reverse
+
+load_dotenv()
 
 nepali_to_english_dict = {
     "ग्लोबल": "global",
@@ -501,7 +503,19 @@ nepali_to_english_dict = {
 
 }
 
-english_to_nepali_dict = {v.lower(): k for k, v in nepali_to_english_dict.items()}
+# Large glossaries are compiled with `python -m translation_model.dict_store build` and
+# memory-mapped instead of being held as dict literals; they replace the built-in ones when set.
+if os.getenv("NEPALI_ENGLISH_DICT"):
+    nepali_to_english_dict = CompiledDictionary(os.getenv("NEPALI_ENGLISH_DICT"))
+
+# A compiled Nepali -> English dictionary gets a compiled reverse too, rather than a dict
+# rebuilt from every entry of the mapped file.
+if os.getenv("ENGLISH_NEPALI_DICT"):
+    english_to_nepali_dict = CompiledDictionary(os.getenv("ENGLISH_NEPALI_DICT"))
+elif isinstance(nepali_to_english_dict, CompiledDictionary):
+    english_to_nepali_dict = open_reverse(nepali_to_english_dict)
+else:
+    english_to_nepali_dict = {v.lower(): k for k, v in nepali_to_english_dict.items()}
 
 def get_mapping_dict(dict_type):
     if dict_type.lower() == 'nepali':
@@ -1,16 +1,31 @@
 """This module handles the translation pipeline, including preprocessing, translation, and postprocessing."""
-import re
 import logging
-from translation_model.translator import TranslatorModel
+from translation_model.translator import TranslatorModel, check_cancelled
+from translation_model.segmenter import normalize_bold_spacing
 from translation_model.file_ops import save_to_csv, check_existing_translation, save_debug_json
 
 
 logger = logging.getLogger(__name__)
-model = TranslatorModel()
+model = None
+
+
+def get_translator_model() -> TranslatorModel:
+    """Returns the shared TranslatorModel, loading it on first use."""
+    global model
+    if model is None:
+        model = TranslatorModel()
+    return model
+
+
+def set_translator_model(translator_model: TranslatorModel) -> None:
+    """Replaces the shared TranslatorModel, e.g. with one built on fake backends."""
+    global model
+    model = translator_model
 
 
 def _preprocess_text(text: str) -> dict:
     """Preprocess the input text: replace URLs, split lines, and strip symbols."""
+    model = get_translator_model()
     # this will replace urls
     sentence_with_placeholders, placeholder_map = model.mask_urls_with_placeholders(text)
     logger.info("This is sentence with placeholders: %s", sentence_with_placeholders)
@@ -37,16 +52,18 @@ def _translate_sentences(
     sentences: list[str],
     src_lang: str,
     tgt_lang: str,
-    context: str)-> list[str]:
+    context: str,
+    mode: str = "quality",
+    cancellation_token=None)-> list[str]:
     """Translate a list of cleaned text parts."""
-    return [
-        model.translate_single_sentence(sentence, src_lang, tgt_lang, context=context)
-        for sentence in sentences
-    ]
+    model = get_translator_model()
+    return model.translate_sentences(sentences, src_lang, tgt_lang, context=context, mode=mode,
+                                     cancellation_token=cancellation_token)
 
 
 def _postprocess_text(processed: dict, translated: list[str], tgt_lang: str) -> str:
     """Reassemble the translated output with symbols and formatting."""
+    model = get_translator_model()
     translated_with_symbols = model.reinsert_punctuation_tokens(processed["split_with_symbols"], translated)
     logger.info("This is translated with symbols: %s", translated_with_symbols)
     translated_with_symbols = [
@@ -55,7 +72,7 @@ def _postprocess_text(processed: dict, translated: list[str], tgt_lang: str) ->
         for item in translated_with_symbols
     ]
     final_text = model.assemble_final_text(translated_with_symbols)
-    translated_text = re.sub(r'\*\*\s*(.*?)\s*\*\*', r'**\1**', final_text)
+    translated_text = normalize_bold_spacing(final_text)
 
     if tgt_lang == 'npi_Deva':
         translated_text = model.replace_dot(translated_text)
@@ -66,7 +83,9 @@ def _postprocess_text(processed: dict, translated: list[str], tgt_lang: str) ->
 def run_translation_pipeline(
     text: str,
     src_lang: str,
-    tgt_lang: str) -> str:
+    tgt_lang: str,
+    mode: str = "quality",
+    cancellation_token=None) -> str:
     """
     Executes the full translation pipeline:
     1. Checks if result exists
@@ -74,21 +93,33 @@ def run_translation_pipeline(
     3. Translates
     4. Postprocesses
     5. Saves to CSV + JSON
+
+    mode is "quality" (beam search, for user-facing output) or "fast" (greedy decoding,
+    possibly on a smaller checkpoint, for internal passes like clause extraction).
+    Results of each mode are cached separately.
+
+    cancellation_token (e.g. an autogen_core.CancellationToken) is checked between batches;
+    once it is cancelled the pipeline raises asyncio.CancelledError, which is not wrapped in
+    RuntimeError, and nothing is cached.
     """
     context = "answer"
+    # The quality mode keeps the plain context so existing cache entries stay valid.
+    cache_context = context if mode == "quality" else f"{context}_{mode}"
     try:
         logger.info("Starting translation for: %s", text)
-        cached = check_existing_translation(tgt_lang, text, context)
+        cached = check_existing_translation(tgt_lang, text, cache_context)
         if cached:
             logger.info("Using cached result.")
             return cached
 
         processed = _preprocess_text(text)
-        translated = _translate_sentences(processed["text_only"], src_lang, tgt_lang, context= context)
+        check_cancelled(cancellation_token)
+        translated = _translate_sentences(processed["text_only"], src_lang, tgt_lang, context= context, mode=mode,
+                                          cancellation_token=cancellation_token)
         final_response = _postprocess_text(processed, translated, tgt_lang)
 
         # Save output
-        save_to_csv(tgt_lang, text, final_response, context)
+        save_to_csv(tgt_lang, text, final_response, cache_context)
         save_debug_json({
             "original_sentence": text,
             **processed,
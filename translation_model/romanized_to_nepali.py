@@ -1,5 +1,8 @@
-import pandas as pd
 import os
+from dotenv import load_dotenv
+from translation_model.dict_store import CompiledDictionary, open_reverse
+
+load_dotenv()
 
 nepali_to_romanized_dict = {
     "तपाईं": ["tapai"],
@@ -386,11 +389,27 @@ nepali_to_romanized_dict = {
     "बाट": ["bata"],
 
 }
-
-def replace_words(text):
-    flattened_mapping = {
+# A compiled dictionary (built with --list-values) replaces the built-in one when set.
+# Its romanized variant -> Nepali direction is then compiled as well (see dict_store.open_reverse).
+#
+# A variant listed under several Nepali words (e.g. "ramro") maps to the first of them for
+# SymSpell corrections (romanized_to_nepali_dict) but to the last for exact phrase
+# replacement (romanized_phrase_dict), as the translator has always done with the built-in
+# dictionary. A compiled dictionary has one reverse, where the first word wins for both.
+if os.getenv("NEPALI_ROMANIZED_DICT"):
+    nepali_to_romanized_dict = CompiledDictionary(os.getenv("NEPALI_ROMANIZED_DICT"))
+    romanized_to_nepali_dict = open_reverse(nepali_to_romanized_dict)
+    romanized_phrase_dict = romanized_to_nepali_dict
+else:
+    romanized_to_nepali_dict = {}
+    for key, values in nepali_to_romanized_dict.items():
+        for value in values:
+            romanized_to_nepali_dict.setdefault(value, key)
+    romanized_phrase_dict = {
         value: key for key, values in nepali_to_romanized_dict.items()
-        for value in (values if isinstance(values, list) else [values])
+        for value in values
     }
-    replaced_text = " ".join([flattened_mapping.get(word, word) for word in text.split()])
+
+def replace_words(text):
+    replaced_text = " ".join([romanized_phrase_dict.get(word, word) for word in text.split()])
     return replaced_text
\ No newline at end of file
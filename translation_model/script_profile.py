@@ -0,0 +1,73 @@
+"""
+Script profiling for mixed Nepali/English documents.
+
+Instead of translating a whole document because it contains one Devanagari character,
+the text is profiled line by line (Devanagari vs Latin letters, in one scan per line) and
+consecutive lines are grouped into spans by their dominant script. Only Nepali-dominant
+spans need to go through the translation pipeline; English spans pass through untouched.
+"""
+import re
+
+# Runs of Devanagari or Latin letters; counting run lengths scans each line once.
+SCRIPT_RUN_PATTERN = re.compile(r'([\u0900-\u097F]+)|([A-Za-z]+)')
+DEVANAGARI_PATTERN = re.compile(r'[\u0900-\u097F]')
+
+# A line is Nepali-dominant when at least this share of its letters are Devanagari.
+NEPALI_DOMINANCE_RATIO = 0.5
+
+
+def count_scripts(text: str) -> tuple[int, int]:
+    """This function returns (Devanagari letters, Latin letters) in the text."""
+    devanagari = 0
+    latin = 0
+    for match in SCRIPT_RUN_PATTERN.finditer(text):
+        if match.lastindex == 1:
+            devanagari += match.end() - match.start()
+        else:
+            latin += match.end() - match.start()
+    return devanagari, latin
+
+
+def profile_script(text: str) -> dict:
+    """
+    This function returns script statistics of the text:
+    Devanagari and Latin letter counts and the Devanagari share of all letters.
+    """
+    devanagari, latin = count_scripts(text)
+    letters = devanagari + latin
+    return {
+        "devanagari": devanagari,
+        "latin": latin,
+        "devanagari_ratio": devanagari / letters if letters else 0.0,
+    }
+
+
+def split_script_spans(text: str) -> list[tuple[str, bool]]:
+    """
+    This function splits the text into spans of consecutive lines with the same dominant script.
+
+    Lines without letters (blank lines, numbers, separators) join the span before them,
+    so tables of figures do not break a Nepali paragraph into pieces.
+
+    Returns:
+        list[tuple[str, bool]]: (span text including its newlines, is_nepali) in document order.
+        Joining the span texts gives back the original text.
+    """
+    spans = []
+    current_lines = []
+    current_is_nepali = None
+    for line in text.splitlines(keepends=True):
+        devanagari, latin = count_scripts(line)
+        if devanagari + latin == 0:
+            is_nepali = current_is_nepali
+        else:
+            is_nepali = devanagari / (devanagari + latin) >= NEPALI_DOMINANCE_RATIO
+        if current_lines and is_nepali is not None and current_is_nepali is not None and is_nepali != current_is_nepali:
+            spans.append((''.join(current_lines), current_is_nepali))
+            current_lines = []
+        current_lines.append(line)
+        if is_nepali is not None:
+            current_is_nepali = is_nepali
+    if current_lines:
+        spans.append((''.join(current_lines), bool(current_is_nepali)))
+    return spans
@@ -0,0 +1,204 @@
+"""
+Precompiled patterns and the punctuation segmenter used by TranslatorModel's
+preprocessing and postprocessing stages.
+
+Every pattern here is compiled once at import instead of on each call. The punctuation
+splitter replaces a regex whose "outside of **bold**" lookahead rescanned the rest of the
+line for every punctuation mark (quadratic on long markdown lines) with a single pass over
+the line's `*` runs, while producing exactly the same segments. Dictionary phrase
+replacement only tries the phrases whose leading word occurs in the text (PhraseReplacer).
+"""
+import heapq
+import re
+from bisect import bisect_right
+from functools import lru_cache
+
+PUNCTUATION_TOKENS = frozenset({'–', '.', ':', '?', '/', '!', '\n'})
+
+URL_EMAIL_PATTERN = re.compile(r'\b(?:https?:\/\/|www\.)\S+|\S+@\S+\.\S+')
+# URL placeholders look like xurl1x, xurl2x, ...: the closing x keeps xurl1x from being a
+# prefix of xurl10x. If the text already contains "xurl", the tag grows (xurlq1x, ...).
+PLACEHOLDER_TAG = 'xurl'
+PLACEHOLDER_PATTERN = re.compile(r'xurlq*\d+x', re.IGNORECASE)
+NEWLINE_PATTERN = re.compile(r'(\n)')
+MA_KO_PATTERN = re.compile(r'(?<=\S)(मा|को)(?=\s|[.,!?;])')
+BOLD_SPACING_PATTERN = re.compile(r'\*\*\s*(.*?)\s*\*\*')
+SENTENCE_BOUNDARY_PATTERN = re.compile(r'(?<=[।॥.!?])\s+')
+
+HONORIFIC_DOT_PATTERN = re.compile(r'(' + '|'.join(['श्री', 'श्रीमती', 'प्रा', 'डा', 'ई']) + r')\.')
+DOT_PATTERN = re.compile(r'(?<!\d)\.')
+REPEATED_DANDA_PATTERN = re.compile(r'।।+')
+REPEATED_QUESTION_PATTERN = re.compile(r'\?{2,}')
+WORD_PATTERN = re.compile(r'\w+')
+
+_SPLIT_CANDIDATE_PATTERN = re.compile(r'[–!?:/.]')
+_STAR_RUN_PATTERN = re.compile(r'\*+')
+_ASCII_LETTERS = frozenset('abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ')
+
+
+def placeholder_tag_for(text: str) -> str:
+    """This function picks a placeholder tag that does not already occur in the text."""
+    lowered = text.lower()
+    tag = PLACEHOLDER_TAG
+    while tag in lowered:
+        tag += 'q'
+    return tag
+
+
+def _is_split_point(part: str, index: int) -> bool:
+    """
+    Checks the character rules of the original splitter at part[index]:
+    - ! ? : / split unless they sit between two digits (e.g. 10:30, 1/2)
+    - – splits unless a digit follows
+    - . splits unless it touches an ASCII letter (e.g. Rs.) or sits between two digits
+    """
+    char = part[index]
+    prev_char = part[index - 1] if index else ''
+    next_char = part[index + 1] if index + 1 < len(part) else ''
+    between_digits = prev_char.isdecimal() and next_char.isdecimal()
+
+    if char == '–':
+        return not next_char.isdecimal()
+    if char == '.':
+        return (prev_char not in _ASCII_LETTERS
+                and next_char not in _ASCII_LETTERS
+                and not between_digits)
+    return not between_digits
+
+
+def split_part_on_punctuation(part: str) -> list[str]:
+    """
+    This function splits one line on punctuation outside of **bold** spans,
+    keeping the punctuation marks as separate items.
+
+    A mark counts as outside bold when the rest of the line holds only whole `**` pairs
+    (every `*` run has even length and the `**` count is even). That is computed once
+    per line from the `*` runs, so the whole split is linear in the line length.
+    """
+    runs = [(match.start(), len(match.group())) for match in _STAR_RUN_PATTERN.finditer(part)]
+    run_starts = [start for start, _ in runs]
+
+    # outside_bold[k] is True when the runs from k onwards leave the text outside bold.
+    outside_bold = [True] * (len(runs) + 1)
+    stars = 0
+    all_even = True
+    for k in range(len(runs) - 1, -1, -1):
+        stars += runs[k][1]
+        all_even = all_even and runs[k][1] % 2 == 0
+        outside_bold[k] = all_even and stars % 4 == 0
+
+    pieces = []
+    last = 0
+    for match in _SPLIT_CANDIDATE_PATTERN.finditer(part):
+        index = match.start()
+        if not outside_bold[bisect_right(run_starts, index)] or not _is_split_point(part, index):
+            continue
+        if index > last:
+            pieces.append(part[last:index])
+        pieces.append(part[index])
+        last = index + 1
+    if last < len(part):
+        pieces.append(part[last:])
+    return pieces
+
+
+def split_on_punctuation(text_parts: list[str]) -> list[str]:
+    """This function splits every part on punctuation and drops empty items."""
+    final_result = []
+    for part in text_parts:
+        if part:
+            final_result.extend(split_part_on_punctuation(part))
+    return final_result
+
+
+def split_sentences(text: str) -> list[str]:
+    """This function splits text after sentence-ending marks (। ॥ . ! ?) followed by whitespace."""
+    return [sentence for sentence in SENTENCE_BOUNDARY_PATTERN.split(text) if sentence]
+
+
+def normalize_bold_spacing(text: str) -> str:
+    """This function removes spaces just inside **bold** markers."""
+    return BOLD_SPACING_PATTERN.sub(r'**\1**', text)
+
+
+@lru_cache(maxsize=65536)
+def _phrase_pattern(phrase: str) -> re.Pattern:
+    return re.compile(r'\b' + re.escape(phrase) + r'\b')
+
+
+class PhraseReplacer:
+    """
+    Whole-word phrase replacement, longest phrase first, so multi-word phrases are replaced
+    before single words.
+
+    Applying one compiled pattern per dictionary entry costs O(entries) per call, which does
+    not scale to large glossaries. A phrase starting with a word character can only match
+    where a \\w+ run of the text starts, so only the phrases found there are tried, in the
+    same order as before:
+    - for a dict, phrases are indexed by their leading \\w+ run;
+    - for a CompiledDictionary (translation_model.dict_store), the sorted keys are walked
+      for every key that the text at that position starts with.
+    Phrases starting with any other character are always tried. After each replacement the
+    candidates are collected again, so the result is identical to applying every pattern in turn.
+    """
+
+    def __init__(self, mapping):
+        self.mapping = mapping
+        self._compiled = hasattr(mapping, "keys_prefixing")
+        self._by_leading_word = {}
+        self._unanchored = None
+        if not self._compiled:
+            self._unanchored = []
+            for index, phrase in enumerate(mapping):
+                item = (-len(phrase), index, phrase)
+                match = WORD_PATTERN.match(phrase)
+                if match:
+                    self._by_leading_word.setdefault(match.group(), []).append(item)
+                else:
+                    self._unanchored.append(item)
+
+    def _unanchored_candidates(self) -> list:
+        if self._unanchored is None:
+            # One scan of the compiled dictionary, on first use.
+            self._unanchored = [
+                (-len(phrase), index, phrase)
+                for index, phrase in enumerate(self.mapping)
+                if not WORD_PATTERN.match(phrase)
+            ]
+        return self._unanchored
+
+    def _candidates(self, text: str) -> list:
+        """Returns (-length, order, phrase) for every phrase that may match in the text."""
+        if self._compiled:
+            candidates = [
+                (-len(phrase), index, phrase)
+                for match in WORD_PATTERN.finditer(text)
+                for index, phrase in self.mapping.keys_prefixing(text, match.start())
+            ]
+        else:
+            candidates = [
+                item
+                for word in set(WORD_PATTERN.findall(text))
+                for item in self._by_leading_word.get(word, ())
+            ]
+        return candidates + self._unanchored_candidates()
+
+    def apply(self, text: str) -> str:
+        """This function applies the phrase replacements to the text."""
+        queue = list(set(self._candidates(text)))
+        queued = set(queue)
+        heapq.heapify(queue)
+
+        while queue:
+            item = heapq.heappop(queue)
+            phrase = item[2]
+            if phrase not in text:
+                continue
+            text, count = _phrase_pattern(phrase).subn(self.mapping[phrase], text)
+            if not count:
+                continue
+            for candidate in self._candidates(text):
+                if candidate > item and candidate not in queued:
+                    queued.add(candidate)
+                    heapq.heappush(queue, candidate)
+        return text
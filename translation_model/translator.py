@@ -1,14 +1,13 @@
 """This is a translation helper class that handles preprocessing, translation, and postprocessing"""
+import asyncio
 import os
 import warnings
 import re
 import logging
-import torch
-import ctranslate2
-import transformers
+import threading
 from translation_model.mapping_dictionary import nepali_to_english_dict, english_to_nepali_dict
-from translation_model.romanized_to_nepali import nepali_to_romanized_dict
-from symspellpy.symspellpy import SymSpell, Verbosity
+from translation_model.romanized_to_nepali import romanized_phrase_dict, romanized_to_nepali_dict
+from translation_model import segmenter
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -20,6 +19,75 @@ logger = logging.getLogger(__name__)
 
 warnings.filterwarnings("ignore")
 
+# Segments longer than this (in NLLB tokens) are split before translation instead of truncated.
+MAX_SEGMENT_TOKENS = int(os.getenv("TRANSLATION_MAX_SEGMENT_TOKENS", "256"))
+# (upper token length, beam size): short segments keep a wide beam, long ones use a narrow one.
+LENGTH_BUCKETS = ((32, 4), (96, 4), (MAX_SEGMENT_TOKENS, 2))
+MAX_BATCH_SIZE = 32
+# max_decoding_length of a batch = longest source length * ratio + 16
+DECODING_LENGTH_RATIO = 2.0
+# Romanized words are corrected to variants at most this far away. SymSpell precomputes the
+# deletes of every variant up to its max distance, so the index is built for this distance only
+# (distance 2 made it several times larger without ever being looked up).
+SYMSPELL_MAX_EDIT_DISTANCE = 1
+
+# Decoding settings per translation mode.
+# "quality" is for user-facing output: beam search with the beam size of the length bucket.
+# "fast" is for internal passes (e.g. clause extraction): greedy decoding, optionally on a
+# smaller distilled checkpoint (TRANSLATION_MODEL_FAST) with a cheaper compute type.
+TRANSLATION_MODES = {
+    "quality": {
+        "model_path": translation_model_path,
+        "compute_type": os.getenv("TRANSLATION_COMPUTE_TYPE", "default"),
+        "beam_size": None,
+        "sampling_topk": 1,
+        "length_penalty": 1.0,
+        "decoding_length_ratio": DECODING_LENGTH_RATIO,
+    },
+    "fast": {
+        "model_path": os.getenv("TRANSLATION_MODEL_FAST") or translation_model_path,
+        "compute_type": os.getenv("TRANSLATION_COMPUTE_TYPE_FAST") or os.getenv("TRANSLATION_COMPUTE_TYPE", "default"),
+        "beam_size": 1,
+        "sampling_topk": 1,
+        "length_penalty": 1.0,
+        "decoding_length_ratio": 1.5,
+    },
+}
+
+def select_device() -> str:
+    """Returns "cuda" if CTranslate2 can see a GPU, otherwise "cpu"."""
+    import ctranslate2
+
+    return "cuda" if ctranslate2.get_cuda_device_count() > 0 else "cpu"
+
+
+def load_translation_model(mode: str, device: str, loaded: dict):
+    """
+    Returns the CTranslate2 translator of a mode from `loaded`, loading it on first use.
+    `loaded` is keyed by (model path, compute type), so modes sharing a checkpoint share it.
+    """
+    settings = TRANSLATION_MODES[mode]
+    key = (settings["model_path"], settings["compute_type"])
+    if key not in loaded:
+        logger.info("Loading translation model %s (%s) for %s mode", key[0], key[1], mode)
+        import ctranslate2
+
+        loaded[key] = ctranslate2.Translator(
+            settings["model_path"], device=device, compute_type=settings["compute_type"]
+        )
+    return loaded[key]
+
+
+def check_cancelled(cancellation_token) -> None:
+    """
+    Raises asyncio.CancelledError once cancellation_token (anything with is_cancelled(), e.g.
+    an autogen_core.CancellationToken) is cancelled. Translation runs in worker threads, which
+    asyncio cannot interrupt, so long loops call this between steps to stop abandoned work.
+    """
+    if cancellation_token is not None and cancellation_token.is_cancelled():
+        raise asyncio.CancelledError()
+
+
 class TranslatorModel:
     """
     A translation helper class that handles preprocessing, translation, and postprocessing
@@ -30,59 +98,89 @@ class TranslatorModel:
     - Replace and restore URLs/email placeholders
     - Handle punctuation and newline preservation
     - Perform dictionary-based replacements for Romanized and Nepali words
-    - Translate text using beam search
+    - Translate text using beam search, batched by segment length
     - Restore symbols and apply language-specific formatting (e.g., Nepali danda '।')
 
     This class is designed to support modular and clean translation workflows for
     applications involving code-mixed or Romanized Nepali-English text.
     """
 
-    def __init__(self):
-        self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+    def __init__(self, translation_tokenizer=None, translation_model=None):
+        """
+        Loads the tokenizer and CTranslate2 model from TRANSLATION_MODEL.
+        Either backend can be passed in instead (e.g. a fake one for offline benchmarks),
+        in which case nothing is loaded from disk for it and every mode uses it.
+        The checkpoint of the "fast" mode is loaded on first use.
+        """
+        # transformers, CTranslate2 and SymSpell are imported on first use rather than at module
+        # import, so importing the pipeline stays cheap and nothing is loaded for injected backends.
+        self.device = select_device() if translation_model is None else "cpu"
         logger.info("Using device: %s", self.device)
 
         self.translation_model_path = translation_model_path
-        self.translation_tokenizer=transformers.AutoTokenizer.from_pretrained(
-            self.translation_model_path
-        )
-        self.translation_model = ctranslate2.Translator(self.translation_model_path, device="cuda")
-        self.sym_spell = SymSpell(max_dictionary_edit_distance=2, prefix_length=7)
-        self._build_symspell_dictionary()
+        if translation_tokenizer is None:
+            from transformers import AutoTokenizer
+
+            translation_tokenizer = AutoTokenizer.from_pretrained(self.translation_model_path)
+        self.translation_tokenizer = translation_tokenizer
+        # The tokenizer is shared by every thread translating with this model (parsing one
+        # document and translating another's summary run at the same time), but its language
+        # pair is state on the tokenizer and the fast tokenizer cannot be used from two
+        # threads at once ("Already borrowed"). Setting the pair and encoding or decoding
+        # happen under this lock; the translation itself does not.
+        self._tokenizer_lock = threading.Lock()
+        self.injected_translation_model = translation_model
+        # CTranslate2 translators keyed by (model path, compute type), shared between modes.
+        self.translation_models = {}
+        self.translation_model = self._translation_model_for("quality")
+        # SymSpell has no on-disk index, so its dictionary is built in memory, on the first
+        # romanized text rather than here (see _symspell).
+        self.sym_spell = None
+        self._sym_spell_lock = threading.Lock()
+
+        # Dictionary phrase replacers are built once here instead of on every call.
+        # The romanized variant -> Nepali maps are shared with romanized_to_nepali (a compiled,
+        # memory-mapped file when NEPALI_ROMANIZED_DICT is set) rather than rebuilt here.
+        self.romanized_mapping = romanized_phrase_dict
+        self.romanized_variant_to_nepali = romanized_to_nepali_dict
+        self.nepali_to_english_patterns = segmenter.PhraseReplacer(nepali_to_english_dict)
+        self.english_to_nepali_patterns = segmenter.PhraseReplacer(english_to_nepali_dict)
+        self.romanized_patterns = segmenter.PhraseReplacer(self.romanized_mapping)
 
     def mask_urls_with_placeholders(self, text: str ) -> tuple[str, dict[str]]:
         """This function replaces URLs and email addresses in the text with placeholders.
-        like u1, u2, u3 and so on."""
-        url_email_pattern = re.compile(r'\b(?:https?:\/\/|www\.)\S+|\S+@\S+\.\S+')
-        matches = url_email_pattern.findall(text)
+        like xurl1x, xurl2x, xurl3x and so on, in a single pass.
+        The tag is chosen so that no placeholder can collide with the original text."""
+        tag = segmenter.placeholder_tag_for(text)
         placeholder_map = {}
-        for i, match in enumerate(matches, start=1):
-            placeholder = f'u{i}'
-            placeholder_map[placeholder] = match
-            text = text.replace(match, placeholder, 1)
-        return text, placeholder_map
+
+        def to_placeholder(match: re.Match) -> str:
+            placeholder = f'{tag}{len(placeholder_map) + 1}x'
+            placeholder_map[placeholder] = match.group(0)
+            return placeholder
+
+        return segmenter.URL_EMAIL_PATTERN.sub(to_placeholder, text), placeholder_map
 
     def unmask_urls_from_placeholders(self, text: str, placeholder_map: dict[str, str]) -> str:
         """this function restores the original URLs and
-        email addresses in the text using the placeholders."""
-        for placeholder, original in placeholder_map.items():
-            text = text.lower()
-            text = text.replace(placeholder, original)
-        return text
+        email addresses in the text using the placeholders.
+        Placeholders are matched case-insensitively in case the model changed their case."""
+        if not placeholder_map:
+            return text
+        return segmenter.PLACEHOLDER_PATTERN.sub(
+            lambda match: placeholder_map.get(match.group(0).lower(), match.group(0)),
+            text,
+        )
 
     def split_preserving_newlines(self, text: str) -> list[str]:
         """This function splits the text while preserving newlines."""
-        return re.split(r'(\n)', text)
+        return segmenter.NEWLINE_PATTERN.split(text)
 
     def split_on_punctuation(self, text_parts: list[str]) -> list[str]:
         """This function splits the text on punctuation marks while preserving the punctuation.
-        like - . , : ; ? ! / \n"""
-        final_result = []
-        for part in text_parts:
-            split_parts = re.split(
-                r'(?<!\d)([!?:/]|(?<![A-Za-z])\.(?![A-Za-z]))(?=(?:[^*]*\*\*[^*]*\*\*)*[^*]*$)|([–!?:/]|(?<![A-Za-z])\.(?![A-Za-z]))(?!\d)(?=(?:[^*]*\*\*[^*]*\*\*)*[^*]*$)',
-                part)
-            final_result.extend(split_parts)
-        return [item for item in final_result if item]
+        like - . , : ; ? ! / \n
+        Punctuation inside **bold** spans is left in place."""
+        return segmenter.split_on_punctuation(text_parts)
 
 
     def remove_punctuation_tokens(self, text_parts: list[str]) -> list[str]:
@@ -91,7 +189,7 @@ class TranslatorModel:
         filter removes empty strings and unwanted symbols"""
         return [item.strip()
                 for item in text_parts
-                if item.strip() and item not in {'–', '.', ':', '?', '/', '!', '\n'}
+                if item.strip() and item not in segmenter.PUNCTUATION_TOKENS
         ]
 
 
@@ -107,9 +205,9 @@ class TranslatorModel:
         translated_with_symbols = []
         index = 0
         for item in original:
-            if item in {'–', '.', ':', '?', '/', '!', '\n'}:
+            if item in segmenter.PUNCTUATION_TOKENS:
                 # Attach punctuation directly to the last word if needed
-                if translated_with_symbols and translated_with_symbols[-1] not in {'–', '.', ':', '?', '/', '!', '\n'}:
+                if translated_with_symbols and translated_with_symbols[-1] not in segmenter.PUNCTUATION_TOKENS:
                     translated_with_symbols[-1] += item
                 else:
                     translated_with_symbols.append(item)
@@ -124,14 +222,14 @@ class TranslatorModel:
         Turn the list back into a proper sentence."""
         # Ensuring punctuation is attached properly
         text = ''.join(
-            f' {item}' if item not in {'–', '.', ':', '?', '/', '!', '\n'} else item
+            f' {item}' if item not in segmenter.PUNCTUATION_TOKENS else item
             for item in translated_with_symbols
         ).strip()
         return text
 
     def add_space_before_ma(self, text: str ) -> str:
         """This function adds a space before 'मा' and 'को' if they are not preceded by a space."""
-        return re.sub(r'(?<=\S)(मा|को)(?=\s|[.,!?;])', r' \1', text)
+        return segmenter.MA_KO_PATTERN.sub(r' \1', text)
 
     def build_romanized_mapping(self, romanized_dict : dict[str, list[str]]) -> dict[str, str]:
         """ This function builds a mapping from romanized words
@@ -140,24 +238,31 @@ class TranslatorModel:
                 for nepali, romans in romanized_dict.items()
                 #Iterate through each romanized variant in the list eg. "निस्किन्छ": ["niskinxa", "niskincha"]
                 for roman in romans}
-    def _build_symspell_dictionary(self):
-        """This function builds the SymSpell dictionary using the provided mapping."""
-        for variants in nepali_to_romanized_dict.values():
-            for word in variants:
-                self.sym_spell.create_dictionary_entry(word, 2)
+    def _symspell(self):
+        """This function returns the SymSpell index of the romanized variants, building it on first use."""
+        with self._sym_spell_lock:
+            if self.sym_spell is None:
+                from symspellpy.symspellpy import SymSpell
+
+                sym_spell = SymSpell(max_dictionary_edit_distance=SYMSPELL_MAX_EDIT_DISTANCE, prefix_length=7)
+                for word in self.romanized_variant_to_nepali:
+                    sym_spell.create_dictionary_entry(word, 2)
+                self.sym_spell = sym_spell
+        return self.sym_spell
 
     def replace_with_symspell(self, text: str) -> str:
         """This function replaces Romanized Nepali words with
         their corresponding Nepali words using SymSpell."""
+        from symspellpy.symspellpy import Verbosity
+
+        sym_spell = self._symspell()
         replaced_words = []
         for word in text.lower().split():
-            suggestions = self.sym_spell.lookup(word, Verbosity.CLOSEST, max_edit_distance=1)
+            suggestions = sym_spell.lookup(word, Verbosity.CLOSEST, max_edit_distance=SYMSPELL_MAX_EDIT_DISTANCE)
             if suggestions:
-                matched_variant = suggestions[0].term
-                for nepali_word, variants in nepali_to_romanized_dict.items():
-                    if matched_variant in variants:
-                        replaced_words.append(nepali_word)
-                        break
+                nepali_word = self.romanized_variant_to_nepali.get(suggestions[0].term)
+                if nepali_word:
+                    replaced_words.append(nepali_word)
             else:
                 replaced_words.append(word)
         return ' '.join(replaced_words)
@@ -189,21 +294,11 @@ class TranslatorModel:
 
         if src_lang == "npi_Deva":
             preprocessed_text = self.add_space_before_ma(lower_text)
-            for phrase in sorted(nepali_to_english_dict.keys(), key=lambda x: -len(x)):
-                preprocessed_text = re.sub(
-                    rf'\b{re.escape(phrase)}\b',
-                    nepali_to_english_dict[phrase],
-                    preprocessed_text
-                )
+            preprocessed_text = self.nepali_to_english_patterns.apply(preprocessed_text)
             updated_src_lang, updated_tgt_lang = 'npi_Deva', 'eng_Latn'
 
         elif src_lang == "eng_Latn":
-            for phrase in sorted(english_to_nepali_dict.keys(), key=lambda x: -len(x)):
-                preprocessed_text = re.sub(
-                    rf'\b{re.escape(phrase)}\b',
-                    english_to_nepali_dict[phrase],
-                    preprocessed_text
-                )
+            preprocessed_text = self.english_to_nepali_patterns.apply(preprocessed_text)
             updated_src_lang, updated_tgt_lang = 'eng_Latn', 'npi_Deva'
 
         logger.info("Preprocessed text after replacements: %s", preprocessed_text)
@@ -232,8 +327,7 @@ class TranslatorModel:
         """
 
         lower_text = text.lower()
-        romanized_mapping = self.build_romanized_mapping(nepali_to_romanized_dict)
-        contains_romanized = any(word in romanized_mapping for word in lower_text.split())
+        contains_romanized = any(word in self.romanized_mapping for word in lower_text.split())
 
         # Initialize replacement settings
         preprocessed_text = lower_text
@@ -244,16 +338,14 @@ class TranslatorModel:
             # Step 1: Replace phrases from Romanized Mapping
             # Match multi-word phrases in the dictionary first
             # Sort the keys by length in descending order to match longer phrases first
-            for phrase in sorted(romanized_mapping.keys(), key=lambda x: -len(x)):
-                preprocessed_text = re.sub(r'\b' + re.escape(phrase) + r'\b', romanized_mapping[phrase], preprocessed_text)
+            preprocessed_text = self.romanized_patterns.apply(preprocessed_text)
 
             preprocessed_text = self.replace_with_symspell(preprocessed_text)
 
             # Step 2: Replace phrases from English-Nepali Dictionary
             # Match multi-word phrases in the dictionary first
             # Sort the keys by length in descending order to match longer phrases first
-            for phrase in sorted(english_to_nepali_dict.keys(), key=lambda x: -len(x)):
-                preprocessed_text = re.sub(r'\b' + re.escape(phrase) + r'\b', english_to_nepali_dict[phrase], preprocessed_text)
+            preprocessed_text = self.english_to_nepali_patterns.apply(preprocessed_text)
 
             updated_src_lang, updated_tgt_lang = 'npi_Deva', 'eng_Latn'
 
@@ -261,16 +353,14 @@ class TranslatorModel:
             preprocessed_text = self.add_space_before_ma(lower_text)
             # Match multi-word phrases in the dictionary first
             # Sort the keys by length in descending order to match longer phrases first
-            for phrase in sorted(nepali_to_english_dict.keys(), key=lambda x: -len(x)):
-                preprocessed_text = re.sub(r'\b' + re.escape(phrase) + r'\b', nepali_to_english_dict[phrase], preprocessed_text)
+            preprocessed_text = self.nepali_to_english_patterns.apply(preprocessed_text)
 
             updated_src_lang, updated_tgt_lang = 'npi_Deva', 'eng_Latn'
 
         elif src_lang == "eng_Latn":
             # Match multi-word phrases in the dictionary first
             # Sort the keys by length in descending order to match longer phrases first
-            for phrase in sorted(english_to_nepali_dict.keys(), key=lambda x: -len(x)):
-                preprocessed_text = re.sub(r'\b' + re.escape(phrase) + r'\b', english_to_nepali_dict[phrase], preprocessed_text)
+            preprocessed_text = self.english_to_nepali_patterns.apply(preprocessed_text)
 
             updated_src_lang, updated_tgt_lang = 'eng_Latn', 'npi_Deva'
 
@@ -278,42 +368,158 @@ class TranslatorModel:
         return preprocessed_text, updated_src_lang, updated_tgt_lang
 
 
+    def _encode_source_tokens(self, texts: list[str]) -> list[list[str]]:
+        """
+        This function tokenizes segments (without truncation) into source token strings.
+        The whole list goes through one batch call of the fast tokenizer and stays plain
+        Python lists: CTranslate2 takes token strings, so no tensors are built.
+        """
+        if not texts:
+            return []
+        encoding = self.translation_tokenizer(texts)
+        return [self.translation_tokenizer.convert_ids_to_tokens(ids) for ids in encoding["input_ids"]]
+
+    def _decode_target_tokens(self, token_lists: list[list[str]]) -> list[str]:
+        """This function turns translated token strings back into text, in one batch call."""
+        if not token_lists:
+            return []
+        return self.translation_tokenizer.batch_decode(
+            [self.translation_tokenizer.convert_tokens_to_ids(tokens) for tokens in token_lists],
+            skip_special_tokens=True)
+
+    def split_for_translation(self, text: str, max_tokens: int = MAX_SEGMENT_TOKENS,
+                              tokens: list[str] | None = None) -> list[list[str]]:
+        """
+        Tokenizes a segment, splitting it first if it is longer than max_tokens.
+        `tokens` can pass in the segment's tokens if they were already encoded.
+
+        Over-length segments are split at sentence or danda (।) boundaries and the sentences
+        are packed greedily into pieces under the limit; a single sentence that is still too
+        long is split between words. Nothing is truncated.
+
+        Returns:
+            list[list[str]]: Source tokens of each piece, in order.
+        """
+        if tokens is None:
+            tokens = self._encode_source_tokens([text])[0]
+        if len(tokens) <= max_tokens:
+            return [tokens]
+
+        # Token counts of the pieces add up, apart from the language code and </s> of each encoding.
+        special_tokens = len(self._encode_source_tokens([""])[0])
+        budget = max_tokens - special_tokens
+        sentences = segmenter.split_sentences(text)
+        sentence_lengths = [len(t) - special_tokens for t in self._encode_source_tokens(sentences)]
+        pieces = []
+        current = []
+        current_length = 0
+        for sentence, length in zip(sentences, sentence_lengths):
+            if length <= budget:
+                units = [(sentence, length)]
+            else:
+                words = sentence.split()
+                units = [(word, len(t) - special_tokens)
+                         for word, t in zip(words, self._encode_source_tokens(words))]
+            for unit, unit_length in units:
+                if current and current_length + unit_length > budget:
+                    pieces.append(' '.join(current))
+                    current = []
+                    current_length = 0
+                current.append(unit)
+                current_length += unit_length
+        if current:
+            pieces.append(' '.join(current))
+        return self._encode_source_tokens(pieces)
+
+    def _translation_model_for(self, mode: str):
+        """This function returns the CTranslate2 translator of a mode, loading it on first use."""
+        if mode not in TRANSLATION_MODES:
+            raise ValueError(f"Unknown translation mode: {mode}")
+        if self.injected_translation_model is not None:
+            return self.injected_translation_model
+        return load_translation_model(mode, self.device, self.translation_models)
+
+    def _length_batches(self, lengths: list[int]):
+        """
+        Groups piece indices into length buckets and batches of at most MAX_BATCH_SIZE.
+        Indices are sorted by length so each batch holds similarly sized pieces.
+
+        Yields:
+            tuple[int, list[int]]: beam size of the bucket and the indices of one batch.
+        """
+        order = sorted(range(len(lengths)), key=lambda i: lengths[i])
+        buckets = {}
+        for index in order:
+            bucket = next((bucket for bucket in LENGTH_BUCKETS if lengths[index] <= bucket[0]), LENGTH_BUCKETS[-1])
+            buckets.setdefault(bucket, []).append(index)
+        for (_, beam_size), indices in buckets.items():
+            for start in range(0, len(indices), MAX_BATCH_SIZE):
+                yield beam_size, indices[start:start + MAX_BATCH_SIZE]
+
+    def translate_batch_with_model(self, texts: list[str],
+                                   src_lang: str = 'npi_Deva',
+                                   tgt_lang: str = 'eng_Latn',
+                                   mode: str = 'quality',
+                                   cancellation_token=None) -> list[str]:
+        """
+        Translates several texts with the translation model.
+
+        Over-length texts are split (see split_for_translation), the pieces are sorted into
+        length buckets and translated a batch at a time. Beam size comes from the bucket and
+        max_decoding_length from the longest piece in the batch, so short segments are not
+        padded to long ones and one huge segment no longer runs a wide beam.
+        `mode` selects the decoding settings and checkpoint from TRANSLATION_MODES.
+        The cancellation_token is checked before each batch (see check_cancelled).
+        """
+        translation_model = self._translation_model_for(mode)
+        settings = TRANSLATION_MODES[mode]
+        lowered = [text.lower() for text in texts]
+        pieces = []
+        owners = []
+        with self._tokenizer_lock:
+            self.translation_tokenizer.src_lang = src_lang
+            self.translation_tokenizer.tgt_lang = tgt_lang
+            for index, (text, tokens) in enumerate(zip(lowered, self._encode_source_tokens(lowered))):
+                for piece in self.split_for_translation(text, tokens=tokens):
+                    pieces.append(piece)
+                    owners.append(index)
+
+        translated_pieces = [""] * len(pieces)
+        for beam_size, batch in self._length_batches([len(tokens) for tokens in pieces]):
+            check_cancelled(cancellation_token)
+            longest = max(len(pieces[i]) for i in batch)
+            results = translation_model.translate_batch(
+                [pieces[i] for i in batch],
+                target_prefix=[[tgt_lang]] * len(batch),
+                beam_size=settings["beam_size"] or beam_size,
+                sampling_topk=settings["sampling_topk"],
+                length_penalty=settings["length_penalty"],
+                max_input_length=0,
+                max_decoding_length=int(longest * settings["decoding_length_ratio"]) + 16)
+            with self._tokenizer_lock:
+                decoded = self._decode_target_tokens([result.hypotheses[0][1:] for result in results])
+            for i, text in zip(batch, decoded):
+                translated_pieces[i] = text
+
+        translated = [[] for _ in texts]
+        for owner, piece in zip(owners, translated_pieces):
+            translated[owner].append(piece)
+        return [' '.join(parts) for parts in translated]
+
     # Function to translate text using the translation model
     def translate_text_with_model(self, text: str,
                     src_lang: str ='npi_Deva',
-                    tgt_lang: str ='eng_Latn'
+                    tgt_lang: str ='eng_Latn',
+                    mode: str = 'quality'
                     ) -> str:
         """
         Translates text using the translation model.
         """
-        self.translation_tokenizer.src_lang = src_lang
-        self.translation_tokenizer.tgt_lang = tgt_lang
-        inputs = self.translation_tokenizer(
-            text.lower(),
-            return_tensors="pt",
-            padding=True,
-            truncation=True,
-            max_length=1024).to(self.device)
-        source_tokens = self.translation_tokenizer.convert_ids_to_tokens(inputs["input_ids"][0])
-        target_prefix = [tgt_lang]
-        results = self.translation_model.translate_batch([source_tokens],
-                                                        target_prefix=[target_prefix],
-                                                        beam_size=4)
-        translated_tokens = results[0].hypotheses[0][1:]
-        translated_text = self.translation_tokenizer.decode(
-            self.translation_tokenizer.convert_tokens_to_ids(translated_tokens),
-            skip_special_tokens=True)
-        return translated_text
-
-    def translate_single_sentence(self,
-                                  text: str,
-                                  src_lang: str,
-                                  tgt_lang: str,
-                                  context: str = "answer") -> str:
-        """
-        Translates text while preserving special words using dictionary mapping.
-        """
+        return self.translate_batch_with_model([text], src_lang, tgt_lang, mode)[0]
 
+    def _apply_context_replacements(self, text: str, src_lang: str, tgt_lang: str,
+                                    context: str) -> tuple[str, str, str]:
+        """Applies the dictionary replacements that match the context ('question' or 'answer')."""
         if not isinstance(text, str):
             text = str(text)
         if context == "question":
@@ -322,22 +528,57 @@ class TranslatorModel:
         else:
             preprocessed_text, updated_src_lang, updated_tgt_lang = self.apply_dictionary_replacements(text, src_lang, tgt_lang)
             logger.info("This is text with replacement from the dictionary for romanized as the context is answer: %s", preprocessed_text)
+        return preprocessed_text, updated_src_lang, updated_tgt_lang
+
+    def translate_single_sentence(self,
+                                  text: str,
+                                  src_lang: str,
+                                  tgt_lang: str,
+                                  context: str = "answer") -> str:
+        """
+        Translates text while preserving special words using dictionary mapping.
+        """
+        preprocessed_text, updated_src_lang, updated_tgt_lang = self._apply_context_replacements(
+            text, src_lang, tgt_lang, context)
         logger.info("This is text with replacement from the dictionary: %s", preprocessed_text)
         translated_text = self.translate_text_with_model(
             preprocessed_text, updated_src_lang, updated_tgt_lang
         )
         return translated_text
 
+    def translate_sentences(self,
+                            sentences: list[str],
+                            src_lang: str,
+                            tgt_lang: str,
+                            context: str = "answer",
+                            mode: str = "quality",
+                            cancellation_token=None) -> list[str]:
+        """
+        Translates a list of sentences like translate_single_sentence, but in batches.
+        Sentences are grouped by the language pair the dictionary step settles on.
+        """
+        groups = {}
+        for index, sentence in enumerate(sentences):
+            preprocessed_text, updated_src_lang, updated_tgt_lang = self._apply_context_replacements(
+                sentence, src_lang, tgt_lang, context)
+            groups.setdefault((updated_src_lang, updated_tgt_lang), []).append((index, preprocessed_text))
+
+        translated = [""] * len(sentences)
+        for (updated_src_lang, updated_tgt_lang), items in groups.items():
+            outputs = self.translate_batch_with_model(
+                [text for _, text in items], updated_src_lang, updated_tgt_lang, mode, cancellation_token)
+            for (index, _), output in zip(items, outputs):
+                translated[index] = output
+        return translated
+
 
     def replace_dot(self, input_str: str) -> str:
         """
         This function replaces the dot (.) with a full stop (।) in the text.
         It also handles specific cases where certain words should not be replaced.
         """
-        words_to_replace = ['श्री', 'श्रीमती','प्रा', 'डा', 'ई' ]
-        pattern = r'(' + '|'.join(words_to_replace) + r')\.'
-        text = re.sub(pattern, r'\1', input_str) # ignores words present in word to replace
-        text = re.sub(r'(?<!\d)\.', '।', text) #replace . with ।
-        text = re.sub(r'।।+', '।', text) # removes extra ।
-        text = re.sub(r'\?{2,}', '?', text) #removes extra ?
+        text = segmenter.HONORIFIC_DOT_PATTERN.sub(r'\1', input_str) # ignores words like श्री, डा
+        text = segmenter.DOT_PATTERN.sub('।', text) #replace . with ।
+        text = segmenter.REPEATED_DANDA_PATTERN.sub('।', text) # removes extra ।
+        text = segmenter.REPEATED_QUESTION_PATTERN.sub('?', text) #removes extra ?
         return text
\ No newline at end of file
@@ -0,0 +1,405 @@
+"""
+Multi-process worker pool for document processing.
+
+All of the pipeline used to run in one process, where the CPU-bound parts (PDF parsing,
+regex preprocessing, SymSpell, tokenization) share one GIL. Starting more processes the
+naive way would load one copy of the NLLB model per process. Instead:
+
+    front end (WorkerPool)
+        |  job queue: (job id, document path, language)
+        v
+    N worker processes          -- run process_legal_document, tokenize locally
+        |  request queue: (worker id, request id, mode, source tokens, options)
+        v
+    1 inference process         -- hosts the CTranslate2 models once, batches requests
+        |  one response queue per worker
+        v
+    worker processes            -- results go back to the front end on the result queue
+
+Each worker uses a TranslatorModel whose CTranslate2 backend is a RemoteTranslator, so
+the translation pipeline (preprocessing, caching, postprocessing) runs unchanged in the
+worker and only translate_batch crosses the process boundary. The inference process
+merges concurrent requests that use the same decoding options into one batch.
+
+Usage:
+    pool = WorkerPool(processes=4)
+    futures = [pool.submit(path, "english") for path in paths]
+    summaries = [future.result() for future in futures]
+    pool.close()
+
+    python worker_pool.py contract1.pdf contract2.docx --language nepali --processes 4
+"""
+import argparse
+import asyncio
+import itertools
+import logging
+import multiprocessing
+import os
+import queue
+import sys
+import threading
+from concurrent.futures import Future
+
+from dotenv import load_dotenv
+
+import metrics
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+WORKER_PROCESSES = int(os.getenv("WORKER_PROCESSES") or os.cpu_count() or 1)
+# Documents a worker processes at once; most of a document's time is spent waiting on the LLM.
+WORKER_JOBS = int(os.getenv("WORKER_JOBS", "2"))
+# Sequences the inference process translates in one call, and how long it waits for more
+# requests to join a batch once the first one has arrived.
+INFERENCE_MAX_BATCH = int(os.getenv("INFERENCE_MAX_BATCH", "64"))
+INFERENCE_BATCH_WAIT_SECONDS = float(os.getenv("INFERENCE_BATCH_WAIT_MS", "5")) / 1000
+
+
+class RemoteTranslationResult:
+    """Mimics ctranslate2.TranslationResult for the parts TranslatorModel reads."""
+
+    def __init__(self, hypotheses: list[list[str]]):
+        self.hypotheses = hypotheses
+
+
+class RemoteTranslator:
+    """
+    Stands in for a ctranslate2.Translator inside a worker process: translate_batch sends
+    the source tokens to the inference process and blocks until the result comes back.
+    Safe to call from several threads; one reader thread routes responses by request id.
+    """
+
+    def __init__(self, worker_id: int, request_queue, response_queue, mode: str = "quality"):
+        self.mode = mode
+        self.worker_id = worker_id
+        self.request_queue = request_queue
+        self.response_queue = response_queue
+        self._request_ids = itertools.count()
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._reader = None
+
+    def for_mode(self, mode: str) -> "RemoteModeTranslator":
+        """Returns a translator for another mode that shares this one's connection."""
+        return RemoteModeTranslator(self, mode)
+
+    def _read_responses(self) -> None:
+        while True:
+            request_id, hypotheses, error = self.response_queue.get()
+            with self._lock:
+                done, slot = self._pending.pop(request_id)
+            slot.append((hypotheses, error))
+            done.set()
+
+    def translate_batch(self, source: list[list[str]], mode: str | None = None,
+                        **options) -> list[RemoteTranslationResult]:
+        """Translates a batch in the inference process; options are passed to translate_batch."""
+        done = threading.Event()
+        slot = []
+        with self._lock:
+            if self._reader is None:
+                self._reader = threading.Thread(target=self._read_responses, daemon=True)
+                self._reader.start()
+            request_id = next(self._request_ids)
+            self._pending[request_id] = (done, slot)
+        self.request_queue.put((self.worker_id, request_id, mode or self.mode, source, options))
+        done.wait()
+
+        hypotheses, error = slot[0]
+        if error:
+            raise RuntimeError(f"Inference process failed: {error}")
+        return [RemoteTranslationResult(item) for item in hypotheses]
+
+
+class RemoteModeTranslator:
+    """A RemoteTranslator bound to one translation mode."""
+
+    def __init__(self, remote: RemoteTranslator, mode: str):
+        self.remote = remote
+        self.mode = mode
+
+    def translate_batch(self, source: list[list[str]], **options) -> list[RemoteTranslationResult]:
+        return self.remote.translate_batch(source, mode=self.mode, **options)
+
+
+def _build_remote_translator_model(remote: RemoteTranslator, translation_tokenizer=None):
+    """A TranslatorModel whose CTranslate2 backend (for every mode) is in the inference process."""
+    from translation_model.translator import TranslatorModel, TRANSLATION_MODES
+
+    class RemoteTranslatorModel(TranslatorModel):
+        def _translation_model_for(self, mode: str):
+            if mode not in TRANSLATION_MODES:
+                raise ValueError(f"Unknown translation mode: {mode}")
+            return remote.for_mode(mode)
+
+    return RemoteTranslatorModel(translation_tokenizer=translation_tokenizer, translation_model=remote)
+
+
+def _batch_key(mode: str, options: dict) -> tuple:
+    """Requests with the same key can share one translate_batch call."""
+    shared = {key: value for key, value in options.items() if key not in ("target_prefix", "max_decoding_length")}
+    return mode, tuple(sorted(shared.items()))
+
+
+def _translate_group(translation_model, requests: list) -> list:
+    """
+    Translates the requests of one batch key in a single call.
+
+    target_prefix is per sequence and is concatenated. max_decoding_length is the largest
+    of the requests; hypotheses are cut back to each request's own limit afterwards.
+    """
+    source = []
+    target_prefix = []
+    for _, _, _, tokens, options in requests:
+        source.extend(tokens)
+        target_prefix.extend(options.get("target_prefix") or [None] * len(tokens))
+    options = dict(requests[0][4])
+    options["target_prefix"] = target_prefix if any(target_prefix) else None
+    limits = [request[4].get("max_decoding_length") for request in requests]
+    if all(limits):
+        options["max_decoding_length"] = max(limits)
+
+    metrics.observe("inference_batch_size", len(source))
+    metrics.observe("inference_batch_requests", len(requests))
+    results = translation_model.translate_batch(source, **options)
+
+    responses = []
+    position = 0
+    for request, limit in zip(requests, limits):
+        count = len(request[3])
+        hypotheses = [result.hypotheses[0][:limit] if limit else result.hypotheses[0]
+                      for result in results[position:position + count]]
+        responses.append([[hypothesis] for hypothesis in hypotheses])
+        position += count
+    return responses
+
+
+def run_inference_process(request_queue, response_queues: list, translation_model=None) -> None:
+    """
+    Main loop of the inference process. Loads each mode's CTranslate2 model once (or uses
+    `translation_model` for every mode, e.g. a fake backend), then serves requests until
+    it receives None.
+    """
+    from translation_model.translator import load_translation_model, select_device
+
+    device = select_device() if translation_model is None else "cpu"
+    loaded = {}
+    stopping = False
+    while not stopping:
+        requests = [request_queue.get()]
+        if requests[0] is None:
+            break
+        sequences = len(requests[0][3])
+        while sequences < INFERENCE_MAX_BATCH:
+            try:
+                request = request_queue.get(timeout=INFERENCE_BATCH_WAIT_SECONDS)
+            except queue.Empty:
+                break
+            if request is None:
+                stopping = True
+                break
+            requests.append(request)
+            sequences += len(request[3])
+
+        groups = {}
+        for request in requests:
+            groups.setdefault(_batch_key(request[2], request[4]), []).append(request)
+        for (mode, _), group in groups.items():
+            try:
+                model = translation_model or load_translation_model(mode, device, loaded)
+                responses = [(hypotheses, None) for hypotheses in _translate_group(model, group)]
+            except Exception as e:
+                logger.exception("Inference batch failed")
+                responses = [(None, str(e))] * len(group)
+            for (worker_id, request_id, _, _, _), (hypotheses, error) in zip(group, responses):
+                response_queues[worker_id].put((request_id, hypotheses, error))
+
+
+async def _process_job(job, result_queue, model_router) -> None:
+    """
+    Runs one job and posts its result. A result is posted however the job ends (including
+    when its task is cancelled, e.g. as asyncio.run tears the worker down), so the front
+    end's future never waits for a job that is gone.
+    """
+    from agents import process_legal_document
+
+    job_id, document_path, language = job
+    summary, error = None, "CancelledError: the job was cancelled in its worker"
+    try:
+        summary = await process_legal_document(document_path, language, model_router=model_router)
+        error = None
+    except Exception as e:
+        logger.exception("Job %s failed", job_id)
+        error = f"{type(e).__name__}: {e}"
+    finally:
+        result_queue.put((job_id, summary, error))
+
+
+async def _worker_main(job_queue, result_queue, jobs_per_worker: int) -> None:
+    from model_adapter import ModelRouter
+
+    # A job is only taken from the shared queue when this worker has a free slot,
+    # so queued documents go to whichever worker frees up first.
+    # The worker's documents share one router: one client (and load balancer) per model.
+    model_router = ModelRouter()
+    slots = asyncio.Semaphore(jobs_per_worker)
+    tasks = set()
+    while True:
+        await slots.acquire()
+        job = await asyncio.to_thread(job_queue.get)
+        if job is None:
+            break
+        task = asyncio.create_task(_process_job(job, result_queue, model_router))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+        task.add_done_callback(lambda _: slots.release())
+    if tasks:
+        await asyncio.gather(*tasks)
+
+
+def run_worker_process(worker_id: int, job_queue, result_queue, request_queue, response_queue,
+                       jobs_per_worker: int, translation_tokenizer=None) -> None:
+    """Main loop of a worker process: runs documents until it receives None."""
+    from translation_model import pipeline
+
+    remote = RemoteTranslator(worker_id, request_queue, response_queue)
+    pipeline.set_translator_model(_build_remote_translator_model(remote, translation_tokenizer))
+    asyncio.run(_worker_main(job_queue, result_queue, jobs_per_worker))
+
+
+class WorkerPool:
+    """
+    Dispatches documents to worker processes that share one inference process.
+
+    Parameters:
+        processes (int): Number of worker processes (WORKER_PROCESSES by default).
+        jobs_per_worker (int): Documents each worker runs concurrently (WORKER_JOBS by default).
+        translation_model: Optional CTranslate2-compatible backend for the inference process.
+        translation_tokenizer: Optional tokenizer for the workers. Both must be picklable,
+            e.g. the fakes of benchmarks.fake_backends for offline load tests.
+    """
+
+    def __init__(self, processes: int | None = None, jobs_per_worker: int | None = None,
+                 translation_model=None, translation_tokenizer=None):
+        self.processes = processes or WORKER_PROCESSES
+        jobs_per_worker = jobs_per_worker or WORKER_JOBS
+        # spawn: workers must not inherit threads or a CUDA context from the front end.
+        context = multiprocessing.get_context("spawn")
+        self.job_queue = context.Queue()
+        self.result_queue = context.Queue()
+        self.request_queue = context.Queue()
+        # Kept on the pool: a queue garbage-collected here would vanish before the children open it.
+        self.response_queues = [context.Queue() for _ in range(self.processes)]
+
+        self.inference_process = context.Process(
+            target=run_inference_process, args=(self.request_queue, self.response_queues, translation_model),
+            name="inference", daemon=True,
+        )
+        self.inference_process.start()
+        self.workers = [
+            context.Process(
+                target=run_worker_process,
+                args=(worker_id, self.job_queue, self.result_queue, self.request_queue,
+                      self.response_queues[worker_id], jobs_per_worker, translation_tokenizer),
+                name=f"worker-{worker_id}", daemon=True,
+            )
+            for worker_id in range(self.processes)
+        ]
+        for worker in self.workers:
+            worker.start()
+
+        self._job_ids = itertools.count()
+        self._futures = {}
+        # Set once a process has died: no result would ever come back for new jobs.
+        self._broken = None
+        self._lock = threading.Lock()
+        self._collector = threading.Thread(target=self._collect_results, daemon=True)
+        self._collector.start()
+        logger.info("Started %d worker processes and one inference process", self.processes)
+
+    def _fail_pending(self, message: str) -> None:
+        """Fails every pending future and marks the pool broken, so later submits fail at once."""
+        with self._lock:
+            self._broken = message
+            futures, self._futures = self._futures, {}
+        for future in futures.values():
+            future.set_exception(RuntimeError(message))
+
+    def _collect_results(self) -> None:
+        while True:
+            try:
+                item = self.result_queue.get(timeout=1.0)
+            except queue.Empty:
+                dead = [process.name for process in [self.inference_process, *self.workers]
+                        if process.exitcode not in (None, 0)]
+                if dead:
+                    logger.error("Processes exited unexpectedly: %s", ", ".join(dead))
+                    self._fail_pending(f"Worker pool processes exited unexpectedly: {', '.join(dead)}")
+                    return
+                continue
+            if item is None:
+                return
+            job_id, result, error = item
+            with self._lock:
+                future = self._futures.pop(job_id)
+            if error:
+                future.set_exception(RuntimeError(error))
+            else:
+                future.set_result(result)
+
+    def submit(self, document_path: str, language: str = "english") -> Future:
+        """
+        Queues a document; the future resolves to the output of process_legal_document.
+        Once a process of the pool has died, the future fails right away with RuntimeError.
+        """
+        future = Future()
+        with self._lock:
+            if self._broken:
+                future.set_exception(RuntimeError(self._broken))
+                return future
+            job_id = next(self._job_ids)
+            self._futures[job_id] = future
+        self.job_queue.put((job_id, document_path, language))
+        return future
+
+    def close(self) -> None:
+        """Waits for the queued documents, then stops the workers and the inference process."""
+        for _ in self.workers:
+            self.job_queue.put(None)
+        for worker in self.workers:
+            worker.join()
+        self.request_queue.put(None)
+        self.inference_process.join()
+        self.result_queue.put(None)
+        self._collector.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Process documents with a pool of worker processes.")
+    parser.add_argument("documents", nargs="+", help="Document paths (PDF, DOCX or image).")
+    parser.add_argument("--language", default="english", help="Output language: english or nepali.")
+    parser.add_argument("--processes", type=int, default=None, help="Worker processes (default: WORKER_PROCESSES).")
+    args = parser.parse_args(argv)
+
+    failed = 0
+    with WorkerPool(processes=args.processes) as pool:
+        futures = [(path, pool.submit(path, args.language)) for path in args.documents]
+        for path, future in futures:
+            try:
+                print(f"--- {path} ---\n{future.result()}\n")
+            except RuntimeError as e:
+                failed += 1
+                print(f"--- {path} ---\nFailed: {e}\n")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())